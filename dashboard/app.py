@@ -1,16 +1,31 @@
 #!/usr/bin/env python3
 import os, json, subprocess, shlex, base64, socket, threading, time
+import datetime
 import shutil
 import re
+import gzip
+import html
+import mimetypes
 from urllib import request as urlrequest, error as urlerror
 from functools import wraps
 from flask import Flask, jsonify, request, abort, send_from_directory, render_template_string, Response
 import optimizer as dash_optimizer
+import exec_jobs
+import shell_sessions
 import hmac, hashlib, time, base64
 try:
     import psutil
 except Exception:
     psutil = None
+try:
+    import brotli
+except Exception:
+    brotli = None
+try:
+    from simple_websocket import Server as WSServer, ConnectionClosed as WSClosed
+except Exception:
+    WSServer = None
+    WSClosed = Exception
 
 app = Flask(__name__)
  
@@ -55,51 +70,122 @@ def auth_required(fn):
         return fn(*args, **kwargs)
     return wrapper
 
-@app.get('/dashboard/api/v2status')
-@auth_required
-def api_v2status():
+# blobedash-v2 supervisor: container state, dev-server reachability and the
+# outward IP are probed on a background cadence; request handlers only read _v2_state.
+V2_SUPERVISE_SEC = float(os.environ.get('BLOBEDASH_V2_SUPERVISE_SEC', '10') or 10)
+V2_RESTART_BACKOFF_SEC = 30.0
+OUTWARD_IP_TTL_SEC = 300.0
+_v2_state = {'running': False, 'url': None, 'container': 'missing', 'dev': False,
+             'checked': 0.0, 'restarts': 0, 'last_restart': 0.0}
+_v2_lock = threading.Lock()
+_v2_wake = threading.Event()
+_v2_thread = None
+_outward_ip = {'ip': None, 'ts': 0.0}
+
+
+def _detect_outward_ip() -> str:
+    """Outward-facing IP (UDP connect, no packets sent), cached for OUTWARD_IP_TTL_SEC."""
+    now = time.time()
+    if _outward_ip['ip'] and now - _outward_ip['ts'] < OUTWARD_IP_TTL_SEC:
+        return _outward_ip['ip']
+    try:
+        s = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+        s.connect(('8.8.8.8', 80))
+        ip = s.getsockname()[0]
+        s.close()
+    except Exception:
+        ip = '127.0.0.1'
+    _outward_ip['ip'] = ip
+    _outward_ip['ts'] = now
+    return ip
+
+
+def _v2_probe():
+    """One supervisor pass: inspect blobedash-v2, restart it if it died, else probe the dev server."""
     env = _read_env()
     domain = env.get('BLOBEVM_DOMAIN', '')
-    running = False
-    url = None
-    try:
-        r = subprocess.run([
-            'docker', 'ps', '-q', '-f', 'name=^blobedash-v2$'
-        ], capture_output=True, text=True)
-        cid = r.stdout.strip()
-        if cid and domain:
-            running = True
-            url = f'http://{domain}/Dashboard'
-        else:
-            # If no docker container, allow detecting a local dev server (Vite) for development.
-            # Use env var DASHBOARD_DEV_PORT to override default (5173).
-            try:
-                dev_port = int(env.get('DASHBOARD_DEV_PORT', '5173'))
-                # Prefer explicit host if provided, else detect server's outward-facing IP
-                host_to_check = env.get('DASHBOARD_DEV_HOST', '')
-                if not host_to_check:
-                    try:
-                        # determine outward-facing IP by creating a UDP socket
-                        s = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
-                        s.connect(('8.8.8.8', 80))
-                        host_to_check = s.getsockname()[0]
-                        s.close()
-                    except Exception:
-                        host_to_check = '127.0.0.1'
-                # try connecting to host_to_check:dev_port
-                with socket.socket(socket.AF_INET, socket.SOCK_STREAM) as s2:
-                    s2.settimeout(0.5)
-                    res = s2.connect_ex((host_to_check, dev_port))
-                    if res == 0 and domain:
-                        running = True
-                        # The dashboard is being served by Vite on dev_port; report the same public domain path
-                        url = f'http://{domain}/Dashboard'
-            except Exception:
-                pass
+    state = 'missing'
+    try:
+        r = subprocess.run(['docker', 'ps', '-a', '-f', 'name=^blobedash-v2$', '--format', '{{.State}}'],
+                           capture_output=True, text=True, timeout=10)
+        state = (r.stdout.strip().splitlines() or ['missing'])[0] or 'missing'
     except Exception:
-        running = False
-        url = None
-    return jsonify({'running': running, 'url': url})
+        state = 'unknown'
+    now = time.time()
+    if state in ('exited', 'dead', 'created') and domain and now - _v2_state['last_restart'] >= V2_RESTART_BACKOFF_SEC:
+        # The container only exists while a domain is set (set-domain removes it otherwise),
+        # so a stopped one has died rather than been turned off.
+        _v2_state['last_restart'] = now
+        try:
+            rr = subprocess.run(['docker', 'start', 'blobedash-v2'], capture_output=True, text=True, timeout=30)
+            if rr.returncode == 0:
+                state = 'running'
+                _v2_state['restarts'] += 1
+        except Exception:
+            pass
+    dev = False
+    if state != 'running':
+        # If no docker container, allow detecting a local dev server (Vite) for development.
+        # Use env var DASHBOARD_DEV_PORT to override default (5173).
+        try:
+            dev_port = int(env.get('DASHBOARD_DEV_PORT', '5173'))
+            host_to_check = env.get('DASHBOARD_DEV_HOST', '') or _detect_outward_ip()
+            with socket.socket(socket.AF_INET, socket.SOCK_STREAM) as s2:
+                s2.settimeout(0.5)
+                dev = s2.connect_ex((host_to_check, dev_port)) == 0
+        except Exception:
+            dev = False
+    running = bool(domain) and (state == 'running' or dev)
+    with _v2_lock:
+        _v2_state.update({
+            'running': running,
+            'url': f'http://{domain}/Dashboard' if running else None,
+            'container': state,
+            'dev': dev,
+            'checked': time.time(),
+        })
+
+
+def _v2_supervisor_loop():
+    while True:
+        try:
+            _v2_probe()
+        except Exception:
+            pass
+        _v2_wake.wait(V2_SUPERVISE_SEC)
+        _v2_wake.clear()
+
+
+def start_v2_supervisor():
+    global _v2_thread
+    with _v2_lock:
+        if _v2_thread and _v2_thread.is_alive():
+            return False
+        t = threading.Thread(target=_v2_supervisor_loop, daemon=True)
+        _v2_thread = t
+        t.start()
+        return True
+
+
+def _v2_status() -> dict:
+    """Latest supervisor snapshot; starts the supervisor on first use."""
+    start_v2_supervisor()
+    if not _v2_state['checked']:
+        # first call after startup: wait briefly for the initial probe rather than report 'not running'
+        for _ in range(20):
+            if _v2_state['checked']:
+                break
+            time.sleep(0.05)
+    with _v2_lock:
+        return dict(_v2_state)
+
+
+@app.get('/dashboard/api/v2status')
+@auth_required
+def api_v2status():
+    st = _v2_status()
+    return jsonify({'running': st['running'], 'url': st['url'], 'container': st['container'],
+                    'dev': st['dev'], 'restarts': st['restarts'], 'checked': int(st['checked'])})
 
 APP_ROOT = '/opt/blobe-vm'
 MANAGER = 'blobe-vm-manager'
@@ -163,6 +249,7 @@ window.addEventListener('DOMContentLoaded', pollV2Status);
         <button onclick="bulkRecreate()">Recreate ALL VMs</button>
         <button onclick="bulkRebuildAll()">Rebuild ALL VMs</button>
         <button onclick="bulkUpdateAndRebuild()">Update & Rebuild ALL VMs</button>
+        <button onclick="cleanAllVMs()" class="btn-gray">Clean ALL VMs</button>
         <button onclick="pruneDocker()" class="btn-gray">Prune Docker</button>
         <button onclick="bulkResetAll()" class="btn-red">Reset ALL VMs</button>
         <button onclick="bulkDeleteAll()" class="btn-red">Delete ALL VMs</button>
@@ -404,6 +491,28 @@ async function updateVM(name){
     load();
 }
 
+async function cleanAllVMs(){
+    try{
+        let r = await fetch('/dashboard/api/clean-vms?names=*&dry=1', {method:'POST'});
+        let j = await r.json().catch(()=>({}));
+        if(!(j && j.ok)){ showErr('Clean failed: '+((j && j.error)||'unknown')); return; }
+        let st = await waitCleanup(j.id);
+        if(!confirm('Cleaning '+st.total.count+' VMs would reclaim about '+fmtBytes(st.total.reclaimable)+'. Proceed?')) return;
+        r = await fetch('/dashboard/api/clean-vms?names=*', {method:'POST'});
+        j = await r.json().catch(()=>({}));
+        if(!(j && j.ok)){ showErr('Clean failed: '+((j && j.error)||'unknown')); return; }
+        st = await waitCleanup(j.id);
+        alert('Cleaned '+st.total.done+' VMs, reclaimed '+fmtBytes(st.total.reclaimed)+(st.total.failed ? ' ('+st.total.failed+' failed)' : '')+'.');
+    }catch(e){ showErr('Clean error: '+e); }
+}
+async function waitCleanup(id){
+    while(true){
+        const r = await fetch(`/dashboard/api/clean-vms/${encodeURIComponent(id)}`);
+        const j = await r.json();
+        if(!j.ok || j.finished) return j;
+        await new Promise(res=>setTimeout(res, 1500));
+    }
+}
 async function pruneDocker(){
     if(!confirm('Prune unused Docker data (images, containers, cache)?')) return;
     try{
@@ -417,13 +526,19 @@ async function pruneDocker(){
     }catch(e){ alert('Prune error: '+e); }
 }
 
+function fmtBytes(n){
+    n = Number(n)||0;
+    const u = ['B','KB','MB','GB','TB']; let i = 0;
+    while(n >= 1024 && i < u.length-1){ n /= 1024; i++; }
+    return n.toFixed(i ? 1 : 0)+' '+u[i];
+}
 async function cleanVM(name){
     if(!confirm('Clean apt caches and temporary files inside VM '+name+'?')) return;
     try{
         const r = await fetch(`/dashboard/api/clean-vm/${encodeURIComponent(name)}`, {method:'POST'});
         const j = await r.json().catch(()=>({}));
         if(j && j.ok){
-            alert('Clean requested.');
+            alert('Cleaned '+name+': reclaimed '+fmtBytes(j.reclaimed)+'.');
         }else{
             alert('Clean failed:\n' + ((j && (j.error||j.output)) || 'unknown error'));
         }
@@ -816,6 +931,14 @@ async function checkVM(ev,name){
             if(sg) sg.checked = !!(j && j.cfg && j.cfg.guards && j.cfg.guards.swap);
             const hg = document.getElementById('guard-health');
             if(hg) hg.checked = !!(j && j.cfg && j.cfg.guards && j.cfg.guards.health);
+            const ig = document.getElementById('guard-idle');
+            if(ig) ig.checked = !!(j && j.cfg && j.cfg.guards && j.cfg.guards.idle);
+            const rg = document.getElementById('guard-rightsize');
+            if(rg) rg.checked = !!(j && j.cfg && j.cfg.guards && j.cfg.guards.rightsize);
+            const fg = document.getElementById('guard-cpufair');
+            if(fg) fg.checked = !!(j && j.cfg && j.cfg.guards && j.cfg.guards.cpufair);
+            const pg = document.getElementById('guard-forecast');
+            if(pg) pg.checked = !!(j && j.cfg && j.cfg.guards && j.cfg.guards.forecast);
             const sm = document.getElementById('guard-strictmem');
             if(sm) sm.checked = !!(j && j.cfg && j.cfg.strictMemoryLimit);
 
@@ -902,6 +1025,10 @@ async function checkVM(ev,name){
         <label><input id="guard-cpu" type="checkbox" onchange="optimizerSet('guards', Object.assign(({}), {cpu:this.checked}))"> CPU Guard <span id="guard-cpu-stat" class="muted"></span></label>
         <label><input id="guard-swap" type="checkbox" onchange="optimizerSet('guards', Object.assign(({}), {swap:this.checked}))"> Swap Guard <span id="guard-swap-stat" class="muted"></span></label>
         <label><input id="guard-health" type="checkbox" onchange="optimizerSet('guards', Object.assign(({}), {health:this.checked}))"> Health Guard <span id="guard-health-stat" class="muted"></span></label>
+        <label><input id="guard-idle" type="checkbox" onchange="optimizerSet('guards', Object.assign(({}), {idle:this.checked}))"> Idle Suspend</label>
+        <label><input id="guard-rightsize" type="checkbox" onchange="optimizerSet('guards', Object.assign(({}), {rightsize:this.checked}))"> Memory Right-sizing</label>
+        <label><input id="guard-cpufair" type="checkbox" onchange="optimizerSet('guards', Object.assign(({}), {cpufair:this.checked}))"> CPU Fairness</label>
+        <label><input id="guard-forecast" type="checkbox" onchange="optimizerSet('guards', Object.assign(({}), {forecast:this.checked}))"> Memory Forecast</label>
         <label><input id="guard-strictmem" type="checkbox" onchange="optimizerSet('strictMemoryLimit', this.checked)"> Strict Memory Limits <span id="guard-strictmem-stat" class="muted"></span></label>
     </div>
     <div style="margin-bottom:.5rem">
@@ -913,6 +1040,36 @@ async function checkVM(ev,name){
     <pre id="optimizer-logs" style="background:#000;color:#9ee;padding:.5rem;border-radius:4px;max-height:240px;overflow:auto;margin-top:.5rem"></pre>
 </div>
 
+<div style="margin:1.5rem 0;padding:1rem;border:1px solid #333;border-radius:6px;background:#081226">
+    <h2 style="margin-top:0">Apt Cache</h2>
+    <div id="aptcache-status" class="muted">Loading…</div>
+    <div style="margin-top:.5rem">
+        <button onclick="aptCacheSet(true)">Enable</button>
+        <button onclick="aptCacheSet(false)" class="btn-gray">Disable</button>
+    </div>
+</div>
+<script>
+    async function loadAptCache(){
+        try{
+            const j = await (await fetch('/dashboard/api/aptcache')).json();
+            const el = document.getElementById('aptcache-status');
+            if(!el || !j.ok) return;
+            const ratio = (j.hit_ratio === null) ? 'n/a' : (j.hit_ratio*100).toFixed(1)+'%';
+            el.textContent = (j.enabled ? (j.running ? 'Running' : 'Enabled, container not running') : 'Disabled')+
+                ' · size '+fmtBytes(j.size_bytes)+' of '+fmtBytes(j.max_bytes)+
+                ' · hit ratio '+ratio+' ('+fmtBytes(j.hit_bytes)+' served from cache, '+fmtBytes(j.miss_bytes)+' downloaded)';
+        }catch(e){}
+    }
+    async function aptCacheSet(on){
+        if(on && !confirm('Start the shared apt cache and point all VMs at it?')) return;
+        const r = await fetch('/dashboard/api/aptcache/'+(on?'enable':'disable'), {method:'POST'});
+        const j = await r.json().catch(()=>({}));
+        if(!(j && j.ok)) showErr('Apt cache: '+((j && (j.error||j.output))||'failed'));
+        loadAptCache();
+    }
+    loadAptCache(); setInterval(loadAptCache, 30000);
+</script>
+
 </body></html>
 """
 
@@ -1217,6 +1374,83 @@ def _write_env_kv(updates: dict):
 def _docker(*args):
     return subprocess.run(['docker', *args], stdout=subprocess.PIPE, stderr=subprocess.PIPE, text=True)
 
+
+# --- Single-flight + short TTL cache for expensive read endpoints ---
+# Concurrent identical requests share one in-flight computation; the result is then
+# reused for a short, per-endpoint freshness window (BLOBEDASH_CACHE_TTL_<NAME>
+# seconds, 0 = coalesce only). Computations return (payload, http_status) and only
+# successful results are cached.
+_CACHE_TTL_DEFAULTS = {'list': 2.0, 'vmstats': 2.0, 'vmstatus': 1.0, 'optimizer': 3.0, 'apps': 30.0, 'aptcache': 15.0}
+_sf_lock = threading.Lock()
+_sf_inflight = {}
+_sf_cache = {}
+_sf_metrics = {}
+
+
+def _cache_ttl(endpoint: str) -> float:
+    raw = os.environ.get(f'BLOBEDASH_CACHE_TTL_{endpoint.upper()}')
+    try:
+        return max(0.0, float(raw)) if raw not in (None, '') else _CACHE_TTL_DEFAULTS.get(endpoint, 0.0)
+    except Exception:
+        return _CACHE_TTL_DEFAULTS.get(endpoint, 0.0)
+
+
+def _single_flight(endpoint: str, key: str, fn):
+    """Return fn() -> (payload, status), shared by concurrent callers of the same key."""
+    ttl = _cache_ttl(endpoint)
+    with _sf_lock:
+        m = _sf_metrics.setdefault(endpoint, {'hits': 0, 'misses': 0, 'coalesced': 0, 'errors': 0})
+        hit = _sf_cache.get(key)
+        if hit and time.monotonic() - hit[0] < ttl:
+            m['hits'] += 1
+            return hit[1]
+        call = _sf_inflight.get(key)
+        leader = call is None
+        if leader:
+            call = {'event': threading.Event(), 'value': None, 'error': None}
+            _sf_inflight[key] = call
+            m['misses'] += 1
+        else:
+            m['coalesced'] += 1
+    if not leader:
+        call['event'].wait()
+        if call['error'] is not None:
+            raise call['error']
+        return call['value']
+    try:
+        value = fn()
+        call['value'] = value
+        if ttl > 0 and value[1] < 400:
+            with _sf_lock:
+                _sf_cache[key] = (time.monotonic(), value)
+        return value
+    except Exception as e:
+        call['error'] = e
+        with _sf_lock:
+            m['errors'] += 1
+        raise
+    finally:
+        with _sf_lock:
+            _sf_inflight.pop(key, None)
+        call['event'].set()
+
+
+def _cache_invalidate(prefix: str):
+    with _sf_lock:
+        for k in [k for k in _sf_cache if k.startswith(prefix)]:
+            _sf_cache.pop(k, None)
+
+
+def _cache_metrics() -> dict:
+    with _sf_lock:
+        out = {}
+        for ep in sorted(set(_CACHE_TTL_DEFAULTS) | set(_sf_metrics)):
+            m = dict(_sf_metrics.get(ep, {'hits': 0, 'misses': 0, 'coalesced': 0, 'errors': 0}))
+            m['ttl'] = _cache_ttl(ep)
+            m['inflight'] = sum(1 for k in _sf_inflight if k.split(':', 1)[0] == ep)
+            out[ep] = m
+        return out
+
 @app.get('/dashboard/api/modeinfo')
 @auth_required
 def api_modeinfo():
@@ -1386,90 +1620,236 @@ def api_upload_vm_favicon(name):
         return jsonify({'ok': False, 'error': str(e)}), 500
 
 
-    # --- Dashboard v2 static serving and auth endpoints ---
-    @app.post('/Dashboard/api/auth/login')
-    def dashboard_v2_login():
+# --- Dashboard v2 static serving and auth endpoints ---
+@app.post('/Dashboard/api/auth/login')
+def dashboard_v2_login():
+    try:
+        data = request.get_json(force=True)
+    except Exception:
+        return jsonify({'ok': False}), 400
+    pw = data.get('password','')
+    cfg_pw = _get_v2_password()
+    if not cfg_pw:
+        # not configured
+        return jsonify({'ok': False, 'error': 'not-configured'}), 404
+    if pw != cfg_pw:
+        return jsonify({'ok': False, 'error': 'invalid'}), 401
+    exp = int(time.time() + 24*3600)
+    payload = f"{exp}:{os.urandom(8).hex()}"
+    token = _sign_v2_token(payload)
+    resp = jsonify({'ok': True, 'token': token, 'expiry': exp})
+    # Also set cookie for browser convenience
+    resp.set_cookie('Dashboard-Auth', token, httponly=True, samesite='Lax')
+    return resp
+
+
+@app.get('/Dashboard/api/auth/status')
+def dashboard_v2_status():
+    # Check Authorization header or cookie
+    auth = request.headers.get('Authorization','')
+    token = None
+    if auth.lower().startswith('bearer '):
+        token = auth.split(None,1)[1].strip()
+    if not token:
+        token = request.cookies.get('Dashboard-Auth')
+    ok = bool(token and _verify_v2_token(token))
+    return jsonify({'ok': ok})
+
+
+# --- Precompressed static index for dashboard_v2/dist ---
+# Files are read and compressed once when the directory is indexed; a cheap
+# directory mtime signature is re-checked at most every STATIC_RESCAN_SEC so a
+# fresh `npm run build` is picked up without restarting the dashboard.
+_DASH_V2_DIR = os.path.normpath(os.path.join(os.path.dirname(__file__), '..', 'dashboard_v2'))
+_DASH_V2_DIST = os.path.join(_DASH_V2_DIR, 'dist')
+STATIC_RESCAN_SEC = float(os.environ.get('BLOBEDASH_STATIC_RESCAN_SEC', '2') or '2')
+_IMMUTABLE_CACHE = 'public, max-age=31536000, immutable'
+_REVALIDATE_CACHE = 'no-cache'
+# Vite emits content-hashed names like assets/index-B5CCiivO.js
+_HASHED_NAME_RE = re.compile(r'[.-][A-Za-z0-9_]{8,}\.[A-Za-z0-9]+$')
+_COMPRESSIBLE_EXT = ('.js', '.mjs', '.css', '.html', '.json', '.svg', '.txt', '.map', '.xml', '.ico', '.wasm')
+_static_indexes = {}
+_static_lock = threading.Lock()
+
+
+def _static_signature(root: str):
+    """Return a tuple of (dir, mtime) pairs; changes whenever files are added/replaced."""
+    sig = []
+    try:
+        for cur, dirs, _files in os.walk(root):
+            sig.append((cur, os.stat(cur).st_mtime_ns))
+    except Exception:
+        pass
+    return tuple(sig)
+
+
+def _static_variants(full: str, data: bytes) -> dict:
+    """Build identity/gzip/br bodies for one file. Sibling `.gz`/`.br` files from the
+    build take precedence; otherwise variants are generated here, once, at index time."""
+    variants = {'identity': data}
+    if not full.lower().endswith(_COMPRESSIBLE_EXT) or len(data) < 1024:
+        return variants
+    for enc, ext in (('gzip', '.gz'), ('br', '.br')):
+        side = full + ext
         try:
-            data = request.get_json(force=True)
+            if os.path.isfile(side) and os.path.getmtime(side) >= os.path.getmtime(full):
+                with open(side, 'rb') as f:
+                    variants[enc] = f.read()
         except Exception:
-            return jsonify({'ok': False}), 400
-        pw = data.get('password','')
-        cfg_pw = _get_v2_password()
-        if not cfg_pw:
-            # not configured
-            return jsonify({'ok': False, 'error': 'not-configured'}), 404
-        if pw != cfg_pw:
-            return jsonify({'ok': False, 'error': 'invalid'}), 401
-        exp = int(time.time() + 24*3600)
-        payload = f"{exp}:{os.urandom(8).hex()}"
-        token = _sign_v2_token(payload)
-        resp = jsonify({'ok': True, 'token': token, 'expiry': exp})
-        # Also set cookie for browser convenience
-        resp.set_cookie('Dashboard-Auth', token, httponly=True, samesite='Lax')
-        return resp
+            pass
+    try:
+        if 'gzip' not in variants:
+            variants['gzip'] = gzip.compress(data, compresslevel=9, mtime=0)
+        if 'br' not in variants and brotli is not None:
+            variants['br'] = brotli.compress(data, quality=11)
+    except Exception:
+        pass
+    # drop variants that do not actually save bytes
+    return {k: v for k, v in variants.items() if k == 'identity' or len(v) < len(data)}
+
+
+def _static_entry(full: str, data: bytes, immutable: bool = False) -> dict:
+    ctype = mimetypes.guess_type(full)[0] or 'application/octet-stream'
+    if ctype.startswith('text/') or ctype in ('application/javascript', 'application/json'):
+        ctype += '; charset=utf-8'
+    return {
+        'etag': hashlib.sha1(data).hexdigest()[:20],
+        'ctype': ctype,
+        'immutable': immutable,
+        'variants': _static_variants(full, data),
+    }
 
 
-    @app.get('/Dashboard/api/auth/status')
-    def dashboard_v2_status():
-        # Check Authorization header or cookie
-        auth = request.headers.get('Authorization','')
-        token = None
-        if auth.lower().startswith('bearer '):
-            token = auth.split(None,1)[1].strip()
-        if not token:
-            token = request.cookies.get('Dashboard-Auth')
-        ok = bool(token and _verify_v2_token(token))
-        return jsonify({'ok': ok})
+def _build_static_index(root: str) -> dict:
+    files = {}
+    for cur, _dirs, names in os.walk(root):
+        for fn in names:
+            if fn.endswith(('.gz', '.br')):
+                continue
+            full = os.path.join(cur, fn)
+            rel = os.path.relpath(full, root).replace(os.sep, '/')
+            try:
+                with open(full, 'rb') as f:
+                    data = f.read()
+            except Exception:
+                continue
+            immutable = rel.startswith('assets/') and bool(_HASHED_NAME_RE.search(fn))
+            files[rel] = _static_entry(full, data, immutable)
+    return files
+
+
+def _static_index(root: str) -> dict:
+    """Return {relpath: entry} for `root`, re-indexing only when the mtime signature changed."""
+    now = time.time()
+    ent = _static_indexes.get(root)
+    if ent and now - ent['checked'] < STATIC_RESCAN_SEC:
+        return ent['files']
+    with _static_lock:
+        ent = _static_indexes.get(root)
+        if ent and now - ent['checked'] < STATIC_RESCAN_SEC:
+            return ent['files']
+        sig = _static_signature(root)
+        if ent and ent['sig'] == sig:
+            ent['checked'] = now
+            return ent['files']
+        files = _build_static_index(root) if sig else {}
+        _static_indexes[root] = {'sig': sig, 'checked': now, 'files': files}
+        return files
+
+
+def _pick_encoding(variants: dict) -> str:
+    accept = request.headers.get('Accept-Encoding', '') or ''
+    accepted = {}
+    for part in accept.split(','):
+        bits = part.strip().split(';')
+        enc = bits[0].strip().lower()
+        if not enc:
+            continue
+        q = 1.0
+        for b in bits[1:]:
+            b = b.strip()
+            if b.startswith('q='):
+                try:
+                    q = float(b[2:])
+                except Exception:
+                    q = 0.0
+        accepted[enc] = q
+    for enc in ('br', 'gzip'):
+        if enc in variants and accepted.get(enc, accepted.get('*', 0)) > 0:
+            return enc
+    return 'identity'
 
 
-    @app.route('/Dashboard/', defaults={'path': ''})
-    @app.route('/Dashboard/<path:path>')
-    def serve_dashboard_v2(path):
-        # Serve built files from dashboard_v2/dist if present, otherwise serve dev index
-        base = os.path.normpath(os.path.join(os.path.dirname(__file__), '..', 'dashboard_v2'))
-        dist = os.path.join(base, 'dist')
-        # If requested file exists under dist, serve it
-        if path:
-            cand = os.path.join(dist, path)
-            if os.path.isfile(cand):
-                return send_from_directory(dist, path)
-            # try nested static path
-            static_dir = os.path.join(base, 'src')
-            cand2 = os.path.join(static_dir, path)
-            if os.path.isfile(cand2):
-                return send_from_directory(static_dir, path)
-        # Serve dist index if available
-        indexcand = os.path.join(dist, 'index.html')
-        if os.path.isfile(indexcand):
-            return send_from_directory(dist, 'index.html')
-        # Fallback to dev index.html in project
-        dev_index = os.path.join(base, 'index.html')
-        if os.path.isfile(dev_index):
-            return send_from_directory(base, 'index.html')
-        return 'Dashboard v2 not built', 404
+def _etag_matches(etag: str) -> bool:
+    inm = request.headers.get('If-None-Match', '')
+    if not inm:
+        return False
+    if inm.strip() == '*':
+        return True
+    tags = [t.strip() for t in inm.split(',')]
+    return any(t.removeprefix('W/') == etag for t in tags)
+
+
+def _serve_static_entry(entry: dict, immutable: bool = None) -> Response:
+    """Serve one indexed file honouring Accept-Encoding and If-None-Match."""
+    if immutable is None:
+        immutable = entry['immutable']
+    enc = _pick_encoding(entry['variants'])
+    etag = '"%s%s"' % (entry['etag'], '' if enc == 'identity' else '-' + enc)
+    headers = {
+        'ETag': etag,
+        'Cache-Control': _IMMUTABLE_CACHE if immutable else _REVALIDATE_CACHE,
+        'Vary': 'Accept-Encoding',
+    }
+    if _etag_matches(etag):
+        return Response(status=304, headers=headers)
+    if enc != 'identity':
+        headers['Content-Encoding'] = enc
+    return Response(entry['variants'][enc], 200, headers, content_type=entry['ctype'])
 
 
-    # Serve dashboard v2 production assets requested from absolute `/assets/*` paths
-    @app.route('/assets/<path:path>')
-    def serve_dashboard_v2_root_assets(path):
-        base = os.path.normpath(os.path.join(os.path.dirname(__file__), '..', 'dashboard_v2'))
-        assets_dir = os.path.join(base, 'dist', 'assets')
-        cand = os.path.join(assets_dir, path)
-        if os.path.isfile(cand):
-            return send_from_directory(assets_dir, path)
-        # not found here - 404 and let other handlers handle it if needed
-        return 'Not found', 404
+def _serve_dist_file(rel: str):
+    entry = _static_index(_DASH_V2_DIST).get(rel)
+    if entry is None:
+        return None
+    return _serve_static_entry(entry)
+
+
+@app.route('/Dashboard/', defaults={'path': ''})
+@app.route('/Dashboard/<path:path>')
+def serve_dashboard_v2(path):
+    # Serve built files from dashboard_v2/dist if present, otherwise serve dev index
+    if path:
+        resp = _serve_dist_file(path)
+        if resp is not None:
+            return resp
+        # try nested static path (dev checkout without a build)
+        static_dir = os.path.join(_DASH_V2_DIR, 'src')
+        if os.path.isfile(os.path.join(static_dir, path)):
+            return send_from_directory(static_dir, path)
+    # SPA routes fall back to the dist index (revalidated via ETag, never immutable)
+    resp = _serve_dist_file('index.html')
+    if resp is not None:
+        return resp
+    # Fallback to dev index.html in project
+    if os.path.isfile(os.path.join(_DASH_V2_DIR, 'index.html')):
+        return send_from_directory(_DASH_V2_DIR, 'index.html')
+    return 'Dashboard v2 not built', 404
 
 
-    # Also handle requests that include the Dashboard prefix explicitly
-    @app.route('/Dashboard/assets/<path:path>')
-    def serve_dashboard_v2_prefixed_assets(path):
-        base = os.path.normpath(os.path.join(os.path.dirname(__file__), '..', 'dashboard_v2'))
-        assets_dir = os.path.join(base, 'dist', 'assets')
-        cand = os.path.join(assets_dir, path)
-        if os.path.isfile(cand):
-            return send_from_directory(assets_dir, path)
-        return 'Not found', 404
+# Serve dashboard v2 production assets requested from absolute `/assets/*` paths
+@app.route('/assets/<path:path>')
+def serve_dashboard_v2_root_assets(path):
+    resp = _serve_dist_file('assets/' + path)
+    if resp is not None:
+        return resp
+    return 'Not found', 404
+
+
+# Also handle requests that include the Dashboard prefix explicitly
+@app.route('/Dashboard/assets/<path:path>')
+def serve_dashboard_v2_prefixed_assets(path):
+    return serve_dashboard_v2_root_assets(path)
 
 
 @app.post('/dashboard/api/set-vm-title/<name>')
@@ -1522,80 +1902,169 @@ def dashboard_vm_favicon(name):
     return '', 302, {'Location': '/dashboard/favicon.ico'}
 
 
+# --- VM wrapper page: one prebuilt bundle + cached HTML shell ---
+# The wrapper scripts under static/js are plain JS (React.createElement, no JSX), so
+# they are concatenated once with the vendored React production builds, lightly
+# minified and fingerprinted. The page then loads a single cacheable file instead
+# of React dev builds + babel-standalone from a CDN.
+_WRAPPER_JS_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'static', 'js')
+_WRAPPER_SOURCES = (
+    'vendor/react.production.min.js',
+    'vendor/react-dom.production.min.js',
+    'api/vms.js',
+    'hooks/useVMStatus.js',
+    'components/VMFallback.jsx',
+    'main_vm_wrapper.jsx',
+)
+_wrapper_bundle = {'sig': None, 'checked': 0.0, 'fp': '', 'entry': None}
+_wrapper_shells = {}
+_WRAPPER_SHELL_MAX = 512
+
+
+def _minify_js(src: str) -> str:
+    """Conservative minify for our own wrapper sources: drop indentation, blank lines
+    and whole-line // comments. Never touches code inside a line."""
+    out = []
+    for line in src.splitlines():
+        t = line.strip()
+        if not t or t.startswith('//'):
+            continue
+        out.append(t)
+    return '\n'.join(out)
+
+
+def _wrapper_bundle_entry():
+    """Return (fingerprint, static entry) for the wrapper bundle, rebuilding on source change."""
+    now = time.time()
+    b = _wrapper_bundle
+    if b['entry'] is not None and now - b['checked'] < STATIC_RESCAN_SEC:
+        return b['fp'], b['entry']
+    with _static_lock:
+        paths = [os.path.join(_WRAPPER_JS_DIR, rel) for rel in _WRAPPER_SOURCES]
+        sig = []
+        for p in paths:
+            try:
+                sig.append(os.stat(p).st_mtime_ns)
+            except Exception:
+                sig.append(None)
+        sig = tuple(sig)
+        if b['entry'] is not None and b['sig'] == sig:
+            b['checked'] = now
+            return b['fp'], b['entry']
+        if None in sig:
+            return '', None
+        parts = []
+        for rel, p in zip(_WRAPPER_SOURCES, paths):
+            with open(p, 'r', encoding='utf-8') as f:
+                src = f.read()
+            parts.append(src if rel.startswith('vendor/') else _minify_js(src))
+        data = ';\n'.join(parts).encode('utf-8')
+        entry = _static_entry('vm-wrapper.js', data, immutable=True)
+        b.update({'sig': sig, 'checked': now, 'fp': entry['etag'][:12], 'entry': entry})
+        _wrapper_shells.clear()
+        return b['fp'], entry
+
+
+@app.get('/dashboard/static/vm-wrapper-<fp>.js')
+def dashboard_vm_wrapper_bundle(fp):
+    cur, entry = _wrapper_bundle_entry()
+    if entry is None:
+        abort(404)
+    # A stale fingerprint still gets the current bundle, but must not be cached forever
+    return _serve_static_entry(entry, immutable=(fp == cur))
+
+
+def _vm_favicon_url(name: str, cfg: dict) -> str:
+    vm_fav_path = os.path.join(_state_dir(), 'dashboard', 'vm-fav', f"{re.sub(r'[^A-Za-z0-9_-]', '_', name)}.ico")
+    if os.path.isfile(vm_fav_path):
+        # version by mtime (not wall clock) so the rendered shell stays cacheable
+        return f'/dashboard/vm-favicon/{name}.ico?v={int(os.path.getmtime(vm_fav_path))}'
+    fav_local = os.path.join(_state_dir(), 'dashboard', 'favicon.ico')
+    if os.path.isfile(fav_local):
+        return '/dashboard/favicon.ico'
+    return cfg.get('favicon', '')
+
+
 @app.get('/dashboard/vm/<name>/')
 def dashboard_vm_wrapper(name):
-        # Public wrapper page that opens the VM inside an iframe while setting the tab title and favicon.
-        # We render a small client-side React app that will show either the iframe (when VM is running)
-        # or a full-screen fallback UI when the VM is stopped/unreachable.
-        url = _build_vm_url(name) or ''
-        cfg = _load_dashboard_settings()
-        vm_titles = cfg.get('vm_titles', {}) if isinstance(cfg.get('vm_titles', {}), dict) else {}
-        title = vm_titles.get(name) or f"EpicVM - {name}"
-        vm_fav_path = os.path.join(_state_dir(), 'dashboard', 'vm-fav', f"{re.sub(r'[^A-Za-z0-9_-]', '_', name)}.ico")
-        if os.path.isfile(vm_fav_path):
-                fav_url = f'/dashboard/vm-favicon/{name}.ico?v={int(time.time())}'
-        else:
-                fav_local = os.path.join(_state_dir(), 'dashboard', 'favicon.ico')
-                if os.path.isfile(fav_local):
-                        fav_url = '/dashboard/favicon.ico'
-                else:
-                        fav_url = cfg.get('favicon','')
+    # Public wrapper page that opens the VM inside an iframe while setting the tab title and favicon.
+    # We render a small client-side React app that will show either the iframe (when VM is running)
+    # or a full-screen fallback UI when the VM is stopped/unreachable.
+    url = _build_vm_url(name) or ''
+    cfg = _load_dashboard_settings()
+    vm_titles = cfg.get('vm_titles', {}) if isinstance(cfg.get('vm_titles', {}), dict) else {}
+    title = vm_titles.get(name) or f"EpicVM - {name}"
+    fav_url = _vm_favicon_url(name, cfg)
+    fp, _entry = _wrapper_bundle_entry()
+
+    key = (name, title, fav_url, url, fp)
+    shell = _wrapper_shells.get(key)
+    if shell is None:
+        shell = _render_vm_wrapper_shell(name, title, fav_url, url, fp)
+        if len(_wrapper_shells) >= _WRAPPER_SHELL_MAX:
+            _wrapper_shells.clear()
+        _wrapper_shells[key] = shell
+    headers = {'ETag': shell['etag'], 'Cache-Control': _REVALIDATE_CACHE}
+    if _etag_matches(shell['etag']):
+        return Response(status=304, headers=headers)
+    return Response(shell['body'], 200, headers, content_type='text/html; charset=utf-8')
+
+
+def _render_vm_wrapper_shell(name: str, title: str, fav_url: str, url: str, fp: str) -> dict:
+    # Safely embed necessary values for the client script
+    js_url = json.dumps(url)
+    js_name = json.dumps(name)
+    fav_link = f'<link rel="icon" href="{html.escape(fav_url)}" />' if fav_url else ''
+    if fp:
+        scripts = f'<script src="/dashboard/static/vm-wrapper-{fp}.js"></script>'
+    else:
+        # Vendored React missing: load the plain-JS sources individually from the local static dir
+        scripts = '\n'.join(f'<script src="/static/js/{rel}"></script>' for rel in _WRAPPER_SOURCES)
+    tmpl = """<!doctype html>
+<html>
+<head>
+<meta charset="utf-8">
+<meta name="viewport" content="width=device-width,initial-scale=1">
+<title>__TITLE__</title>
+__FAV__
+<style>
+html,body,#root{height:100%;margin:0}
+body{font-family:system-ui,Arial;background:#000;color:#fff}
+.vm-iframe{position:fixed;top:0;left:0;width:100%;height:100%;border:none;background:#000}
+.fallback{display:flex;align-items:center;justify-content:center;height:100%;background:#0b1020;color:#fff}
+.card{max-width:720px;padding:28px;border-radius:8px;text-align:center;background:linear-gradient(180deg,rgba(255,255,255,0.03),rgba(255,255,255,0.01));box-shadow:0 8px 30px rgba(2,6,23,0.6)}
+.vm-name{font-size:28px;margin-bottom:14px}
+.btn-primary{background:#2563eb;color:#fff;border:none;padding:12px 20px;border-radius:8px;font-size:16px;cursor:pointer}
+.btn-secondary{background:#374151;color:#fff;border:none;padding:8px 12px;border-radius:6px;font-size:14px;cursor:pointer}
+.muted{opacity:.8;color:#9ca3af;margin-top:10px}
+.errbox{background:#7f1d1d;color:#ffdede;padding:10px;border-radius:6px;margin-top:12px}
+.spinner{width:48px;height:48px;border-radius:50%;border:6px solid rgba(255,255,255,0.12);border-top-color:#60a5fa;animation:spin 1s linear infinite;margin:14px auto}
+@keyframes spin{to{transform:rotate(360deg)}}
+.fade-enter{opacity:0;transform:translateY(6px)}
+.fade-enter-active{opacity:1;transform:none;transition:opacity .25s,transform .25s}
+</style>
+</head>
+<body>
+<div id="root"></div>
+<iframe id="vmframe" class="vm-iframe" src=__JS_URL__ style="display:none"></iframe>
+<script>window.__VM_WRAPPER_INIT = { vmname: __JS_NAME__, vmurl: __JS_URL__ };</script>
+__SCRIPTS__
+</body>
+</html>
+"""
+    page = (tmpl.replace('__TITLE__', html.escape(title)).replace('__FAV__', fav_link)
+            .replace('__JS_URL__', js_url).replace('__JS_NAME__', js_name).replace('__SCRIPTS__', scripts))
+    body = page.encode('utf-8')
+    return {'body': body, 'etag': '"%s"' % hashlib.sha1(body).hexdigest()[:20]}
 
-        # Safely embed necessary values for the client script
-        try:
-                js_title = json.dumps(title)
-                js_fav = json.dumps(fav_url)
-                js_url = json.dumps(url)
-                js_name = json.dumps(name)
-        except Exception:
-                js_title = '"%s"' % (title.replace('"','\"'))
-                js_fav = '"%s"' % (fav_url.replace('"','\"'))
-                js_url = '"%s"' % (url.replace('"','\"'))
-                js_name = '"%s"' % (name.replace('"','\"'))
-
-        # The page includes React + Babel via CDN so we can write a compact React component
-        # for the fallback UI without changing the project's build pipeline.
-        fav_link = f'<link rel="icon" href="{fav_url}" />' if fav_url else ''
-        tmpl = '''<!doctype html>
-    <html>
-        <head>
-            <meta charset="utf-8">
-            <meta name="viewport" content="width=device-width,initial-scale=1">
-            <title>__TITLE__</title>
-            __FAV__
-            <style>
-                html,body,#root{height:100%;margin:0}
-                body{font-family:system-ui,Arial;background:#000;color:#fff}
-                .vm-iframe{position:fixed;top:0;left:0;width:100%;height:100%;border:none;background:#000}
-                .fallback{display:flex;align-items:center;justify-content:center;height:100%;background:#0b1020;color:#fff}
-                .card{max-width:720px;padding:28px;border-radius:8px;text-align:center;background:linear-gradient(180deg,rgba(255,255,255,0.03),rgba(255,255,255,0.01));box-shadow:0 8px 30px rgba(2,6,23,0.6)}
-                .vm-name{font-size:28px;margin-bottom:14px}
-                .btn-primary{background:#2563eb;color:#fff;border:none;padding:12px 20px;border-radius:8px;font-size:16px;cursor:pointer}
-                .btn-secondary{background:#374151;color:#fff;border:none;padding:8px 12px;border-radius:6px;font-size:14px;cursor:pointer}
-                .muted{opacity:.8;color:#9ca3af;margin-top:10px}
-                .errbox{background:#7f1d1d;color:#ffdede;padding:10px;border-radius:6px;margin-top:12px}
-                .spinner{width:48px;height:48px;border-radius:50%;border:6px solid rgba(255,255,255,0.12);border-top-color:#60a5fa;animation:spin 1s linear infinite;margin:14px auto}
-                @keyframes spin{to{transform:rotate(360deg)}}
-                .fade-enter{opacity:0;transform:translateY(6px)}
-                .fade-enter-active{opacity:1;transform:none;transition:opacity .25s,transform .25s}
-            </style>
-        </head>
-        <body>
-            <div id="root"></div>
-            <iframe id="vmframe" class="vm-iframe" src=__JS_URL__ style="display:none"></iframe>
-            <script>window.__VM_WRAPPER_INIT = { vmname: __JS_NAME__, vmurl: __JS_URL__ };</script>
-            <script crossorigin src="https://unpkg.com/react@18/umd/react.development.js"></script>
-            <script crossorigin src="https://unpkg.com/react-dom@18/umd/react-dom.development.js"></script>
-            <script src="https://unpkg.com/babel-standalone@6.26.0/babel.min.js"></script>
-            <script type="text/babel" src="/static/js/api/vms.js"></script>
-            <script type="text/babel" src="/static/js/hooks/useVMStatus.js"></script>
-            <script type="text/babel" src="/static/js/components/VMFallback.jsx"></script>
-            <script type="text/babel" src="/static/js/main_vm_wrapper.jsx"></script>
-        </body>
-    </html>
-    '''
-        page = tmpl.replace('__TITLE__', title).replace('__FAV__', fav_link).replace('__JS_URL__', js_url).replace('__JS_NAME__', js_name)
-        return page
+
+# Index the v2 build and assemble the wrapper bundle once at startup so the first
+# page load does not pay for it.
+try:
+    _static_index(_DASH_V2_DIST)
+    _wrapper_bundle_entry()
+except Exception:
+    pass
 
 
 # Register an alias route under the configured base path (e.g. /vm/<name>/) so merged-mode
@@ -1733,6 +2202,7 @@ def api_set_domain():
         start_v2_dashboard()
     else:
         stop_v2_dashboard()
+    _v2_wake.set()
     # If caller requested, also apply merged/domain-mode settings so domain routing will be used.
     apply_mode = request.values.get('apply') in ('1','true','yes')
     if apply_mode:
@@ -1832,7 +2302,7 @@ def _enable_single_port(port: int):
             '--label', 'traefik.http.routers.blobe-dashboard.entrypoints=web',
             '--label', 'traefik.http.services.blobe-dashboard.loadbalancer.server.port=5000',
             'python:3.11-slim',
-            'bash', '-c', 'pip install --no-cache-dir flask && python /app/app.py')
+            'bash', '-c', 'pip install --no-cache-dir flask simple-websocket && python /app/app.py')
 
     # Recreate VM containers into proxy network
     inst_root = os.path.join(_state_dir(), 'instances')
@@ -1898,6 +2368,7 @@ def _disable_single_port(dash_port: int | None):
         '-p', f'{port}:4173',
         '-v', f'{dist_path}:/usr/share/nginx/html:ro',
         'nginx:alpine')
+    _v2_wake.set()
 
 
 @app.get('/dashboard')
@@ -1915,16 +2386,9 @@ def root():
     # Only show v2 dashboard link if custom domain is set and container is running
     dashboard_v2_url = None
     try:
-        env = _read_env()
-        domain = env.get('BLOBEVM_DOMAIN', '')
-        if domain:
-            # Check if container is running
-            r = subprocess.run([
-                'docker', 'ps', '-q', '-f', 'name=^blobedash-v2$'
-            ], capture_output=True, text=True)
-            cid = r.stdout.strip()
-            if cid:
-                dashboard_v2_url = f'http://{domain}/Dashboard'
+        st = _v2_status()
+        if st['container'] == 'running':
+            dashboard_v2_url = st['url']
     except Exception:
         dashboard_v2_url = None
 
@@ -1933,7 +2397,10 @@ def root():
 @app.get('/dashboard/api/list')
 @auth_required
 def api_list():
-    return jsonify({'instances': manager_json_list()})
+    # URLs are built from the caller's host in direct mode, so the host is part of the key
+    payload, code = _single_flight('list', 'list:' + _request_host(),
+                                   lambda: ({'instances': manager_json_list()}, 200))
+    return jsonify(payload), code
 
 @app.post('/dashboard/api/create')
 @auth_required
@@ -1953,11 +2420,15 @@ def api_create():
             return jsonify({'ok': False, 'error': result.stderr.strip() or 'Error creating VM.'}), 500
         # Auto-start after creation
         subprocess.run([MANAGER, 'start', name], capture_output=True)
+        _cache_invalidate('list:')
+        _cache_invalidate('vmstatus:')
     except FileNotFoundError:
         return jsonify({'ok': False, 'error': 'blobe-vm-manager not found in container. Make sure it is installed and mounted.'}), 500
     except Exception as e:
         return jsonify({'ok': False, 'error': f'Error creating VM: {e}'}), 500
-    return jsonify({'ok': True})
+    # "Claimed warm pool entry ... in Nms" when the VM came from the warm pool
+    m = re.search(r'Claimed warm pool entry \S+ for .* in (\d+)ms', result.stdout or '')
+    return jsonify({'ok': True, 'warm': bool(m), 'claim_ms': int(m.group(1)) if m else None})
 
 @app.post('/dashboard/api/start/<name>')
 @auth_required
@@ -1973,6 +2444,8 @@ def api_start(name):
         pass
     try:
         result = subprocess.run([MANAGER, 'start', name], capture_output=True, text=True)
+        _cache_invalidate('list:')
+        _cache_invalidate('vmstatus:')
         if result.returncode != 0:
             return jsonify({'ok': False, 'error': result.stderr.strip() or 'Failed to start VM'}), 500
         return jsonify({'ok': True})
@@ -1982,20 +2455,143 @@ def api_start(name):
         return jsonify({'ok': False, 'error': str(e)}), 500
 
 
+def _parse_docker_time(ts: str) -> float:
+    """Parse Docker's RFC3339Nano timestamps (e.g. 2024-05-01T10:00:00.123456789Z) to epoch."""
+    try:
+        if not ts or ts.startswith('0001-'):
+            return 0.0
+        return datetime.datetime.strptime(ts[:19], '%Y-%m-%dT%H:%M:%S').replace(tzinfo=datetime.timezone.utc).timestamp()
+    except Exception:
+        return 0.0
+
+
+def _vm_status_snapshot():
+    """Status of every blobevm_* container from one `docker ps` + one `docker inspect`,
+    regardless of how many VMs exist. Returns (payload, status) for _single_flight."""
+    r = _docker('ps', '-a', '--filter', 'name=^blobevm_', '--format', '{{.ID}}|{{.Names}}|{{.Status}}')
+    if r.returncode != 0:
+        return {'ok': False, 'error': r.stderr.strip() or 'docker error'}, 500
+    vms = {}
+    ids = []
+    for line in r.stdout.splitlines():
+        parts = line.strip().split('|', 2)
+        if len(parts) < 3 or not parts[1].startswith('blobevm_'):
+            continue
+        ids.append(parts[0])
+        vms[parts[1][len('blobevm_'):]] = {'status': parts[2], 'state': '', 'uptime': 0, 'health': 'none', 'port': ''}
+    if ids:
+        ri = _docker('inspect', *ids)
+        try:
+            details = json.loads(ri.stdout or '[]')
+        except Exception:
+            details = []
+        now = time.time()
+        for c in details:
+            name = (c.get('Name') or '').lstrip('/')[len('blobevm_'):]
+            it = vms.get(name)
+            if it is None:
+                continue
+            st = c.get('State') or {}
+            it['state'] = st.get('Status', '')
+            if st.get('Running'):
+                started = _parse_docker_time(st.get('StartedAt', ''))
+                it['uptime'] = int(now - started) if started else 0
+            it['health'] = (st.get('Health') or {}).get('Status') or 'none'
+            binds = ((c.get('NetworkSettings') or {}).get('Ports') or {}).get('3000/tcp') or []
+            if binds:
+                it['port'] = binds[0].get('HostPort', '') or ''
+    # VMs the optimizer's idle guard paused/stopped and hibernated VMs; the VM wrapper
+    # wakes these on open
+    for vm, rec in dash_optimizer.suspended_vms().items():
+        if vm in vms:
+            vms[vm]['suspended'] = rec.get('state', '')
+    try:
+        for vm in os.listdir(os.path.join(_state_dir(), 'checkpoints')):
+            if vm in vms and vms[vm]['state'] == 'exited':
+                vms[vm]['suspended'] = 'hibernated'
+    except Exception:
+        pass
+    return {'ok': True, 'vms': vms, 'ts': int(time.time())}, 200
+
+
+@app.get('/dashboard/api/vm/status')
+@auth_required
+def api_vm_status_batch():
+    """Status, uptime, health and port for many VMs in one call.
+    ?names=a,b,c returns those VMs (missing ones as 'not-found'); ?names=* returns all.
+    """
+    try:
+        payload, code = _single_flight('vmstatus', 'vmstatus:', _vm_status_snapshot)
+        if code != 200:
+            return jsonify(payload), code
+        raw = (request.args.get('names') or '*').strip()
+        allvms = payload['vms']
+        if raw == '*':
+            vms = allvms
+        else:
+            names = [n.strip() for n in raw.split(',') if n.strip()]
+            vms = {n: allvms.get(n, {'status': 'not-found'}) for n in names}
+        return jsonify({'ok': True, 'vms': vms, 'ts': payload['ts']})
+    except Exception as e:
+        return jsonify({'ok': False, 'error': str(e)}), 500
+
+
 @app.get('/dashboard/api/vm/<name>/status')
 @auth_required
 def api_vm_status(name):
     """Return status string for the VM container (e.g., 'Up Xs', 'Exited (0) Y ago')."""
     try:
-        cname = f'blobevm_{name}'
-        r = _docker('ps', '-a', '--filter', f'name=^{cname}$', '--format', '{{.Status}}')
-        if r.returncode != 0:
-            return jsonify({'ok': False, 'error': r.stderr.strip() or 'docker error'}), 500
-        status = r.stdout.strip()
-        if not status:
+        payload, code = _single_flight('vmstatus', 'vmstatus:', _vm_status_snapshot)
+        if code != 200:
+            return jsonify(payload), code
+        it = payload['vms'].get(name)
+        if not it:
             # container not found
             return jsonify({'ok': True, 'status': 'not-found'})
-        return jsonify({'ok': True, 'status': status})
+        return jsonify({'ok': True, 'status': it['status']})
+    except Exception as e:
+        return jsonify({'ok': False, 'error': str(e)}), 500
+
+@app.post('/dashboard/api/vm/<name>/wake')
+@auth_required
+def api_vm_wake(name):
+    """Resume a VM paused or stopped by the idle guard; returns the resume latency."""
+    try:
+        r = dash_optimizer.wake(name)
+        _cache_invalidate('list:')
+        _cache_invalidate('vmstatus:')
+        return jsonify(r), (200 if r.get('ok') else 404 if r.get('error') == 'not found' else 500)
+    except Exception as e:
+        return jsonify({'ok': False, 'error': str(e)}), 500
+
+
+@app.post('/dashboard/api/vm/<name>/hibernate')
+@auth_required
+def api_vm_hibernate(name):
+    """Checkpoint a running VM to disk (CRIU) and stop it; wake/start restores it."""
+    ok, out, err, _ = _run_manager('hibernate', name)
+    _cache_invalidate('list:')
+    _cache_invalidate('vmstatus:')
+    return jsonify({'ok': ok, 'output': out, 'error': err}), (200 if ok else 400)
+
+
+@app.get('/dashboard/api/hibernate')
+@auth_required
+def api_hibernate_status():
+    """Hibernated VMs, checkpoint disk budget use, and checkpoint/restore times."""
+    ok, out, err, _ = _run_manager('hibernate-status')
+    try:
+        return jsonify({'ok': ok, **json.loads(out)})
+    except Exception:
+        return jsonify({'ok': False, 'error': err or out or 'hibernate-status failed'}), 500
+
+
+@app.get('/dashboard/api/idle')
+@auth_required
+def api_idle():
+    """Idle suspend report: suspended VMs, reclaimed memory and resume latency."""
+    try:
+        return jsonify({'ok': True, **dash_optimizer.idle_status()})
     except Exception as e:
         return jsonify({'ok': False, 'error': str(e)}), 500
 
@@ -2003,12 +2599,16 @@ def api_vm_status(name):
 @auth_required
 def api_stop(name):
     subprocess.check_call([MANAGER, 'stop', name])
+    _cache_invalidate('list:')
+    _cache_invalidate('vmstatus:')
     return jsonify({'ok': True})
 
 @app.post('/dashboard/api/delete/<name>')
 @auth_required
 def api_delete(name):
     subprocess.check_call([MANAGER, 'delete', name])
+    _cache_invalidate('list:')
+    _cache_invalidate('vmstatus:')
     return jsonify({'ok': True})
 
 
@@ -2214,12 +2814,17 @@ def dashboard_v2_vm_stats():
     """Return per-VM CPU and memory percentages by calling `docker stats --no-stream`.
     The result maps VM name (without the `blobevm_` prefix) to {'cpu_percent': float, 'mem_percent': float}.
     """
+    payload, code = _single_flight('vmstats', 'vmstats:', _vm_stats_payload)
+    return jsonify(payload), code
+
+
+def _vm_stats_payload():
     try:
         out = subprocess.check_output(['docker', 'stats', '--no-stream', '--format', '{{.Name}}|{{.CPUPerc}}|{{.MemPerc}}'], text=True)
     except subprocess.CalledProcessError as e:
-        return jsonify({'ok': False, 'error': str(e), 'output': getattr(e, 'output', '')}), 500
+        return {'ok': False, 'error': str(e), 'output': getattr(e, 'output', '')}, 500
     except Exception as e:
-        return jsonify({'ok': False, 'error': str(e)}), 500
+        return {'ok': False, 'error': str(e)}, 500
     stats = {}
     try:
         for line in out.splitlines():
@@ -2248,9 +2853,9 @@ def dashboard_v2_vm_stats():
                 stats[vmname] = {'cpu_percent': round(cpu,2), 'mem_percent': round(mem,2), 'container_name': cname}
             except Exception:
                 continue
-        return jsonify({'ok': True, 'vms': stats})
+        return {'ok': True, 'vms': stats}, 200
     except Exception as e:
-        return jsonify({'ok': False, 'error': str(e)}), 500
+        return {'ok': False, 'error': str(e)}, 500
 
 
 @app.get('/dashboard/api/vm/stats')
@@ -2300,37 +2905,40 @@ def dashboard_v2_info_alias():
     return dashboard_v2_info()
 
 
+EXEC_JOB_TIMEOUT_SEC = float(os.environ.get('BLOBEDASH_EXEC_JOB_TIMEOUT', '3600') or 3600)
+# VM names are used in Engine API paths (blobevm_<name>); same rule as the manager
+_VM_NAME_RE = re.compile(r'[A-Za-z0-9._-]+')
+
+
 @app.post('/Dashboard/api/vm/exec/<name>')
 @v2_auth_required
 def dashboard_v2_vm_exec(name):
     """Execute a single command inside the VM container named `blobevm_<name>`.
-    Expects JSON payload: {"cmd": "<command string>"} and returns stdout/stderr.
-    This is intended for short-lived commands (timeout 10s) and requires the
-    Flask process to have access to the host Docker CLI.
+    Expects JSON payload: {"cmd": "<command string>", "wait": <seconds, default 10>}
+    and returns stdout/stderr. The command runs as an exec job: if it is still
+    running after `wait` seconds the response is 202 with the job id and the
+    output so far, and the job keeps going (see /Dashboard/api/exec/jobs/<id>).
     """
+    if not _VM_NAME_RE.fullmatch(name):
+        return jsonify({'ok': False, 'error': 'invalid vm name'}), 400
     try:
         data = request.get_json(force=True, silent=True) or {}
         cmd = data.get('cmd') if isinstance(data, dict) else None
         if not cmd or not isinstance(cmd, str):
             return jsonify({'ok': False, 'error': 'missing cmd'}), 400
-        cname = f'blobevm_{name}'
-        # Try bash first, fallback to sh
-        exec_cmds = [
-            ['docker', 'exec', cname, '/bin/bash', '-lc', cmd],
-            ['docker', 'exec', cname, '/bin/sh', '-lc', cmd]
-        ]
-        last_exc = None
-        for ec in exec_cmds:
-            try:
-                proc = subprocess.run(ec, capture_output=True, text=True, timeout=10)
-                return jsonify({'ok': proc.returncode == 0, 'returncode': proc.returncode, 'output': proc.stdout, 'error_output': proc.stderr})
-            except subprocess.TimeoutExpired as e:
-                return jsonify({'ok': False, 'error': 'timeout', 'output': getattr(e, 'output', ''), 'stderr': getattr(e, 'stderr', '')}), 504
-            except Exception as e:
-                last_exc = e
-                continue
-        # If we get here, no exec succeeded
-        return jsonify({'ok': False, 'error': str(last_exc) if last_exc else 'exec failed'}), 500
+        try:
+            wait = max(0.0, min(float(data.get('wait', 10)), 60.0))
+        except Exception:
+            wait = 10.0
+        jid = exec_jobs.start_job(name, cmd, timeout=EXEC_JOB_TIMEOUT_SEC)
+        j = exec_jobs.wait_job(jid, wait)
+        if j['state'] == 'running':
+            return jsonify({'ok': False, 'error': 'running', 'job': jid, 'output': j['output'],
+                            'error_output': j['error_output'], 'truncated': j['truncated']}), 202
+        if j['state'] == 'error':
+            return jsonify({'ok': False, 'error': j['error'] or 'exec failed', 'job': jid}), 500
+        return jsonify({'ok': j['exit_code'] == 0, 'returncode': j['exit_code'], 'output': j['output'],
+                        'error_output': j['error_output'], 'truncated': j['truncated'], 'job': jid})
     except Exception as e:
         return jsonify({'ok': False, 'error': str(e)}), 500
 
@@ -2341,31 +2949,229 @@ def dashboard_v2_vm_exec_alias(name):
     return dashboard_v2_vm_exec(name)
 
 
-@app.post('/dashboard/api/reset/<name>')
-@auth_required
-def api_reset(name):
-    """Reset a VM by deleting it and creating a fresh instance.
-    This runs in the background and returns immediately. Caller must ensure
-    they really want to purge instance data.
+def _sse_response(events):
+    """Wrap exec_jobs event tuples as a text/event-stream response."""
+    def gen():
+        for kind, data in events:
+            if kind == 'ping':
+                yield ': ping\n\n'
+                continue
+            head = f"id: {data['seq']}\n" if kind == 'output' else ''
+            yield f"{head}event: {kind}\ndata: {json.dumps(data)}\n\n"
+    return Response(gen(), mimetype='text/event-stream',
+                    headers={'Cache-Control': 'no-cache', 'X-Accel-Buffering': 'no'})
+
+
+@app.post('/Dashboard/api/exec/jobs')
+@app.post('/dashboard/api/exec/jobs')
+@v2_auth_required
+def api_exec_job_start():
+    """Start a long-running exec job: {"vm": name, "cmd": "...", "timeout": seconds}."""
+    data = request.get_json(force=True, silent=True) or {}
+    vm = str(data.get('vm') or '').strip()
+    cmd = data.get('cmd')
+    if not vm or not cmd or not isinstance(cmd, str):
+        return jsonify({'ok': False, 'error': 'vm and cmd required'}), 400
+    if not _VM_NAME_RE.fullmatch(vm):
+        return jsonify({'ok': False, 'error': 'invalid vm name'}), 400
+    try:
+        timeout = min(float(data.get('timeout') or EXEC_JOB_TIMEOUT_SEC), EXEC_JOB_TIMEOUT_SEC)
+        jid = exec_jobs.start_job(vm, cmd, timeout=timeout)
+        return jsonify({'ok': True, 'job': jid})
+    except Exception as e:
+        return jsonify({'ok': False, 'error': str(e)}), 500
+
+
+@app.get('/Dashboard/api/exec/jobs/<job_id>')
+@app.get('/dashboard/api/exec/jobs/<job_id>')
+@v2_auth_required
+def api_exec_job_get(job_id):
+    j = exec_jobs.get_job(job_id)
+    if not j:
+        return jsonify({'ok': False, 'error': 'not found'}), 404
+    return jsonify({'ok': True, 'job': j})
+
+
+@app.get('/Dashboard/api/exec/jobs/<job_id>/stream')
+@app.get('/dashboard/api/exec/jobs/<job_id>/stream')
+@v2_auth_required
+def api_exec_job_stream(job_id):
+    """Server-sent events: `output` events ({seq, stream, data}) then one `exit` event.
+    Reconnecting clients resume via Last-Event-ID or ?since=<seq>."""
+    if not exec_jobs.get_job(job_id, with_output=False):
+        return jsonify({'ok': False, 'error': 'not found'}), 404
+    try:
+        since = int(request.headers.get('Last-Event-ID') or request.args.get('since') or 0)
+    except Exception:
+        since = 0
+    return _sse_response(exec_jobs.stream_job(job_id, since))
+
+
+@app.post('/Dashboard/api/exec/jobs/<job_id>/cancel')
+@app.post('/dashboard/api/exec/jobs/<job_id>/cancel')
+@v2_auth_required
+def api_exec_job_cancel(job_id):
+    return jsonify({'ok': exec_jobs.cancel_job(job_id)})
+
+
+@app.post('/Dashboard/api/exec/fanout')
+@app.post('/dashboard/api/exec/fanout')
+@v2_auth_required
+def api_exec_fanout():
+    """Run one command across VMs: {"names": [..] | "*", "cmd": "...", "parallel": 4, "timeout": s}.
+    "*" targets every running VM."""
+    data = request.get_json(force=True, silent=True) or {}
+    cmd = data.get('cmd')
+    names = data.get('names')
+    if not cmd or not isinstance(cmd, str):
+        return jsonify({'ok': False, 'error': 'missing cmd'}), 400
+    try:
+        if names == '*':
+            payload, code = _single_flight('vmstatus', 'vmstatus:', _vm_status_snapshot)
+            if code != 200:
+                return jsonify(payload), code
+            names = sorted(n for n, it in payload['vms'].items() if it.get('state') == 'running')
+        if not isinstance(names, list) or not names:
+            return jsonify({'ok': False, 'error': 'names required'}), 400
+        names = [str(n).strip() for n in names if str(n).strip()]
+        bad = [n for n in names if not _VM_NAME_RE.fullmatch(n)]
+        if bad:
+            return jsonify({'ok': False, 'error': 'invalid vm name', 'names': bad}), 400
+        timeout = min(float(data.get('timeout') or EXEC_JOB_TIMEOUT_SEC), EXEC_JOB_TIMEOUT_SEC)
+        fid = exec_jobs.start_fanout(names, cmd, parallel=data.get('parallel') or 4, timeout=timeout)
+        return jsonify({'ok': True, 'fanout': fid, 'names': names})
+    except Exception as e:
+        return jsonify({'ok': False, 'error': str(e)}), 500
+
+
+@app.get('/Dashboard/api/exec/fanout/<fanout_id>')
+@app.get('/dashboard/api/exec/fanout/<fanout_id>')
+@v2_auth_required
+def api_exec_fanout_get(fanout_id):
+    f = exec_jobs.get_fanout(fanout_id, with_output=request.args.get('output', '1') not in ('0', 'false'))
+    if not f:
+        return jsonify({'ok': False, 'error': 'not found'}), 404
+    return jsonify({'ok': True, 'fanout': f})
+
+
+class _HijackedResponse(Response):
+    """Returned after a WebSocket took over the connection: tells the Werkzeug
+    server the socket is gone instead of writing an HTTP response onto it."""
+    def __call__(self, environ, start_response):
+        raise ConnectionError('websocket closed')
+
+
+@app.route('/Dashboard/api/vm/shell/<name>', websocket=True)
+@app.route('/dashboard/api/vm/shell/<name>', websocket=True)
+@v2_auth_required
+def api_vm_shell(name):
+    """Interactive shell over WebSocket (?cols=&rows= for the initial size).
+    Client -> server: binary frames are raw keystrokes; text frames are JSON
+    {"type": "input", "data"} / {"type": "resize", "cols", "rows"} / {"type": "ping"}.
+    Server -> client: binary frames are terminal output; text frames are JSON
+    {"type": "ready", "session"} / {"type": "exit"} / {"type": "closed", "reason"}.
     """
+    if not _VM_NAME_RE.fullmatch(name):
+        return jsonify({'ok': False, 'error': 'invalid vm name'}), 400
+    if WSServer is None:
+        return jsonify({'ok': False, 'error': 'simple-websocket not installed'}), 501
     try:
-        def worker(vm_name):
-            try:
-                # Use manager delete which should remove container and instance data
-                subprocess.run([MANAGER, 'delete', vm_name], capture_output=True, text=True)
-            except Exception:
-                pass
+        cols = int(request.args.get('cols', 80))
+        rows = int(request.args.get('rows', 24))
+    except Exception:
+        cols, rows = 80, 24
+    sess, err = shell_sessions.open_session(name, cols, rows)
+    if not sess:
+        return jsonify({'ok': False, 'error': err}), 429 if err.startswith('too many') else 500
+    try:
+        ws = WSServer.accept(request.environ) if hasattr(WSServer, 'accept') else WSServer(request.environ)
+    except Exception as e:
+        shell_sessions.close_session(sess)
+        return jsonify({'ok': False, 'error': f'websocket handshake failed: {e}'}), 400
+    send_lock = threading.Lock()
+
+    def send(data):
+        with send_lock:
+            ws.send(data)
+
+    def pump():
+        while True:
+            data = shell_sessions.read(sess)
+            if not data:
+                break
             try:
-                # Create a fresh instance and start it
-                subprocess.run([MANAGER, 'create', vm_name], capture_output=True, text=True)
+                send(data)
             except Exception:
-                pass
+                break
+        try:
+            send(json.dumps({'type': 'exit'}))
+            ws.close()
+        except Exception:
+            pass
+
+    try:
+        send(json.dumps({'type': 'ready', 'session': sess['id']}))
+        t = threading.Thread(target=pump, daemon=True)
+        t.start()
+        while t.is_alive():
+            msg = ws.receive(timeout=5)
+            if msg is None:
+                if shell_sessions.idle_for(sess) > shell_sessions.SHELL_IDLE_SEC:
+                    send(json.dumps({'type': 'closed', 'reason': 'idle'}))
+                    break
+                continue
+            if isinstance(msg, bytes):
+                shell_sessions.write(sess, msg)
+                continue
             try:
-                subprocess.run([MANAGER, 'start', vm_name], capture_output=True, text=True)
+                m = json.loads(msg)
             except Exception:
-                pass
-        threading.Thread(target=worker, args=(name,), daemon=True).start()
-        return jsonify({'ok': True, 'started': True})
+                continue
+            typ = m.get('type') if isinstance(m, dict) else None
+            if typ == 'input':
+                shell_sessions.write(sess, str(m.get('data', '')).encode('utf-8'))
+            elif typ == 'resize':
+                try:
+                    shell_sessions.resize(sess, m.get('cols', cols), m.get('rows', rows))
+                except Exception:
+                    pass
+            elif typ == 'ping':
+                shell_sessions.touch(sess)
+    except WSClosed:
+        pass
+    except Exception:
+        pass
+    finally:
+        shell_sessions.close_session(sess)
+        try:
+            ws.close()
+        except Exception:
+            pass
+    return _HijackedResponse()
+
+
+@app.get('/Dashboard/api/shell/sessions')
+@app.get('/dashboard/api/shell/sessions')
+@v2_auth_required
+def api_shell_sessions():
+    return jsonify({'ok': True, 'sessions': shell_sessions.list_sessions(),
+                    'limits': {'per_vm': shell_sessions.SHELL_MAX_PER_VM, 'total': shell_sessions.SHELL_MAX_TOTAL,
+                               'idle_sec': shell_sessions.SHELL_IDLE_SEC}})
+
+
+@app.post('/dashboard/api/reset/<name>')
+@auth_required
+def api_reset(name):
+    """Reset a VM's /config to the base config (or to a snapshot given as JSON
+    `snapshot`) and restart it. Routing and port settings are kept. Runs in the
+    background; poll GET /dashboard/api/restore-jobs/<id>.
+    """
+    body = request.get_json(silent=True) or {}
+    args = ['reset-vms']
+    if body.get('snapshot'):
+        args += ['--snapshot', str(body['snapshot'])]
+    try:
+        return jsonify({'ok': True, 'started': True, **_start_restore_job(args, [name])})
     except Exception as e:
         return jsonify({'ok': False, 'error': str(e)}), 500
 
@@ -2374,6 +3180,8 @@ def api_reset(name):
 def api_restart(name):
     try:
         r = subprocess.run([MANAGER, 'restart', name], capture_output=True, text=True)
+        _cache_invalidate('list:')
+        _cache_invalidate('vmstatus:')
         ok = (r.returncode == 0)
         return jsonify({'ok': ok, 'output': r.stdout.strip(), 'error': r.stderr.strip()})
     except Exception as e:
@@ -2435,6 +3243,267 @@ def api_update_and_rebuild():
     threading.Thread(target=worker, args=(targets,), daemon=True).start()
     return jsonify({'ok': True, 'started': True})
 
+# Rolling updates run in the manager, which writes its result to
+# <state>/rollouts/<id>.json; running ones are tracked here until they finish.
+_rollouts_running: dict = {}
+_rollouts_lock = threading.Lock()
+
+
+def _rollout_result(rid: str):
+    try:
+        with open(os.path.join(_state_dir(), 'rollouts', rid + '.json')) as f:
+            return json.load(f)
+    except Exception:
+        return None
+
+
+@app.post('/dashboard/api/rolling-update')
+@auth_required
+def api_rolling_update():
+    """Recreate VMs in batches, each gated on port 3000 readiness, rolling a failed
+    batch back. JSON: names (default all), batch, timeout, pull, rebuild.
+    Returns a rollout id to poll with GET /dashboard/api/rolling-update/<id>."""
+    body = request.get_json(silent=True) or {}
+    names = [str(n) for n in (body.get('names') or [])]
+    args = ['rolling-update', '--json']
+    try:
+        args += ['--batch', str(max(1, int(body.get('batch') or 1)))]
+        if body.get('timeout'):
+            args += ['--timeout', str(max(1, int(body['timeout'])))]
+    except Exception:
+        return jsonify({'ok': False, 'error': 'batch and timeout must be integers'}), 400
+    if body.get('pull'):
+        args.append('--pull')
+    if body.get('rebuild') or body.get('pull'):
+        args.append('--rebuild')
+    rid = time.strftime('%Y%m%d-%H%M%S') + '-' + os.urandom(2).hex()
+    args += ['--id', rid, *names]
+    targets = names[:]
+    if not targets:
+        try:
+            targets = [i['name'] for i in manager_json_list()]
+        except Exception:
+            targets = []
+    for n in targets:
+        _set_flag(n, 'rebuilding', True)
+    with _rollouts_lock:
+        _rollouts_running[rid] = {'id': rid, 'state': 'running', 'started': time.time(), 'names': targets}
+
+    def worker():
+        try:
+            ok, out, err, rc = _run_manager(*args)
+            with _rollouts_lock:
+                _rollouts_running[rid].update(state='done', rc=rc, error=err[-2000:] if not ok else '')
+        finally:
+            for n in targets:
+                _set_flag(n, 'rebuilding', False)
+            _cache_invalidate('list:')
+            _cache_invalidate('vmstatus:')
+    threading.Thread(target=worker, daemon=True).start()
+    return jsonify({'ok': True, 'id': rid, 'names': targets})
+
+
+@app.get('/dashboard/api/rolling-update/<rid>')
+@auth_required
+def api_rolling_update_status(rid):
+    with _rollouts_lock:
+        job = dict(_rollouts_running.get(rid) or {})
+    result = _rollout_result(rid) if re.fullmatch(r'[A-Za-z0-9_-]+', rid) else None
+    if result is not None:
+        return jsonify({'ok': True, 'state': 'done', 'result': result})
+    if not job:
+        return jsonify({'ok': False, 'error': 'not found'}), 404
+    if job['state'] == 'done':
+        # the manager exited without writing a result (bad args, rebuild failure, ...)
+        return jsonify({'ok': False, 'state': 'failed', 'error': job.get('error') or 'rollout produced no result'})
+    return jsonify({'ok': True, 'state': 'running', 'elapsed': round(time.time() - job['started'], 1),
+                    'names': job['names']})
+
+# Snapshot resets/clones run many VMs at once in the manager, which prints a JSON
+# report (per-VM status and timings, VMs/min). Jobs are kept in memory for polling
+# and dropped once they have been finished for as long as exec jobs are kept.
+_restore_jobs: dict = {}
+_restore_jobs_lock = threading.Lock()
+
+
+def _prune_finished_jobs(jobs: dict, lock):
+    """Drop finished restore/backup jobs after the exec job retention period."""
+    now = time.time()
+    with lock:
+        for jid, job in list(jobs.items()):
+            if job.get('finished') and now - job['finished'] > exec_jobs.JOB_RETENTION_SEC:
+                jobs.pop(jid, None)
+
+
+def _start_restore_job(args, names, parallel=None):
+    """Run `blobe-vm-manager <args> --json --parallel N <names>` in the background.
+    Existing VMs (resets) are flagged as rebuilding; clone targets must not exist yet."""
+    n = int(parallel or os.environ.get('RESTORE_PARALLEL', 4))
+    if n < 1:
+        raise ValueError('parallel must be a positive integer')
+    _prune_finished_jobs(_restore_jobs, _restore_jobs_lock)
+    jid = time.strftime('%Y%m%d-%H%M%S') + '-' + os.urandom(2).hex()
+    with _restore_jobs_lock:
+        _restore_jobs[jid] = {'id': jid, 'op': args[0], 'state': 'running', 'started': time.time(), 'names': list(names)}
+    flagged = list(names) if args[0] == 'reset-vms' else []
+    for vm in flagged:
+        _set_flag(vm, 'rebuilding', True)
+
+    def worker():
+        result, error = None, ''
+        try:
+            ok, out, err, _ = _run_manager(*args, '--json', '--parallel', str(n), *names)
+            try:
+                result = json.loads(out)
+            except Exception:
+                error = (err or out or 'no result')[-2000:]
+        finally:
+            for vm in flagged:
+                _set_flag(vm, 'rebuilding', False)
+            _cache_invalidate('list:')
+            _cache_invalidate('vmstatus:')
+            with _restore_jobs_lock:
+                _restore_jobs[jid].update(state='done' if result is not None else 'failed',
+                                          result=result, error=error, finished=time.time())
+    threading.Thread(target=worker, daemon=True).start()
+    return {'id': jid, 'names': list(names), 'parallel': n}
+
+
+@app.get('/dashboard/api/restore-jobs/<jid>')
+@auth_required
+def api_restore_job(jid):
+    with _restore_jobs_lock:
+        job = dict(_restore_jobs.get(jid) or {})
+    if not job:
+        return jsonify({'ok': False, 'error': 'not found'}), 404
+    if job['state'] == 'running':
+        job['elapsed'] = round(time.time() - job['started'], 1)
+    return jsonify({'ok': job['state'] != 'failed', **job})
+
+
+@app.get('/dashboard/api/snapshots')
+@auth_required
+def api_snapshots():
+    ok, out, err, _ = _run_manager('snapshot-list')
+    try:
+        return jsonify({'ok': ok, 'snapshots': json.loads(out)})
+    except Exception:
+        return jsonify({'ok': False, 'error': err or out or 'snapshot-list failed'}), 500
+
+
+@app.post('/dashboard/api/snapshots')
+@auth_required
+def api_snapshot_create():
+    """Capture a VM's /config as a named snapshot. JSON: vm, name, archive."""
+    body = request.get_json(silent=True) or {}
+    vm, snap = str(body.get('vm') or ''), str(body.get('name') or '')
+    if not vm or not snap:
+        return jsonify({'ok': False, 'error': 'vm and name are required'}), 400
+    args = ['snapshot-create', vm, snap] + (['--archive'] if body.get('archive') else [])
+    ok, out, err, _ = _run_manager(*args)
+    return jsonify({'ok': ok, 'output': out, 'error': err}), (200 if ok else 400)
+
+
+@app.post('/dashboard/api/snapshots/<snap>/delete')
+@auth_required
+def api_snapshot_delete(snap):
+    ok, out, err, _ = _run_manager('snapshot-delete', snap)
+    return jsonify({'ok': ok, 'output': out, 'error': err}), (200 if ok else 404)
+
+
+@app.post('/dashboard/api/clone')
+@auth_required
+def api_clone():
+    """Create new VMs from a snapshot in parallel. JSON: snapshot, names, parallel."""
+    body = request.get_json(silent=True) or {}
+    names = [str(n) for n in (body.get('names') or [])]
+    if not body.get('snapshot') or not names:
+        return jsonify({'ok': False, 'error': 'snapshot and names are required'}), 400
+    try:
+        job = _start_restore_job(['clone-vms', '--snapshot', str(body['snapshot'])], names, body.get('parallel'))
+    except Exception as e:
+        return jsonify({'ok': False, 'error': str(e)}), 400
+    return jsonify({'ok': True, 'started': True, **job})
+
+# Backups (blobe-vm-manager backup, engine in backups.py) run as background jobs,
+# one at a time, since they are throttled to stay out of the VMs' way.
+_backup_jobs: dict = {}
+_backup_jobs_lock = threading.Lock()
+_backup_run_lock = threading.Lock()
+
+
+def _start_backup_job(op, args, names):
+    _prune_finished_jobs(_backup_jobs, _backup_jobs_lock)
+    jid = time.strftime('%Y%m%d-%H%M%S') + '-' + os.urandom(2).hex()
+    with _backup_jobs_lock:
+        _backup_jobs[jid] = {'id': jid, 'op': op, 'state': 'queued', 'started': time.time(), 'names': list(names)}
+
+    def worker():
+        with _backup_run_lock:
+            with _backup_jobs_lock:
+                _backup_jobs[jid]['state'] = 'running'
+            ok, out, err, _ = _run_manager(*args)
+        result = None
+        if op == 'backup':
+            try:
+                result = json.loads(out)
+            except Exception:
+                pass
+        else:
+            result = out
+        with _backup_jobs_lock:
+            _backup_jobs[jid].update(state='done' if ok else 'failed', result=result,
+                                     error=err[-2000:] if not ok else '', finished=time.time())
+        if op == 'restore':
+            _cache_invalidate('vmstatus:')
+    threading.Thread(target=worker, daemon=True).start()
+    return jid
+
+
+@app.get('/dashboard/api/backups')
+@auth_required
+def api_backups():
+    """Backups (newest first) and store usage. ?vm=<name> filters to one VM."""
+    vm = request.args.get('vm') or ''
+    ok, out, err, _ = _run_manager('backup-list', *([vm] if vm else []))
+    try:
+        return jsonify({'ok': ok, **json.loads(out)})
+    except Exception:
+        return jsonify({'ok': False, 'error': err or out or 'backup-list failed'}), 500
+
+
+@app.post('/dashboard/api/backups')
+@auth_required
+def api_backup_create():
+    """Back up VMs in the background. JSON: names (default all)."""
+    body = request.get_json(silent=True) or {}
+    names = [str(n) for n in (body.get('names') or [])]
+    args = ['backup', '--json'] + (names or ['--all'])
+    jid = _start_backup_job('backup', args, names)
+    return jsonify({'ok': True, 'started': True, 'id': jid})
+
+
+@app.post('/dashboard/api/backups/<name>/restore')
+@auth_required
+def api_backup_restore(name):
+    """Restore a VM's config from a backup (JSON: id, default newest) and restart it."""
+    body = request.get_json(silent=True) or {}
+    bid = str(body.get('id') or '')
+    if bid and not re.fullmatch(r'[0-9A-Za-z_-]+', bid):
+        return jsonify({'ok': False, 'error': 'invalid backup id'}), 400
+    jid = _start_backup_job('restore', ['backup-restore', name, *([bid] if bid else [])], [name])
+    return jsonify({'ok': True, 'started': True, 'id': jid})
+
+
+@app.get('/dashboard/api/backup-jobs/<jid>')
+@auth_required
+def api_backup_job(jid):
+    with _backup_jobs_lock:
+        job = dict(_backup_jobs.get(jid) or {})
+    if not job:
+        return jsonify({'ok': False, 'error': 'not found'}), 404
+    return jsonify({'ok': job['state'] != 'failed', **job})
+
 @app.post('/dashboard/api/delete-all-instances')
 @auth_required
 def api_delete_all_instances():
@@ -2449,9 +3518,9 @@ def api_delete_all_instances():
 @app.post('/dashboard/api/reset-all-instances')
 @auth_required
 def api_reset_all_instances():
-    """Reset all known instances by deleting and recreating them in background."""
+    """Reset all known instances in parallel (JSON: snapshot, parallel) in background."""
+    body = request.get_json(silent=True) or {}
     try:
-        # Determine instance names
         try:
             names = [i['name'] for i in manager_json_list()]
         except Exception:
@@ -2461,24 +3530,11 @@ def api_reset_all_instances():
                 names = [n for n in os.listdir(inst_root) if os.path.isdir(os.path.join(inst_root, n))]
             except Exception:
                 names = []
-
-        def worker(all_names):
-            for n in all_names:
-                try:
-                    subprocess.run([MANAGER, 'delete', n], capture_output=True, text=True)
-                except Exception:
-                    pass
-                try:
-                    subprocess.run([MANAGER, 'create', n], capture_output=True, text=True)
-                except Exception:
-                    pass
-                try:
-                    subprocess.run([MANAGER, 'start', n], capture_output=True, text=True)
-                except Exception:
-                    pass
-
-        threading.Thread(target=worker, args=(names,), daemon=True).start()
-        return jsonify({'ok': True, 'started': True, 'count': len(names)})
+        args = ['reset-vms']
+        if body.get('snapshot'):
+            args += ['--snapshot', str(body['snapshot'])]
+        job = _start_restore_job(args, names, body.get('parallel'))
+        return jsonify({'ok': True, 'started': True, 'count': len(names), **job})
     except Exception as e:
         return jsonify({'ok': False, 'error': str(e)}), 500
 
@@ -2521,6 +3577,9 @@ def api_update_vm(name):
 def api_app_install(name, app):
     try:
         ok, out, err, _ = _run_manager('app-install', name, app)
+        # image-variant installs recreate the container
+        _cache_invalidate('list:')
+        _cache_invalidate('vmstatus:')
         return jsonify({'ok': ok, 'output': out, 'error': err})
     except Exception as e:
         return jsonify({'ok': False, 'error': str(e)}), 500
@@ -2540,6 +3599,9 @@ def api_app_status(name, app):
 def api_app_uninstall(name, app):
     try:
         ok, out, err, _ = _run_manager('app-uninstall', name, app)
+        # image-variant installs recreate the container
+        _cache_invalidate('list:')
+        _cache_invalidate('vmstatus:')
         return jsonify({'ok': ok, 'output': out, 'error': err})
     except Exception as e:
         return jsonify({'ok': False, 'error': str(e)}), 500
@@ -2549,47 +3611,243 @@ def api_app_uninstall(name, app):
 def api_app_reinstall(name, app):
     try:
         ok, out, err, _ = _run_manager('app-reinstall', name, app)
+        # image-variant installs recreate the container
+        _cache_invalidate('list:')
+        _cache_invalidate('vmstatus:')
         return jsonify({'ok': ok, 'output': out, 'error': err})
     except Exception as e:
         return jsonify({'ok': False, 'error': str(e)}), 500
 
+# Whole cleanup routine as one script so each VM costs a single exec. It prints one
+# "BLOBE_CLEAN before=<bytes> after=<bytes> autoremove=<bytes> dry=<0|1>" line:
+# before/after are du totals of the cleaned paths, autoremove is the installed size
+# of packages `apt-get autoremove` would remove.
+_CLEAN_SCRIPT = r"""
+export DEBIAN_FRONTEND=noninteractive
+DRY=__DRY__
+paths="/var/cache/apt/archives /var/lib/apt/lists /tmp /var/tmp"
+sz() { du -sxb $paths 2>/dev/null | awk '{s+=$1} END {print s+0}'; }
+auto() { apt-get -s autoremove 2>/dev/null | awk '/^Remv /{print $2}' | xargs -r dpkg-query -Wf '${Installed-Size}\n' 2>/dev/null | awk '{s+=$1} END {print s*1024}'; }
+before=$(sz)
+autoremove=$(auto)
+if [ "$DRY" = 1 ]; then
+  echo "BLOBE_CLEAN before=$before after=$before autoremove=$autoremove dry=1"
+  exit 0
+fi
+apt-get -y autoremove >/dev/null 2>&1 || autoremove=0
+apt-get -y clean >/dev/null 2>&1
+rm -rf /var/cache/apt/archives/* /var/lib/apt/lists/* /tmp/* /var/tmp/* 2>/dev/null
+mkdir -p /var/lib/apt/lists/partial /var/cache/apt/archives/partial
+echo "BLOBE_CLEAN before=$before after=$(sz) autoremove=$autoremove dry=0"
+"""
+CLEAN_TIMEOUT_SEC = 600
+
+
+def _clean_script(dry: bool) -> str:
+    return _CLEAN_SCRIPT.replace('__DRY__', '1' if dry else '0')
+
+
+def _clean_result(job: dict | None) -> dict:
+    """Turn a finished cleanup job into {ok, reclaimed|reclaimable, before, after, autoremove}."""
+    if not job:
+        return {'ok': False, 'state': 'pending'}
+    if job['state'] == 'running':
+        return {'ok': False, 'state': 'running'}
+    m = re.search(r'BLOBE_CLEAN before=(\d+) after=(\d+) autoremove=(\d+) dry=([01])', job.get('output') or '')
+    if not m:
+        err = (job.get('error') or job.get('error_output') or '').strip()[-500:]
+        return {'ok': False, 'state': job['state'], 'error': err or 'cleanup produced no result'}
+    before, after, autoremove, dry = (int(x) for x in m.groups())
+    # a dry run deletes nothing, so everything under the cleaned paths counts as reclaimable
+    freed = (before if dry else max(0, before - after)) + autoremove
+    out = {'ok': True, 'state': 'done', 'before': before, 'after': after, 'autoremove': autoremove, 'dry': bool(dry)}
+    out['reclaimable' if dry else 'reclaimed'] = freed
+    return out
+
+
 @app.post('/dashboard/api/clean-vm/<name>')
 @auth_required
 def api_clean_vm(name):
-    """Clean apt caches and common temp directories inside the VM container."""
-    cname = f'blobevm_{name}'
-    # Best-effort: ignore errors
-    try:
-        cmds = [
-            'apt-get update || true',
-            'apt-get -y autoremove || true',
-            'apt-get -y autoclean || true',
-            'apt-get -y clean || true',
-            'rm -rf /var/cache/apt/archives/* || true',
-            'rm -rf /var/lib/apt/lists/* || true',
-            'rm -rf /tmp/* /var/tmp/* || true',
-            'mkdir -p /var/lib/apt/lists || true'
-        ]
-        for c in cmds:
-            _docker('exec', '-u', 'root', cname, 'bash', '-lc', c)
-        return jsonify({'ok': True})
+    """Clean apt caches, unused packages and temp directories inside the VM container.
+    ?dry=1 only estimates reclaimable bytes."""
+    if not _VM_NAME_RE.fullmatch(name):
+        return jsonify({'ok': False, 'error': 'invalid vm name'}), 400
+    try:
+        dry = request.values.get('dry') in ('1', 'true', 'yes')
+        jid = exec_jobs.start_job(name, _clean_script(dry), timeout=CLEAN_TIMEOUT_SEC, user='root')
+        res = _clean_result(exec_jobs.wait_job(jid, CLEAN_TIMEOUT_SEC + 5))
+        return jsonify(res), 200 if res['ok'] else 500
+    except Exception as e:
+        return jsonify({'ok': False, 'error': str(e)}), 500
+
+
+@app.post('/dashboard/api/clean-vms')
+@auth_required
+def api_clean_vms():
+    """Clean many VMs in parallel: names=a,b,c or names=* (running VMs), dry=1, parallel=N.
+    Returns a cleanup id to poll with GET /dashboard/api/clean-vms/<id>."""
+    try:
+        dry = request.values.get('dry') in ('1', 'true', 'yes')
+        raw = (request.values.get('names') or '*').strip()
+        if raw == '*':
+            payload, code = _single_flight('vmstatus', 'vmstatus:', _vm_status_snapshot)
+            if code != 200:
+                return jsonify(payload), code
+            names = sorted(n for n, it in payload['vms'].items() if it.get('state') == 'running')
+        else:
+            names = [n.strip() for n in raw.split(',') if n.strip()]
+        if not names:
+            return jsonify({'ok': False, 'error': 'no VMs to clean'}), 400
+        bad = [n for n in names if not _VM_NAME_RE.fullmatch(n)]
+        if bad:
+            return jsonify({'ok': False, 'error': 'invalid vm name', 'names': bad}), 400
+        try:
+            parallel = int(request.values.get('parallel') or 4)
+        except Exception:
+            parallel = 4
+        fid = exec_jobs.start_fanout(names, _clean_script(dry), parallel=parallel,
+                                     timeout=CLEAN_TIMEOUT_SEC, user='root')
+        return jsonify({'ok': True, 'id': fid, 'names': names, 'dry': dry})
     except Exception as e:
         return jsonify({'ok': False, 'error': str(e)}), 500
 
+
+@app.get('/dashboard/api/clean-vms/<cid>')
+@auth_required
+def api_clean_vms_status(cid):
+    f = exec_jobs.get_fanout(cid)
+    if not f:
+        return jsonify({'ok': False, 'error': 'not found'}), 404
+    vms = {vm: _clean_result(j if j.get('id') else None) for vm, j in f['results'].items()}
+    done = [r for r in vms.values() if r.get('ok')]
+    # The run's script says whether it was a dry run, even before any VM has finished
+    dry = f['cmd'] == _clean_script(True)
+    key = 'reclaimable' if dry else 'reclaimed'
+    return jsonify({
+        'ok': True,
+        'dry': dry,
+        'finished': bool(f['finished']),
+        'vms': vms,
+        'total': {key: sum(r.get(key, 0) for r in done), 'done': len(done),
+                  'failed': sum(1 for r in vms.values() if r.get('state') not in ('pending', 'running') and not r.get('ok')),
+                  'count': len(vms)},
+    })
+
+def _aptcache_payload():
+    """Shared apt cache state: size on disk and byte hit ratio from the apt-cacher-ng log."""
+    root = os.path.join(_state_dir(), 'aptcache')
+    env = _read_env()
+    size = 0
+    for dirpath, _dirs, files in os.walk(os.path.join(root, 'cache')):
+        for f in files:
+            try:
+                size += os.lstat(os.path.join(dirpath, f)).st_size
+            except Exception:
+                pass
+    # apt-cacher.log: time|O|bytes|client|path per transfer to a VM, time|I|... per upstream fetch
+    served = fetched = 0
+    try:
+        with open(os.path.join(root, 'log', 'apt-cacher.log'), 'rb') as fh:
+            fh.seek(0, os.SEEK_END)
+            fh.seek(max(0, fh.tell() - 8 * 1024 * 1024))
+            for line in fh:
+                parts = line.split(b'|', 3)
+                if len(parts) < 3 or not parts[2].isdigit():
+                    continue
+                if parts[1] == b'O':
+                    served += int(parts[2])
+                elif parts[1] == b'I':
+                    fetched += int(parts[2])
+    except Exception:
+        pass
+    hit = max(0, served - fetched)
+    r = _docker('ps', '-q', '-f', 'name=^blobe-aptcache$')
+    try:
+        max_gb = float(env.get('APT_CACHE_MAX_GB', '20') or 20)
+    except Exception:
+        max_gb = 20.0
+    return {
+        'ok': True,
+        'enabled': env.get('APT_CACHE', '0') == '1',
+        'running': bool(r.stdout.strip()),
+        'size_bytes': size,
+        'max_bytes': int(max_gb * 1024 ** 3),
+        'hit_bytes': hit,
+        'miss_bytes': fetched,
+        'hit_ratio': (hit / (hit + fetched)) if (hit + fetched) else None,
+    }, 200
+
+
+@app.get('/dashboard/api/aptcache')
+@auth_required
+def api_aptcache():
+    try:
+        payload, code = _single_flight('aptcache', 'aptcache:', _aptcache_payload)
+        return jsonify(payload), code
+    except Exception as e:
+        return jsonify({'ok': False, 'error': str(e)}), 500
+
+
+@app.post('/dashboard/api/aptcache/<action>')
+@auth_required
+def api_aptcache_toggle(action):
+    if action not in ('enable', 'disable'):
+        return jsonify({'ok': False, 'error': 'unknown action'}), 400
+    ok, out, err, _ = _run_manager(f'aptcache-{action}')
+    _cache_invalidate('aptcache:')
+    return jsonify({'ok': ok, 'output': out, 'error': err})
+
+
+@app.get('/dashboard/api/pool')
+@auth_required
+def api_pool():
+    """Warm pool state: target size, ready entries, host headroom and claim latency."""
+    ok, out, err, _ = _run_manager('pool-status')
+    try:
+        return jsonify({'ok': ok, **json.loads(out)})
+    except Exception:
+        return jsonify({'ok': False, 'error': err or out or 'pool-status failed'}), 500
+
+
+@app.post('/dashboard/api/pool/size')
+@auth_required
+def api_pool_size():
+    """Set WARM_POOL_SIZE; filling boots entries one by one, so it runs in the background."""
+    body = request.get_json(silent=True) or {}
+    try:
+        size = int(body.get('size', request.values.get('size')))
+        if size < 0:
+            raise ValueError
+    except Exception:
+        return jsonify({'ok': False, 'error': 'size must be a non-negative integer'}), 400
+    threading.Thread(target=_run_manager, args=('pool-size', str(size)), daemon=True).start()
+    return jsonify({'ok': True, 'size': size, 'started': True})
+
+
 @app.get('/dashboard/api/apps')
 @auth_required
 def api_apps():
+    payload, code = _single_flight('apps', 'apps:', _apps_payload)
+    return jsonify(payload), code
+
+
+def _apps_payload():
     # Enumerate app scripts under /opt/blobe-vm/root/installable-apps
     apps_dir = os.path.join(_state_dir(), 'root', 'installable-apps')
-    apps = []
+    # plus apps declared only in manifest.json; install-apps.sh is the shared installer
+    apps = set()
     try:
         for f in os.listdir(apps_dir):
-            if f.endswith('.sh'):
-                apps.append(f[:-3])
+            if f.endswith('.sh') and f != 'install-apps.sh':
+                apps.add(f[:-3])
+    except Exception:
+        pass
+    try:
+        with open(os.path.join(apps_dir, 'manifest.json')) as f:
+            apps.update((json.load(f).get('apps') or {}).keys())
     except Exception:
         pass
-    apps.sort()
-    return jsonify({'apps': apps})
+    return {'apps': sorted(apps)}, 200
 
 def _http_check(url: str, timeout: float = 8.0) -> int:
     if not url:
@@ -2683,13 +3941,60 @@ def api_disable_single_port():
 @auth_required
 def api_optimizer_status():
     """Return optimizer status and stats via embedded optimizer module."""
+    payload, code = _single_flight('optimizer', 'optimizer:', _optimizer_status_payload)
+    return jsonify(payload), code
+
+
+def _optimizer_status_payload():
     try:
         s = dash_optimizer.status()
-        return jsonify({'ok': True, 'cfg': s.get('cfg'), 'stats': s.get('stats'), 'lastRestart': s.get('lastRestart')})
+        return {'ok': True, 'cfg': s.get('cfg'), 'stats': s.get('stats'), 'lastRestart': s.get('lastRestart'),
+                'cpuFair': s.get('cpuFair'), 'swapVictim': s.get('swapVictim'),
+                'rulesPlan': s.get('rulesPlan'), 'forecast': s.get('forecast'),
+                'psi': s.get('psi')}, 200
+    except Exception as e:
+        return {'ok': False, 'error': str(e)}, 500
+
+
+@app.get('/dashboard/api/optimizer/rightsize')
+@auth_required
+def api_optimizer_rightsize():
+    """Per-VM working set and right-sized memory limits, host commitment and recent changes."""
+    try:
+        return jsonify({'ok': True, **dash_optimizer.rightsize_status()})
+    except Exception as e:
+        return jsonify({'ok': False, 'error': str(e)}), 500
+
+
+@app.get('/dashboard/api/optimizer/swap-victims')
+@auth_required
+def api_optimizer_swap_victims():
+    """Current swap guard ranking (nothing is restarted) and its last decision."""
+    try:
+        return jsonify({'ok': True, 'candidates': dash_optimizer.rank_swap_victims(),
+                        'last': dash_optimizer.last_swap_victim()})
+    except Exception as e:
+        return jsonify({'ok': False, 'error': str(e)}), 500
+
+
+@app.get('/dashboard/api/optimizer/plan')
+@auth_required
+def api_optimizer_plan():
+    """Dry run of the guard rules against the fleet right now, and the last executed plan."""
+    try:
+        return jsonify({'ok': True, 'rules': dash_optimizer.effective_rules(dash_optimizer.load_config()),
+                        'plan': dash_optimizer.preview_plan(), 'last': dash_optimizer.last_plan()})
     except Exception as e:
         return jsonify({'ok': False, 'error': str(e)}), 500
 
 
+@app.get('/dashboard/api/metrics')
+@auth_required
+def api_metrics():
+    """Dashboard-internal counters (endpoint cache hits/misses/coalesced waiters)."""
+    return jsonify({'ok': True, 'cache': _cache_metrics()})
+
+
 @app.post('/dashboard/api/optimizer/run-once')
 @auth_required
 def api_optimizer_run_once():
@@ -2713,6 +4018,7 @@ def api_optimizer_set():
         return jsonify({'ok': False, 'error': 'missing key'}), 400
     try:
         dash_optimizer.set_config(key, val)
+        _cache_invalidate('optimizer:')
         return jsonify({'ok': True})
     except Exception as e:
         return jsonify({'ok': False, 'error': str(e)}), 500
@@ -2805,4 +4111,8 @@ if __name__ == '__main__':
         dash_optimizer.start_background_loop()
     except Exception:
         pass
+    try:
+        start_v2_supervisor()
+    except Exception:
+        pass
     app.run(host='0.0.0.0', port=5000)
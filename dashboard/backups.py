@@ -0,0 +1,385 @@
+#!/usr/bin/env python3
+"""Incremental, deduplicated backups of VM config directories.
+
+Provides:
+ - backup(store, vm, src): chunk changed files into the store and record a manifest
+ - list_backups(store, vm): backup summaries, newest first
+ - restore(store, vm, backup_id, dst): rebuild a config directory from a manifest
+ - prune(store, keep): drop old manifests per VM and chunks nothing references
+
+Files up to CHUNK_MAX are stored as one chunk. Larger files are split with
+content-defined chunking, so an edit in the middle of a file only produces new
+chunks around the edit. Candidate cut points are byte pairs found by a compiled
+regex (scanned in C), and a CRC of the 32 bytes before each candidate decides
+whether to cut; this runs at roughly 100-150 MB/s per core, where a per-byte
+rolling hash in Python managed about 4 MB/s.
+Chunks are stored once under <store>/chunks/<sha256[:2]>/<sha256> (zlib level 1).
+Files whose size and mtime match the VM's previous backup are not read again;
+their chunk lists are copied from that manifest. BACKUP_MAX_MBPS caps the read
+rate so a run does not starve the VMs of disk bandwidth.
+
+Also runs as a CLI (`backups.py --store DIR backup|list|restore|prune ...`), which
+is how blobe-vm-manager drives it; every command prints JSON.
+"""
+import os
+import sys
+import json
+import gzip
+import stat
+import time
+import zlib
+import fcntl
+import re
+import random
+import shutil
+import hashlib
+import argparse
+from concurrent.futures import ThreadPoolExecutor
+
+CHUNK_MIN = 4 * 1024
+CHUNK_AVG = 16 * 1024
+CHUNK_MAX = 64 * 1024
+READ_BLOCK = 1024 * 1024
+MAX_MBPS = float(os.environ.get('BACKUP_MAX_MBPS', '40') or 0)
+RESTORE_THREADS = int(os.environ.get('BACKUP_RESTORE_THREADS', '4') or 4)
+# Paths relative to the config dir that are not worth keeping (browser/app caches)
+EXCLUDE = [p.strip().strip('/') for p in os.environ.get('BACKUP_EXCLUDE', '.cache').split(',') if p.strip()]
+
+# Anchor pairs: each side is 4 printable and 12 high bytes, so text and binary data
+# both yield candidates (about 1 in 256 positions for random data)
+_rnd = random.Random(0xB10BE)
+_pr, _hi = _rnd.sample(range(0x21, 0x7f), 8), _rnd.sample(range(0x80, 0xff), 24)
+_ANCHOR = re.compile(b'[' + re.escape(bytes(_pr[:4] + _hi[:12])) + b'][' + re.escape(bytes(_pr[4:] + _hi[12:])) + b']')
+_WINDOW = 32
+# Normalized chunking: stricter mask before the average size, looser after it
+_MASK_S = 31
+_MASK_L = 7
+
+
+def _cut(data, start: int, end: int, final: bool) -> int:
+    """Offset of the next chunk boundary in data[start:end], or -1 if more data is needed."""
+    if end - start <= CHUNK_MIN:
+        return end if final else -1
+    limit = min(end, start + CHUNK_MAX)
+    normal = min(limit, start + CHUNK_AVG)
+    for m in _ANCHOR.finditer(data, start + CHUNK_MIN, limit):
+        i = m.end()
+        if not zlib.crc32(data[i - _WINDOW:i]) & (_MASK_S if i < normal else _MASK_L):
+            return i
+    if limit == start + CHUNK_MAX or final:
+        return limit
+    return -1
+
+
+class _Throttle:
+    def __init__(self, mbps: float):
+        self.rate = mbps * 1024 * 1024
+        self.t0 = time.monotonic()
+        self.done = 0
+
+    def account(self, n: int):
+        if self.rate <= 0:
+            return
+        self.done += n
+        ahead = self.done / self.rate - (time.monotonic() - self.t0)
+        if ahead > 0:
+            time.sleep(ahead)
+
+
+def _chunks(path: str, throttle: _Throttle):
+    buf = b''
+    with open(path, 'rb') as f:
+        if os.fstat(f.fileno()).st_size <= CHUNK_MAX:
+            data = f.read()
+            throttle.account(len(data))
+            if data:
+                yield data
+            return
+        eof = False
+        while not eof:
+            block = f.read(READ_BLOCK)
+            throttle.account(len(block))
+            eof = not block
+            buf += block
+            pos = 0
+            while pos < len(buf):
+                cut = _cut(buf, pos, len(buf), eof)
+                if cut < 0:
+                    break
+                yield buf[pos:cut]
+                pos = cut
+            buf = buf[pos:]
+
+
+def _chunk_path(store: str, cid: str) -> str:
+    return os.path.join(store, 'chunks', cid[:2], cid)
+
+
+def _put_chunk(store: str, data: bytes, stats: dict) -> str:
+    cid = hashlib.sha256(data).hexdigest()
+    path = _chunk_path(store, cid)
+    if os.path.exists(path):
+        stats['reused_chunks'] += 1
+        return cid
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    packed = zlib.compress(data, 1)
+    tmp = f'{path}.{os.getpid()}.tmp'
+    with open(tmp, 'wb') as f:
+        f.write(packed)
+    os.replace(tmp, path)
+    stats['new_chunks'] += 1
+    stats['stored_bytes'] += len(packed)
+    return cid
+
+
+def _lock(store: str, exclusive: bool):
+    os.makedirs(store, exist_ok=True)
+    fd = os.open(os.path.join(store, '.lock'), os.O_CREAT | os.O_RDWR, 0o600)
+    fcntl.flock(fd, fcntl.LOCK_EX if exclusive else fcntl.LOCK_SH)
+    return fd
+
+
+def _vm_dir(store: str, vm: str) -> str:
+    return os.path.join(store, 'manifests', vm)
+
+
+def _load_manifest(store: str, vm: str, backup_id: str) -> dict:
+    with gzip.open(os.path.join(_vm_dir(store, vm), backup_id + '.json.gz'), 'rt') as f:
+        return json.load(f)
+
+
+def _latest_id(store: str, vm: str):
+    ids = sorted(n[:-8] for n in os.listdir(_vm_dir(store, vm)) if n.endswith('.json.gz')) \
+        if os.path.isdir(_vm_dir(store, vm)) else []
+    return ids[-1] if ids else None
+
+
+def _excluded(rel: str) -> bool:
+    return any(rel == p or rel.startswith(p + '/') for p in EXCLUDE)
+
+
+def backup(store: str, vm: str, src: str) -> dict:
+    t0 = time.time()
+    fd = _lock(store, True)
+    try:
+        prev_id = _latest_id(store, vm)
+        prev = {}
+        if prev_id:
+            prev = {e['p']: e for e in _load_manifest(store, vm, prev_id)['files'] if e['t'] == 'f'}
+        stats = {'files': 0, 'bytes': 0, 'rehashed_files': 0, 'rehashed_bytes': 0,
+                 'new_chunks': 0, 'reused_chunks': 0, 'stored_bytes': 0}
+        throttle = _Throttle(MAX_MBPS)
+        entries = []
+        for root, dirs, files in os.walk(src):
+            rel_root = os.path.relpath(root, src)
+            rel_root = '' if rel_root == '.' else rel_root
+            keep = []
+            for d in sorted(dirs):
+                rel = os.path.join(rel_root, d)
+                if _excluded(rel):
+                    continue
+                full = os.path.join(root, d)
+                st = os.lstat(full)
+                if stat.S_ISLNK(st.st_mode):
+                    entries.append({'p': rel, 't': 'l', 'target': os.readlink(full)})
+                    continue
+                entries.append({'p': rel, 't': 'd', 'm': stat.S_IMODE(st.st_mode), 'mt': st.st_mtime_ns,
+                                'u': st.st_uid, 'g': st.st_gid})
+                keep.append(d)
+            dirs[:] = keep
+            for name in sorted(files):
+                rel = os.path.join(rel_root, name)
+                if _excluded(rel):
+                    continue
+                full = os.path.join(root, name)
+                try:
+                    st = os.lstat(full)
+                except FileNotFoundError:
+                    continue
+                if stat.S_ISLNK(st.st_mode):
+                    entries.append({'p': rel, 't': 'l', 'target': os.readlink(full)})
+                    continue
+                if not stat.S_ISREG(st.st_mode):
+                    continue  # sockets, fifos
+                entry = {'p': rel, 't': 'f', 'm': stat.S_IMODE(st.st_mode), 's': st.st_size,
+                         'mt': st.st_mtime_ns, 'u': st.st_uid, 'g': st.st_gid}
+                old = prev.get(rel)
+                if old and old['s'] == st.st_size and old['mt'] == st.st_mtime_ns:
+                    entry['c'] = old['c']
+                else:
+                    try:
+                        entry['c'] = [_put_chunk(store, c, stats) for c in _chunks(full, throttle)]
+                    except (FileNotFoundError, PermissionError):
+                        continue
+                    stats['rehashed_files'] += 1
+                    stats['rehashed_bytes'] += st.st_size
+                stats['files'] += 1
+                stats['bytes'] += st.st_size
+                entries.append(entry)
+        backup_id = time.strftime('%Y%m%d-%H%M%S', time.gmtime(t0))
+        if backup_id == prev_id:
+            backup_id += '-' + os.urandom(2).hex()
+        stats['elapsed_ms'] = int((time.time() - t0) * 1000)
+        summary = {'id': backup_id, 'vm': vm, 'created': int(t0), 'parent': prev_id, **stats}
+        vdir = _vm_dir(store, vm)
+        os.makedirs(vdir, exist_ok=True)
+        tmp = os.path.join(vdir, f'.{backup_id}.tmp')
+        with gzip.open(tmp, 'wt', compresslevel=6) as f:
+            json.dump({**summary, 'files': entries}, f, separators=(',', ':'))
+        with open(os.path.join(vdir, backup_id + '.meta.json'), 'w') as f:
+            json.dump(summary, f)
+        os.replace(tmp, os.path.join(vdir, backup_id + '.json.gz'))
+        return summary
+    finally:
+        os.close(fd)
+
+
+def list_backups(store: str, vm: str | None = None) -> list:
+    out = []
+    mroot = os.path.join(store, 'manifests')
+    vms = [vm] if vm else (sorted(os.listdir(mroot)) if os.path.isdir(mroot) else [])
+    for v in vms:
+        vdir = _vm_dir(store, v)
+        if not os.path.isdir(vdir):
+            continue
+        for name in os.listdir(vdir):
+            if name.endswith('.meta.json') and os.path.exists(os.path.join(vdir, name[:-10] + '.json.gz')):
+                try:
+                    with open(os.path.join(vdir, name)) as f:
+                        out.append(json.load(f))
+                except Exception:
+                    pass
+    return sorted(out, key=lambda b: (b.get('created', 0), b.get('id', '')), reverse=True)
+
+
+def _write_file(store: str, path: str, entry: dict):
+    with open(path, 'wb') as f:
+        for cid in entry['c']:
+            with open(_chunk_path(store, cid), 'rb') as c:
+                f.write(zlib.decompress(c.read()))
+    _apply_meta(path, entry)
+
+
+def _apply_meta(path: str, entry: dict):
+    try:
+        os.chown(path, entry['u'], entry['g'])
+    except (PermissionError, KeyError):
+        pass
+    os.chmod(path, entry['m'])
+    os.utime(path, ns=(entry['mt'], entry['mt']))
+
+
+def restore(store: str, vm: str, backup_id: str | None, dst: str) -> dict:
+    """Rebuild dst from a backup. The new tree is assembled next to dst and swapped in."""
+    t0 = time.time()
+    fd = _lock(store, False)
+    try:
+        backup_id = backup_id or _latest_id(store, vm)
+        if not backup_id:
+            raise FileNotFoundError(f'no backups for {vm}')
+        manifest = _load_manifest(store, vm, backup_id)
+        parent = os.path.dirname(os.path.abspath(dst))
+        tmp = os.path.join(parent, f'.restore-{backup_id}-{os.getpid()}')
+        os.makedirs(tmp)
+        dirs = [e for e in manifest['files'] if e['t'] == 'd']
+        for e in dirs:
+            os.makedirs(os.path.join(tmp, e['p']), exist_ok=True)
+        files = [e for e in manifest['files'] if e['t'] == 'f']
+        # zlib and file I/O release the GIL, so a few threads keep the disk busy
+        with ThreadPoolExecutor(max_workers=max(1, RESTORE_THREADS)) as pool:
+            list(pool.map(lambda e: _write_file(store, os.path.join(tmp, e['p']), e), files))
+        for e in manifest['files']:
+            if e['t'] == 'l':
+                os.symlink(e['target'], os.path.join(tmp, e['p']))
+        for e in sorted(dirs, key=lambda d: d['p'].count('/'), reverse=True):
+            _apply_meta(os.path.join(tmp, e['p']), e)
+        old = None
+        if os.path.lexists(dst):
+            old = os.path.join(parent, f'.config-old-{os.getpid()}')
+            os.rename(dst, old)
+        os.rename(tmp, dst)
+        if old:
+            shutil.rmtree(old, ignore_errors=True)
+        return {'id': backup_id, 'vm': vm, 'files': len(files), 'bytes': sum(e['s'] for e in files),
+                'elapsed_ms': int((time.time() - t0) * 1000)}
+    finally:
+        os.close(fd)
+
+
+def prune(store: str, keep: int) -> dict:
+    """Keep the newest `keep` backups per VM, then delete chunks no manifest uses."""
+    fd = _lock(store, True)
+    try:
+        removed, live = 0, set()
+        mroot = os.path.join(store, 'manifests')
+        for vm in (sorted(os.listdir(mroot)) if os.path.isdir(mroot) else []):
+            vdir = _vm_dir(store, vm)
+            ids = sorted(n[:-8] for n in os.listdir(vdir) if n.endswith('.json.gz'))
+            for bid in ids[:-keep] if keep > 0 else ids:
+                for suffix in ('.json.gz', '.meta.json'):
+                    try:
+                        os.remove(os.path.join(vdir, bid + suffix))
+                    except FileNotFoundError:
+                        pass
+                removed += 1
+            for bid in ids[-keep:] if keep > 0 else []:
+                for e in _load_manifest(store, vm, bid)['files']:
+                    live.update(e.get('c', ()))
+        freed = chunks = 0
+        croot = os.path.join(store, 'chunks')
+        for sub in (os.listdir(croot) if os.path.isdir(croot) else []):
+            for cid in os.listdir(os.path.join(croot, sub)):
+                if cid not in live:
+                    p = os.path.join(croot, sub, cid)
+                    freed += os.path.getsize(p)
+                    os.remove(p)
+                    chunks += 1
+        return {'removed_backups': removed, 'removed_chunks': chunks, 'freed_bytes': freed}
+    finally:
+        os.close(fd)
+
+
+def store_usage(store: str) -> dict:
+    total = count = 0
+    croot = os.path.join(store, 'chunks')
+    for root, _, files in os.walk(croot):
+        for n in files:
+            total += os.path.getsize(os.path.join(root, n))
+            count += 1
+    return {'chunks': count, 'chunk_bytes': total}
+
+
+def main(argv=None):
+    ap = argparse.ArgumentParser(prog='backups.py')
+    ap.add_argument('--store', required=True)
+    sub = ap.add_subparsers(dest='cmd', required=True)
+    b = sub.add_parser('backup')
+    b.add_argument('vm')
+    b.add_argument('src')
+    ls = sub.add_parser('list')
+    ls.add_argument('vm', nargs='?')
+    r = sub.add_parser('restore')
+    r.add_argument('vm')
+    r.add_argument('dst')
+    r.add_argument('--id')
+    p = sub.add_parser('prune')
+    p.add_argument('--keep', type=int, default=int(os.environ.get('BACKUP_KEEP', '7') or 7))
+    args = ap.parse_args(argv)
+    try:
+        if args.cmd == 'backup':
+            out = backup(args.store, args.vm, args.src)
+        elif args.cmd == 'list':
+            out = {'backups': list_backups(args.store, args.vm), **store_usage(args.store)}
+        elif args.cmd == 'restore':
+            out = restore(args.store, args.vm, args.id, args.dst)
+        else:
+            out = prune(args.store, args.keep)
+    except Exception as e:
+        print(json.dumps({'error': str(e)}))
+        return 1
+    print(json.dumps(out))
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -45,4 +45,26 @@ r = client.get('/dashboard/api/list', headers=headers)
 print('LIST', r.status_code, r.json)
 assert r.status_code == 200 and 'instances' in r.json, 'list should return instances'
 
+# Forecast reclaim: a VM holding lots of page cache gets capped near its working set.
+# docker stats leaves the cache out, so the cgroup's own files must drive this.
+import tempfile
+import types
+opt = mod.dash_optimizer
+cg = tempfile.mkdtemp()
+for f, v in {'memory.current': 3 << 30, 'memory.stat': f'anon 1\nfile {2 << 30}\ninactive_file {3 << 29}\n',
+             'memory.events': 'oom_kill 0\n'}.items():
+    Path(cg, f).write_text(f'{v}\n' if isinstance(v, int) else v)
+opt._cg_dirs['blobevm_smoke'] = cg
+updates = []
+real_subprocess = opt.subprocess
+opt.subprocess = types.SimpleNamespace(check_output=lambda *a, **k: '0 0', check_call=lambda a, **k: updates.append(a),
+                                       DEVNULL=None)
+try:
+    st = {'tightened': {}}
+    opt._forecast_tighten(opt.DEFAULT_CFG, st, [('blobevm_smoke', 3 << 29, 0.0, 0, 10.0)], 0)
+finally:
+    opt.subprocess = real_subprocess
+print('RECLAIM', st['tightened'])
+assert 'smoke' in st['tightened'] and st['tightened']['smoke']['cap'] < 3 << 30, 'cache-heavy VM should be capped'
+
 print('\nSmoke test OK')
@@ -0,0 +1,183 @@
+#!/usr/bin/env python3
+"""Minimal Docker Engine API client for the Blobe dashboard.
+
+Talks HTTP over the Docker unix socket with the standard library only (the
+dashboard container has no docker SDK). Provides:
+ - available(): whether the socket exists
+ - request(method, path, body): JSON request/response
+ - exec_create(container, cmd, ...): create an exec instance, return its id
+ - exec_stream(exec_id): start an exec and yield (stream, bytes) frames as they arrive
+ - exec_inspect(exec_id): exit code / running state of an exec instance
+ - exec_attach_tty(exec_id): start a TTY exec and return the raw bidirectional socket
+ - exec_resize(exec_id, cols, rows): resize a TTY exec
+
+Callers fall back to the docker CLI when the socket is not reachable.
+"""
+import os
+import json
+import socket
+import struct
+import http.client
+
+DOCKER_SOCK = os.environ.get('DOCKER_SOCK', '/var/run/docker.sock')
+
+_STREAMS = {0: 'stdin', 1: 'stdout', 2: 'stderr'}
+
+
+class _UnixConnection(http.client.HTTPConnection):
+    def __init__(self, path, timeout=None):
+        super().__init__('localhost', timeout=timeout)
+        self._sock_path = path
+
+    def connect(self):
+        s = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        s.settimeout(self.timeout)
+        s.connect(self._sock_path)
+        self.sock = s
+
+
+def available() -> bool:
+    try:
+        return os.path.exists(DOCKER_SOCK)
+    except Exception:
+        return False
+
+
+def _conn(timeout=None):
+    return _UnixConnection(DOCKER_SOCK, timeout=timeout)
+
+
+def request(method: str, path: str, body=None, timeout: float = 30):
+    """Send one JSON request; returns (status, parsed body or raw text)."""
+    c = _conn(timeout)
+    try:
+        payload = json.dumps(body).encode() if body is not None else None
+        headers = {'Content-Type': 'application/json'} if payload is not None else {}
+        c.request(method, path, body=payload, headers=headers)
+        r = c.getresponse()
+        raw = r.read()
+        try:
+            data = json.loads(raw) if raw else None
+        except Exception:
+            data = raw.decode('utf-8', 'replace')
+        return r.status, data
+    finally:
+        c.close()
+
+
+def exec_create(container: str, cmd, tty: bool = False, stdin: bool = False, env=None, workdir=None, user=None) -> str:
+    body = {
+        'AttachStdout': True,
+        'AttachStderr': True,
+        'AttachStdin': bool(stdin),
+        'Tty': bool(tty),
+        'Cmd': list(cmd),
+    }
+    if env:
+        body['Env'] = [f'{k}={v}' for k, v in env.items()]
+    if workdir:
+        body['WorkingDir'] = workdir
+    if user:
+        body['User'] = user
+    status, data = request('POST', f'/containers/{container}/exec', body)
+    if status != 201 or not isinstance(data, dict) or 'Id' not in data:
+        msg = data.get('message') if isinstance(data, dict) else data
+        raise RuntimeError(msg or f'exec create failed ({status})')
+    return data['Id']
+
+
+def exec_inspect(exec_id: str) -> dict:
+    status, data = request('GET', f'/exec/{exec_id}/json')
+    if status != 200 or not isinstance(data, dict):
+        raise RuntimeError(f'exec inspect failed ({status})')
+    return data
+
+
+def exec_stream(exec_id: str, holder: dict | None = None):
+    """Start an exec and yield (stream_name, bytes) as output arrives.
+
+    The Engine answers a non-TTY exec start with a multiplexed stream of
+    8-byte headers (stream type, size) followed by payloads, then closes the
+    connection when the process exits. If `holder` is given, the live
+    connection is stored under holder['conn'] so another thread can close it
+    to abort the read.
+    """
+    c = _conn(None)
+    if holder is not None:
+        holder['conn'] = c
+    try:
+        c.request('POST', f'/exec/{exec_id}/start', body=json.dumps({'Detach': False, 'Tty': False}).encode(),
+                  headers={'Content-Type': 'application/json'})
+        r = c.getresponse()
+        if r.status != 200:
+            raise RuntimeError(r.read().decode('utf-8', 'replace') or f'exec start failed ({r.status})')
+        while True:
+            hdr = _read_exact(r, 8)
+            if not hdr:
+                return
+            kind, size = struct.unpack('>BxxxL', hdr)
+            if size == 0:
+                continue
+            data = _read_exact(r, size)
+            if not data:
+                return
+            yield _STREAMS.get(kind, 'stdout'), data
+    finally:
+        c.close()
+
+
+def exec_attach_tty(exec_id: str):
+    """Start a TTY exec and hijack the connection.
+
+    Returns (sock, pending): after the 101 upgrade the socket carries raw
+    terminal bytes both ways (no multiplexing with Tty=true); `pending` holds
+    any output already read past the response headers.
+    """
+    s = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+    try:
+        s.settimeout(30)
+        s.connect(DOCKER_SOCK)
+        body = json.dumps({'Detach': False, 'Tty': True}).encode()
+        head = (f'POST /exec/{exec_id}/start HTTP/1.1\r\n'
+                'Host: localhost\r\n'
+                'Content-Type: application/json\r\n'
+                'Connection: Upgrade\r\n'
+                'Upgrade: tcp\r\n'
+                f'Content-Length: {len(body)}\r\n\r\n').encode()
+        s.sendall(head + body)
+        buf = b''
+        while b'\r\n\r\n' not in buf:
+            chunk = s.recv(4096)
+            if not chunk:
+                raise RuntimeError('exec attach: connection closed')
+            buf += chunk
+            if len(buf) > 65536:
+                raise RuntimeError('exec attach: bad response')
+        head, pending = buf.split(b'\r\n\r\n', 1)
+        status = head.split(b'\r\n', 1)[0].split()
+        if len(status) < 2 or status[1] not in (b'101', b'200'):
+            raise RuntimeError(f"exec attach failed: {head.decode('utf-8', 'replace')[:200]}")
+        s.settimeout(None)
+        return s, pending
+    except Exception:
+        s.close()
+        raise
+
+
+def exec_resize(exec_id: str, cols: int, rows: int):
+    status, data = request('POST', f'/exec/{exec_id}/resize?h={int(rows)}&w={int(cols)}')
+    if status not in (200, 201):
+        raise RuntimeError(f'exec resize failed ({status})')
+
+
+def _read_exact(r, n: int) -> bytes:
+    buf = b''
+    while len(buf) < n:
+        try:
+            chunk = r.read(n - len(buf))
+        except Exception:
+            return b''
+        if not chunk:
+            return b''
+        buf += chunk
+    return buf
@@ -0,0 +1,299 @@
+#!/usr/bin/env python3
+"""Streaming exec jobs for the Blobe dashboard.
+
+Provides:
+ - start_job(vm, cmd, timeout, user): run a command in blobevm_<vm> in the background
+ - get_job(job_id, with_output): job state plus captured output
+ - wait_job(job_id, timeout): block until the job finishes or the timeout elapses
+ - stream_job(job_id, since): generator of output events for SSE delivery
+ - start_fanout(names, cmd, parallel, timeout, user): one command across many VMs
+ - get_fanout(fanout_id): per-VM aggregated results
+
+Output is read incrementally from the Engine exec API (docker_api) or, when
+the socket is unavailable, from a `docker exec` child process. Each job keeps
+at most EXEC_OUTPUT_CAP bytes; past that the command keeps running but
+further output is counted and dropped.
+"""
+import os
+import time
+import uuid
+import codecs
+import threading
+import subprocess
+from concurrent.futures import ThreadPoolExecutor
+
+import docker_api
+
+EXEC_OUTPUT_CAP = int(os.environ.get('BLOBEDASH_EXEC_OUTPUT_CAP', str(1024 * 1024)) or 1048576)
+FANOUT_OUTPUT_CAP = int(os.environ.get('BLOBEDASH_FANOUT_OUTPUT_CAP', str(64 * 1024)) or 65536)
+FANOUT_MAX_PARALLEL = int(os.environ.get('BLOBEDASH_FANOUT_MAX_PARALLEL', '8') or 8)
+JOB_RETENTION_SEC = 900
+MAX_JOBS = 200
+
+_jobs = {}
+_fanouts = {}
+_lock = threading.Lock()
+
+
+def _shell_cmd(cmd: str):
+    # Match the old exec endpoint: login bash, falling back to sh
+    return ['/bin/sh', '-c', 'if [ -x /bin/bash ]; then exec /bin/bash -lc "$0"; else exec /bin/sh -lc "$0"; fi', cmd]
+
+
+def _prune():
+    now = time.time()
+    with _lock:
+        done = [j for j in _jobs.values() if j['state'] != 'running']
+        for j in done:
+            if now - (j['finished'] or now) > JOB_RETENTION_SEC:
+                _jobs.pop(j['id'], None)
+        if len(_jobs) > MAX_JOBS:
+            for j in sorted(done, key=lambda x: x['finished'] or 0)[:len(_jobs) - MAX_JOBS]:
+                _jobs.pop(j['id'], None)
+        for fid, f in list(_fanouts.items()):
+            if f['finished'] and now - f['finished'] > JOB_RETENTION_SEC:
+                _fanouts.pop(fid, None)
+
+
+def _new_job(vm: str, cmd: str, cap: int, user: str | None = None) -> dict:
+    job = {
+        'id': uuid.uuid4().hex[:16],
+        'vm': vm,
+        'cmd': cmd,
+        'user': user,
+        'state': 'running',
+        'exit_code': None,
+        'error': None,
+        'started': time.time(),
+        'finished': None,
+        'events': [],       # (seq, stream, text)
+        'bytes': 0,         # bytes produced, including dropped ones
+        'kept': 0,          # bytes retained in events
+        'cap': cap,
+        'truncated': False,
+        'cond': threading.Condition(),
+        'abort': {},
+    }
+    with _lock:
+        _jobs[job['id']] = job
+    return job
+
+
+def _append(job: dict, stream: str, data: bytes, decoders: dict):
+    with job['cond']:
+        job['bytes'] += len(data)
+        room = job['cap'] - job['kept']
+        if room <= 0:
+            job['truncated'] = True
+            return
+        if len(data) > room:
+            data = data[:room]
+            job['truncated'] = True
+        dec = decoders.setdefault(stream, codecs.getincrementaldecoder('utf-8')('replace'))
+        text = dec.decode(data)
+        job['kept'] += len(data)
+        if text:
+            job['events'].append((len(job['events']) + 1, stream, text))
+        job['cond'].notify_all()
+
+
+def _finish(job: dict, state: str, exit_code=None, error=None):
+    with job['cond']:
+        if job['state'] != 'running':
+            return
+        job['state'] = state
+        job['exit_code'] = exit_code
+        job['error'] = error
+        job['finished'] = time.time()
+        job['cond'].notify_all()
+
+
+def _run_api(job: dict, cname: str):
+    exec_id = docker_api.exec_create(cname, _shell_cmd(job['cmd']), user=job['user'])
+    decoders = {}
+    for stream, data in docker_api.exec_stream(exec_id, job['abort']):
+        _append(job, stream, data, decoders)
+    if job['state'] != 'running':
+        return
+    code = None
+    for _ in range(20):
+        info = docker_api.exec_inspect(exec_id)
+        if not info.get('Running'):
+            code = info.get('ExitCode')
+            break
+        time.sleep(0.05)
+    _finish(job, 'done', code)
+
+
+def _run_cli(job: dict, cname: str):
+    user = ['-u', job['user']] if job['user'] else []
+    proc = subprocess.Popen(['docker', 'exec', *user, cname, *_shell_cmd(job['cmd'])],
+                            stdout=subprocess.PIPE, stderr=subprocess.PIPE)
+    job['abort']['proc'] = proc
+    decoders = {}
+
+    def pump(pipe, stream):
+        for chunk in iter(lambda: pipe.read1(65536), b''):
+            _append(job, stream, chunk, decoders)
+
+    t = threading.Thread(target=pump, args=(proc.stderr, 'stderr'), daemon=True)
+    t.start()
+    pump(proc.stdout, 'stdout')
+    t.join()
+    code = proc.wait()
+    _finish(job, 'done', code)
+
+
+def _run(job: dict, timeout: float | None):
+    cname = f"blobevm_{job['vm']}"
+    timer = None
+    if timeout:
+        timer = threading.Timer(timeout, _abort, args=(job, 'timeout'))
+        timer.daemon = True
+        timer.start()
+    try:
+        if docker_api.available():
+            _run_api(job, cname)
+        else:
+            _run_cli(job, cname)
+    except Exception as e:
+        _finish(job, 'error', None, str(e))
+    finally:
+        if timer:
+            timer.cancel()
+        _finish(job, 'done', job['exit_code'])
+
+
+def _abort(job: dict, state: str):
+    """Stop following a job: close the exec stream (the process inside the VM is
+    left running, as with `docker exec` detach) or kill the CLI child."""
+    _finish(job, state, None, state)
+    try:
+        conn = job['abort'].get('conn')
+        if conn and conn.sock:
+            conn.sock.shutdown(2)
+    except Exception:
+        pass
+    try:
+        proc = job['abort'].get('proc')
+        if proc and proc.poll() is None:
+            proc.kill()
+    except Exception:
+        pass
+
+
+def start_job(vm: str, cmd: str, timeout: float | None = None, cap: int | None = None, user: str | None = None) -> str:
+    _prune()
+    job = _new_job(vm, cmd, cap or EXEC_OUTPUT_CAP, user)
+    threading.Thread(target=_run, args=(job, timeout), daemon=True).start()
+    return job['id']
+
+
+def cancel_job(job_id: str) -> bool:
+    job = _jobs.get(job_id)
+    if not job or job['state'] != 'running':
+        return False
+    _abort(job, 'cancelled')
+    return True
+
+
+def _summary(job: dict, with_output: bool) -> dict:
+    out = {k: job[k] for k in ('id', 'vm', 'cmd', 'state', 'exit_code', 'error', 'started', 'finished', 'bytes', 'truncated')}
+    if with_output:
+        out['output'] = ''.join(t for _, s, t in job['events'] if s == 'stdout')
+        out['error_output'] = ''.join(t for _, s, t in job['events'] if s == 'stderr')
+    return out
+
+
+def get_job(job_id: str, with_output: bool = True):
+    job = _jobs.get(job_id)
+    if not job:
+        return None
+    with job['cond']:
+        return _summary(job, with_output)
+
+
+def wait_job(job_id: str, timeout: float):
+    job = _jobs.get(job_id)
+    if not job:
+        return None
+    deadline = time.time() + timeout
+    with job['cond']:
+        while job['state'] == 'running':
+            left = deadline - time.time()
+            if left <= 0:
+                break
+            job['cond'].wait(left)
+    return get_job(job_id)
+
+
+def stream_job(job_id: str, since: int = 0, heartbeat: float = 15.0):
+    """Yield ('output', {seq, stream, data}) events from `since`, then ('exit', summary).
+    Yields ('ping', None) every `heartbeat` seconds of silence to keep proxies open."""
+    job = _jobs.get(job_id)
+    if not job:
+        return
+    seq = since
+    while True:
+        with job['cond']:
+            if len(job['events']) <= seq and job['state'] == 'running':
+                job['cond'].wait(heartbeat)
+            pending = job['events'][seq:]
+            finished = job['state'] != 'running'
+        for ev_seq, stream, text in pending:
+            yield 'output', {'seq': ev_seq, 'stream': stream, 'data': text}
+        seq += len(pending)
+        if finished and not pending:
+            yield 'exit', get_job(job_id, with_output=False)
+            return
+        if not pending:
+            yield 'ping', None
+
+
+def start_fanout(names, cmd: str, parallel: int = 4, timeout: float | None = None, user: str | None = None) -> str:
+    """Run `cmd` on every VM in `names` with at most `parallel` execs in flight."""
+    _prune()
+    parallel = max(1, min(int(parallel or 1), FANOUT_MAX_PARALLEL))
+    fid = uuid.uuid4().hex[:16]
+    fan = {'id': fid, 'cmd': cmd, 'parallel': parallel, 'started': time.time(), 'finished': None,
+           'jobs': {}}
+    with _lock:
+        _fanouts[fid] = fan
+
+    def one(vm):
+        jid = start_job(vm, cmd, timeout=timeout, cap=FANOUT_OUTPUT_CAP, user=user)
+        fan['jobs'][vm] = jid
+        wait_job(jid, (timeout or 3600) + 5)
+
+    def runner():
+        with ThreadPoolExecutor(max_workers=parallel) as pool:
+            list(pool.map(one, list(names)))
+        fan['finished'] = time.time()
+
+    for vm in names:
+        fan['jobs'].setdefault(vm, None)
+    threading.Thread(target=runner, daemon=True).start()
+    return fid
+
+
+def get_fanout(fanout_id: str, with_output: bool = True):
+    fan = _fanouts.get(fanout_id)
+    if not fan:
+        return None
+    results = {}
+    counts = {'pending': 0, 'running': 0, 'ok': 0, 'failed': 0}
+    for vm, jid in list(fan['jobs'].items()):
+        j = get_job(jid, with_output) if jid else None
+        if not j:
+            results[vm] = {'state': 'pending'}
+            counts['pending'] += 1
+            continue
+        results[vm] = j
+        if j['state'] == 'running':
+            counts['running'] += 1
+        elif j['state'] == 'done' and j['exit_code'] == 0:
+            counts['ok'] += 1
+        else:
+            counts['failed'] += 1
+    return {'id': fan['id'], 'cmd': fan['cmd'], 'parallel': fan['parallel'], 'started': fan['started'],
+            'finished': fan['finished'], 'counts': counts, 'results': results}
@@ -3,10 +3,17 @@
 
 Provides:
  - run_once(): perform one optimization pass (guards + optional strict memory enforcement)
+ - effective_rules() / plan_actions() / preview_plan() / last_plan(): declarative guard rules and their plan
  - start_background_loop(): spawn a thread that runs every 15s
- - status(): return {'cfg':..., 'stats':..., 'lastRestart': ...}
+ - status(): return {'cfg':..., 'stats':..., 'lastRestart': ..., 'cpuFair': ...}
  - set_config(key, val): update persisted config
  - tail_logs(): return optimizer log contents
+ - wake(vm) / idle_status(): resume an idle-suspended VM; suspension and resume report
+ - rightsize_status(): per-VM working set and memory limits set by the right-sizing pass
+ - cpu_fair_status(): per-VM CPU scheduling class, weight and quota from the fairness pass
+ - forecast_status(): host memory trend, time to exhaustion, early mitigations and forecast accuracy
+ - psi_status() / host_psi(): pressure stall averages for the host and each VM
+ - rank_swap_victims() / last_swap_victim(): swap guard victim scores; register_victim_scorer() adds one
 
 This is a Python port of the previous Node optimizer so it runs inside the Flask process.
 """
@@ -16,6 +23,8 @@ import time
 import threading
 import subprocess
 import re
+import datetime
+from concurrent.futures import ThreadPoolExecutor
 
 STATE_DIR = os.environ.get('BLOBEDASH_STATE', '/opt/blobe-vm')
 LOG_DIR = '/var/blobe/logs/optimizer'
@@ -25,13 +34,56 @@ LAST_RESTART_PATH = os.path.join(STATE_DIR, '.optimizer_last_restart')
 
 DEFAULT_CFG = {
     'enabled': True,
-    'guards': {'memory': True, 'cpu': True, 'swap': True, 'health': True},
+    'guards': {'memory': True, 'cpu': True, 'swap': True, 'health': True, 'idle': False, 'rightsize': False,
+               'cpufair': False, 'forecast': False},
     'schedulerEnabled': True,
     'restartIntervalHours': 24,
     'strictMemoryLimit': False,
     'memoryLimit': '1g',
     'memorySwappiness': 10,
     'containerRestartCooldownMinutes': 10,
+    'rules': [],
+    'rulesDryRun': False,
+    'rulesMaxActionsPerPass': 5,
+    'swapDropCaches': False,
+    'swapVictimWindowMinutes': 30,
+    'swapVictimWeights': {'growth': 3, 'idle': 2, 'swap': 2, 'memory': 1, 'priority': 2, 'uptime': 1,
+                          'pressure': 2},
+    'psiEnabled': True,
+    'psiExecIntervalSec': 60,
+    'psiMemoryThreshold': 10,
+    'psiCpuThreshold': 20,
+    'swapPsiThreshold': 10,
+    'idleMinutes': 30,
+    'idleStopMinutes': 120,
+    'idleCpuPercent': 3,
+    'idleNetKBps': 4,
+    'idleExclude': [],
+    'idleStopAction': 'stop',
+    'rightsizeIntervalSec': 60,
+    'rightsizeWarmupMinutes': 5,
+    'rightsizeSwapRatio': 0.5,
+    'rightsizeMinMemory': '768m',
+    'rightsizeMaxMemory': '8g',
+    'rightsizeHostReserve': '2g',
+    'rightsizeHeadroomPercent': 30,
+    'rightsizeWindowMinutes': 30,
+    'rightsizeShrinkMinutes': 15,
+    'rightsizeOomHoldHours': 6,
+    'cpuFairIntervalSec': 30,
+    'cpuFairBusyPercent': 100,
+    'cpuFairInteractiveShares': 2048,
+    'cpuFairBackgroundShares': 256,
+    'cpuFairBackgroundCpus': 0,
+    'cpuFairContendedPercent': 80,
+    'cpuFairHoldSamples': 2,
+    'cpuFairMinHoldSec': 120,
+    'forecastWindowMinutes': 15,
+    'forecastHorizonMinutes': 10,
+    'forecastFloor': '512m',
+    'forecastReclaimMinutes': 30,
+    'forecastPauseMinutes': 10,
+    'forecastPauseIdleMinutes': 10,
 }
 
 
@@ -180,8 +232,9 @@ def perform_scheduled_restart(cfg: dict):
         cooldown = int(cfg.get('containerRestartCooldownMinutes', 10)) * 60
         maxPerRun = 10
         os.makedirs(RESTART_META_DIR, exist_ok=True)
+        suspended = suspended_vms()
         for name in names:
-            if not name.startswith('blobevm_'):
+            if not name.startswith('blobevm_') or name[len('blobevm_'):] in suspended:
                 continue
             safe = re.sub(r'[^A-Za-z0-9_.-]', '_', name)
             p = os.path.join(RESTART_META_DIR, safe + '.last')
@@ -215,108 +268,621 @@ def perform_scheduled_restart(cfg: dict):
         log(f'performScheduledRestart error {e}')
 
 
-def _run_memory_guard(cfg):
-    # analogous to MemoryGuard.js
+# Per-VM cgroup files (PSI, memory, swap) are read from the host cgroup tree, which
+# install.sh mounts read-only into the dashboard container at HOST_CGROUP, so a pass
+# costs no process per VM. A container's cgroup is found from its id (systemd or
+# cgroupfs driver). Without the mount, the files are read with `docker exec`, at most
+# CG_EXEC_WORKERS at a time.
+HOST_CGROUP = os.environ.get('BLOBEDASH_HOST_CGROUP', '/host/sys/fs/cgroup')
+CG_EXEC_WORKERS = 4
+_cg_dirs = {}  # container -> its cgroup directory, '' when it has none under HOST_CGROUP
+
+
+def _cgroup_dir(container: str):
+    d = _cg_dirs.get(container)
+    if d == '' or (d and os.path.isdir(d)):
+        return d or None
+    if not os.path.isdir(HOST_CGROUP):
+        return None
     try:
-        out = subprocess.check_output(['docker', 'stats', '--no-stream', '--format', '{{.Name}} {{.MemPerc}} {{.MemUsage}}'], text=True)
-        for l in out.splitlines():
-            parts = l.strip().split()
-            if not parts:
-                continue
-            name = parts[0]
-            if not name.startswith('blobevm_'):
-                continue
-            percRaw = parts[1] if len(parts) > 1 else '0%'
+        cid = subprocess.check_output(['docker', 'inspect', '-f', '{{.Id}}', container], text=True,
+                                      stderr=subprocess.DEVNULL, timeout=5).strip()
+    except Exception:
+        return None
+    _cg_dirs[container] = ''
+    # cgroup v1 keeps the memory controller in its own hierarchy
+    for rel in (f'system.slice/docker-{cid}.scope', f'docker/{cid}'):
+        for base in (HOST_CGROUP, os.path.join(HOST_CGROUP, 'memory')):
+            if cid and os.path.isdir(os.path.join(base, rel)):
+                _cg_dirs[container] = os.path.join(base, rel)
+                return _cg_dirs[container]
+    return None
+
+
+def _cg_file(d: str, name: str) -> str:
+    try:
+        with open(os.path.join(d, name)) as f:
+            return f.read()
+    except Exception:
+        return ''
+
+
+def _cg_output(container: str, script: str, host_read):
+    """host_read(cgroup_dir) when the host tree has the container, else the script's output."""
+    d = _cgroup_dir(container)
+    if d:
+        return host_read(d)
+    return subprocess.check_output(['docker', 'exec', container, 'sh', '-c', script],
+                                   text=True, stderr=subprocess.DEVNULL, timeout=5)
+
+
+def _cg_map(fn, names) -> dict:
+    names = list(names)
+    if not names:
+        return {}
+    with ThreadPoolExecutor(max_workers=CG_EXEC_WORKERS) as pool:
+        return dict(zip(names, pool.map(fn, names)))
+
+
+# Pressure stall information: the share of time tasks were stalled waiting for CPU,
+# memory or I/O. This measures contention directly; utilisation percentages do not.
+# Host values come from /proc/pressure. Each VM's values come from its own cgroup
+# (cgroup v2), read in the same pass as docker stats; through docker exec only every
+# psiExecIntervalSec. On kernels without PSI the guards fall back to utilisation alone.
+_PSI_SCRIPT = ('cd /sys/fs/cgroup 2>/dev/null && for r in cpu memory io; do '
+               '[ -f $r.pressure ] && sed "s/^/$r /" $r.pressure; done; true')
+_psi_last = {}  # container -> parsed PSI from the last pass
+_psi_ts = 0.0
+
+
+def _parse_psi(lines) -> dict:
+    """'<resource> some|full avg10=.. avg60=.. avg300=.. total=..' lines -> nested dict."""
+    out = {}
+    for line in lines:
+        parts = line.split()
+        if len(parts) < 3:
+            continue
+        vals = {}
+        for kv in parts[2:]:
+            k, _, v = kv.partition('=')
             try:
-                perc = float(percRaw.replace('%', ''))
+                vals[k] = float(v) if k != 'total' else int(v)
+            except ValueError:
+                pass
+        out.setdefault(parts[0], {})[parts[1]] = vals
+    return out
+
+
+def psi_available() -> bool:
+    return os.path.exists('/proc/pressure/memory')
+
+
+def _read_psi(path_fmt: str) -> list:
+    lines = []
+    for res in ('cpu', 'memory', 'io'):
+        try:
+            with open(path_fmt.format(res)) as f:
+                lines += [f'{res} {l}' for l in f.read().splitlines()]
+        except Exception:
+            pass
+    return lines
+
+
+def host_psi() -> dict:
+    return _parse_psi(_read_psi('/proc/pressure/{}'))
+
+
+def _container_psi(container: str) -> dict:
+    try:
+        out = _cg_output(container, _PSI_SCRIPT, lambda d: '\n'.join(_read_psi(os.path.join(d, '{}.pressure'))))
+    except Exception:
+        return {}
+    return _parse_psi(out.splitlines())
+
+
+def _psi_val(psi: dict, res: str, kind: str = 'some', avg: str = 'avg10'):
+    return ((psi.get(res) or {}).get(kind) or {}).get(avg)
+
+
+def _host_psi_metrics() -> dict:
+    psi = host_psi()
+    return {'host_cpu_psi': _psi_val(psi, 'cpu'), 'host_mem_psi': _psi_val(psi, 'memory'),
+            'host_mem_full_psi': _psi_val(psi, 'memory', 'full'), 'host_io_psi': _psi_val(psi, 'io')}
+
+
+def psi_status() -> dict:
+    """Host and per-VM stall averages (avg10/avg60) for the optimizer status."""
+    def short(psi):
+        return {res: {kind: {k: v.get(k) for k in ('avg10', 'avg60')} for kind, v in kinds.items()}
+                for res, kinds in psi.items()}
+    return {
+        'available': psi_available(),
+        'host': short(host_psi()),
+        'vms': {name[len('blobevm_'):]: short(p) for name, p in list(_psi_last.items()) if p},
+    }
+
+
+# Swap guard victim selection. Every pass records each VM's memory, CPU and network
+# counters so that, under swap pressure, candidates can be ranked on more than their
+# current size. Each scorer returns one raw column over all candidates. Columns are
+# min-max normalised and summed with swapVictimWeights, and the highest total is
+# restarted. register_victim_scorer() adds a column.
+SWAPVICTIM_PATH = os.path.join(STATE_DIR, '.swapvictim.json')
+_mem_hist = {}  # container -> {'samples': [[ts, bytes]], 'active': ts, 'net': bytes, 'ts': ts}
+_mem_hist_lock = threading.Lock()
+_last_rows = []  # fleet snapshot of the last pass; read-only views rank and plan from it
+
+_CG_SWAP_SCRIPT = (
+    'cd /sys/fs/cgroup; if [ -f memory.swap.current ]; then cat memory.swap.current; '
+    'else cd memory; echo $(( $(cat memory.memsw.usage_in_bytes) - $(cat memory.usage_in_bytes) )); fi'
+)
+
+
+def _growth_rate(samples):
+    """Least-squares slope of memory over time, in bytes per hour."""
+    n = len(samples)
+    if n < 2:
+        return 0.0
+    mt = sum(s[0] for s in samples) / n
+    mb = sum(s[1] for s in samples) / n
+    var = sum((s[0] - mt) ** 2 for s in samples)
+    if not var:
+        return 0.0
+    return sum((s[0] - mt) * (s[1] - mb) for s in samples) / var * 3600
+
+
+def _host_cg_swap(d: str) -> str:
+    if os.path.exists(os.path.join(d, 'memory.swap.current')):
+        return _cg_file(d, 'memory.swap.current')
+    return str(int(_cg_file(d, 'memory.memsw.usage_in_bytes')) - int(_cg_file(d, 'memory.usage_in_bytes')))
+
+
+def _cg_swap(container: str) -> int:
+    try:
+        return max(0, int(_cg_output(container, _CG_SWAP_SCRIPT, _host_cg_swap).strip()))
+    except Exception:
+        return 0
+
+
+def _started_at(names) -> dict:
+    out = {}
+    try:
+        raw = subprocess.check_output(['docker', 'inspect', '-f', '{{.Name}} {{.State.StartedAt}}', *names],
+                                      text=True, stderr=subprocess.DEVNULL)
+    except Exception:
+        return out
+    for line in raw.splitlines():
+        name, _, ts = line.partition(' ')
+        try:
+            out[name.lstrip('/')] = datetime.datetime.strptime(ts[:19], '%Y-%m-%dT%H:%M:%S') \
+                .replace(tzinfo=datetime.timezone.utc).timestamp()
+        except Exception:
+            pass
+    return out
+
+
+_VICTIM_SCORERS = {
+    # Leaking VMs grow; a stable large VM is less likely to be the cause
+    'growth': lambda c: [max(0.0, x['growth']) for x in c],
+    'idle': lambda c: [x['idle_sec'] for x in c],
+    'swap': lambda c: [x['swap'] for x in c],
+    'memory': lambda c: [x['mem'] for x in c],
+    # Higher configured priority protects a VM
+    'priority': lambda c: [-x['priority'] for x in c],
+    # Do not keep restarting the same VM; saturates after a day
+    'uptime': lambda c: [min(x['uptime'], 86400) for x in c],
+    # VMs stalling on memory themselves are thrashing
+    'pressure': lambda c: [x['mem_psi'] for x in c],
+}
+
+
+def register_victim_scorer(name: str, fn):
+    """Add a scoring column: fn(candidates) -> list of raw values (higher = better victim).
+    It takes part once swapVictimWeights gives it a weight."""
+    _VICTIM_SCORERS[name] = fn
+
+
+def _record_mem_history(cfg, rows, now, psi=None):
+    window = max(int(cfg.get('swapVictimWindowMinutes', 30)) * 60, _rule_window(cfg))
+    cpu_max = float(cfg.get('idleCpuPercent', 3))
+    net_max = float(cfg.get('idleNetKBps', 4)) * 1000
+    with _mem_hist_lock:
+        for name, mem, cpu, net, memperc in rows:
+            ps = (psi or {}).get(name) or {}
+            h = _mem_hist.get(name)
+            if h is None or net < h['net']:
+                h = _mem_hist[name] = {'samples': [], 'active': now, 'net': net, 'ts': now}
+            rate = (net - h['net']) / max(1.0, now - h['ts'])
+            if cpu > cpu_max or rate > net_max:
+                h['active'] = now
+            h.update(net=net, ts=now)
+            h['samples'] = [s for s in h['samples'] if now - s[0] <= window] + \
+                [[now, mem, cpu, memperc, _psi_val(ps, 'cpu'), _psi_val(ps, 'memory'), _psi_val(ps, 'io')]]
+        for name in list(_mem_hist):
+            if name not in {r[0] for r in rows}:
+                _mem_hist.pop(name, None)
+
+
+def _sample_vms(cfg):
+    """One docker stats pass over the fleet (plus each VM's PSI): feeds the history and
+    returns (container, mem_bytes, cpu_percent, net_bytes, mem_percent) rows."""
+    out = subprocess.check_output(['docker', 'stats', '--no-stream', '--format',
+                                   '{{.Name}}|{{.MemUsage}}|{{.CPUPerc}}|{{.NetIO}}|{{.MemPerc}}'], text=True)
+    suspended = suspended_vms()
+    rows = []
+    for line in out.splitlines():
+        p = line.strip().split('|')
+        if len(p) < 5 or not p[0].startswith('blobevm_') or p[0][len('blobevm_'):] in suspended:
+            continue
+        try:
+            cpu = float(p[2].strip().replace('%', ''))
+        except Exception:
+            cpu = 0.0
+        try:
+            memperc = float(p[4].strip().replace('%', ''))
+        except Exception:
+            memperc = 0.0
+        rx, _, tx = p[3].partition('/')
+        rows.append((p[0], _parse_size(p[1].split('/')[0]), cpu, _parse_size(rx) + _parse_size(tx), memperc))
+    psi = {}
+    if cfg.get('psiEnabled', True) and psi_available():
+        global _psi_ts
+        # Through docker exec the VMs' PSI is refreshed less often; between refreshes
+        # the last values stand
+        if os.path.isdir(HOST_CGROUP) or time.time() - _psi_ts >= int(cfg.get('psiExecIntervalSec', 60)) \
+                or set(_psi_last) != {r[0] for r in rows}:
+            fresh = _cg_map(_container_psi, [r[0] for r in rows])
+            _psi_last.clear()
+            _psi_last.update(fresh)
+            _psi_ts = time.time()
+        psi = {r[0]: _psi_last.get(r[0], {}) for r in rows}
+    _record_mem_history(cfg, rows, time.time(), psi)
+    global _last_rows
+    _last_rows = rows
+    return rows
+
+
+def rank_swap_victims(cfg=None, rows=None):
+    """Score every running VM as a swap-pressure victim, best candidate first.
+
+    Without rows this ranks the last pass's snapshot rather than sampling again."""
+    cfg = cfg or load_config()
+    if rows is None:
+        rows = list(_last_rows)
+    if not rows:
+        return []
+    now = time.time()
+    started = _started_at([r[0] for r in rows])
+    cands = []
+    with _mem_hist_lock:
+        for name, mem, *_ in rows:
+            h = _mem_hist.get(name) or {'samples': [], 'active': now}
+            vm = name[len('blobevm_'):]
+            try:
+                prio = int(_vm_meta(vm).get('priority') or 0)
+            except ValueError:
+                prio = 0
+            cands.append({'container': name, 'vm': vm, 'mem': mem, 'growth': _growth_rate(h['samples']),
+                          'idle_sec': now - h['active'], 'priority': prio,
+                          'uptime': now - started.get(name, now)})
+    swap = _cg_map(_cg_swap, [c['container'] for c in cands])
+    for c in cands:
+        c['swap'] = swap[c['container']]
+        c['mem_psi'] = _psi_val(_psi_last.get(c['container']) or {}, 'memory', 'some', 'avg60') or 0.0
+    weights = dict(DEFAULT_CFG['swapVictimWeights'], **(cfg.get('swapVictimWeights') or {}))
+    for c in cands:
+        c['score'] = 0.0
+        c['parts'] = {}
+    # One column per scorer over all candidates; min-max normalise, then weight
+    for key, w in weights.items():
+        fn = _VICTIM_SCORERS.get(key)
+        if not fn or not w:
+            continue
+        col = [float(v) for v in fn(cands)]
+        lo, hi = min(col), max(col)
+        for c, v in zip(cands, col):
+            part = round(float(w) * ((v - lo) / (hi - lo) if hi > lo else 0.0), 3)
+            c['parts'][key] = part
+            c['score'] += part
+    for c in cands:
+        c['score'] = round(c['score'], 3)
+        c['growth'] = int(c['growth'])
+        c['idle_sec'] = int(c['idle_sec'])
+        c['uptime'] = int(c['uptime'])
+    return sorted(cands, key=lambda c: c['score'], reverse=True)
+
+
+def _swap_percent() -> int:
+    out = subprocess.check_output(['free', '-b'], text=True)
+    line = next((l for l in out.split('\n') if l.lower().startswith('swap')), '')
+    parts = re.split(r'\s+', line.strip()) if line else []
+    total = int(parts[1]) if len(parts) > 1 else 0
+    used = int(parts[2]) if len(parts) > 2 else 0
+    return int(round(used / total * 100)) if total else 0
+
+
+def _run_swap_guard(cfg, rows):
+    try:
+        perc = _swap_percent()
+        if perc < cfg.get('swapThreshold', 10):
+            return None
+        # Swap in use is not a problem until tasks actually stall on memory
+        stall = _host_psi_metrics()['host_mem_psi'] if cfg.get('psiEnabled', True) else None
+        if stall is not None and stall < float(cfg.get('swapPsiThreshold', 10)):
+            return None
+        ranked = rank_swap_victims(cfg, rows)
+        if cfg.get('swapDropCaches'):
+            try:
+                subprocess.check_call(['bash', '-c', 'sync; echo 3 > /proc/sys/vm/drop_caches'])
             except Exception:
-                perc = 0.0
-            threshold = cfg.get('memoryThreshold', 60)
-            if perc >= threshold:
-                log(f'Restarting {name} due to memory {perc}%')
-                try:
-                    subprocess.check_call(['docker', 'restart', name])
-                except Exception:
-                    pass
-                return {'action': 'restart', 'reason': 'memory', 'container': name, 'perc': perc}
+                pass
+        if not ranked:
+            return None
+        victim = ranked[0]
+        parts = ' '.join(f'{k}={v}' for k, v in victim['parts'].items())
+        log(f'Restarting {victim["container"]} due to swap {perc}% (memory stall {stall}%): score {victim["score"]} ({parts}; '
+            f'mem {victim["mem"] >> 20}MiB, growth {victim["growth"] >> 20}MiB/h, swap {victim["swap"] >> 20}MiB, '
+            f'idle {victim["idle_sec"]}s)')
+        try:
+            with open(SWAPVICTIM_PATH, 'w') as f:
+                json.dump({'ts': int(time.time()), 'swap_percent': perc, 'mem_psi': stall, 'victim': victim['vm'],
+                           'candidates': ranked[:10]}, f)
+        except Exception:
+            pass
+        try:
+            subprocess.check_call(['docker', 'restart', victim['container']])
+        except Exception:
+            pass
+        with _mem_hist_lock:
+            _mem_hist.pop(victim['container'], None)
+        return {'action': 'restart', 'reason': 'swap', 'perc': perc, 'heaviest': victim['container'],
+                'score': victim['score'], 'parts': victim['parts']}
     except Exception as e:
-        log(f'memguard error {e}')
+        log(f'swapguard error {e}')
     return None
 
 
-def _run_cpu_guard(cfg):
+def last_swap_victim():
     try:
-        out = subprocess.check_output(['docker', 'stats', '--no-stream', '--format', '{{.Name}} {{.CPUPerc}}'], text=True)
-        for l in out.splitlines():
-            parts = l.strip().split()
-            if not parts:
+        with open(SWAPVICTIM_PATH) as f:
+            return json.load(f)
+    except Exception:
+        return None
+
+
+# Rule engine: guards as declarative rules evaluated against the whole fleet snapshot
+# of one pass, instead of returning at the first container over a threshold. A rule is
+#   {'name', 'metric', 'op', 'value', 'window' (seconds), 'agg', 'and', 'action', 'cooldownMinutes'}
+# metric is one of RULE_METRICS (per VM; the *_psi ones are PSI some avg10), 'mem_growth'
+# (bytes/hour), 'idle_sec' or one of HOST_METRICS. Over the window, agg 'all' (the
+# default) requires every sample to match, i.e. a sustained condition; 'avg', 'max' and
+# 'last' compare one value. 'and' lists more {'metric', 'op', 'value'} conditions that
+# must also hold. 'skipManaged' leaves out VMs whose memory limit the optimizer sets
+# (right-sizing, forecast reclaim). action is 'restart', 'recreate' or 'log'. Every match becomes a planned
+# action. Actions are deduplicated per VM, keeping the strongest, and then run. Rules are
+# skipped during their cooldown, and restarts also honour containerRestartCooldownMinutes.
+# With rulesDryRun the plan is only logged and saved.
+RULES_PLAN_PATH = os.path.join(STATE_DIR, '.rules_plan.json')
+RULE_METRICS = {'mem_bytes': 1, 'cpu_percent': 2, 'mem_percent': 3, 'cpu_psi': 4, 'mem_psi': 5, 'io_psi': 6}
+HOST_METRICS = ('host_cpu_psi', 'host_mem_psi', 'host_mem_full_psi', 'host_io_psi')
+_RULE_OPS = {'>': lambda a, b: a > b, '>=': lambda a, b: a >= b, '<': lambda a, b: a < b,
+             '<=': lambda a, b: a <= b}
+_ACTION_RANK = {'log': 0, 'restart': 1, 'recreate': 2}
+_rule_fired = {}  # (rule, container) -> ts
+
+
+def effective_rules(cfg) -> list:
+    """The built-in memory/CPU guard rules (when those guards are on) plus cfg['rules']."""
+    guards = cfg.get('guards', {})
+    cooldown = cfg.get('containerRestartCooldownMinutes', 10)
+    psi = cfg.get('psiEnabled', True) and psi_available()
+    rules = []
+    if guards.get('memory'):
+        # VMs whose limit the optimizer sizes run near it by design; they are not restarted
+        rule = {'name': 'memory', 'metric': 'mem_percent', 'op': '>=', 'value': cfg.get('memoryThreshold', 60),
+                'window': 0, 'action': 'restart', 'cooldownMinutes': cooldown, 'skipManaged': True}
+        if psi:
+            # A full VM is only a problem once it stalls reclaiming memory
+            rule['and'] = [{'metric': 'mem_psi', 'op': '>=', 'value': cfg.get('psiMemoryThreshold', 10)}]
+        rules.append(rule)
+    if guards.get('cpu'):
+        # Sustained for a minute, so a compile or page load does not trigger a restart
+        rule = {'name': 'cpu', 'metric': 'cpu_percent', 'op': '>=', 'value': cfg.get('cpuThreshold', 70),
+                'window': 60, 'action': 'restart', 'cooldownMinutes': cooldown}
+        if psi:
+            # ...and only while other tasks on the host are waiting for CPU
+            rule['and'] = [{'metric': 'host_cpu_psi', 'op': '>=', 'value': cfg.get('psiCpuThreshold', 20)}]
+        rules.append(rule)
+    return rules + [r for r in (cfg.get('rules') or []) if isinstance(r, dict)]
+
+
+def _memory_managed_vms(cfg) -> set:
+    """VMs whose memory limit right-sizing or a forecast reclaim currently sets."""
+    vms = set(_load_forecast().get('tightened', {}))
+    if cfg.get('guards', {}).get('rightsize'):
+        vms |= {vm for vm, v in _load_rightsize().get('vms', {}).items() if v.get('limit')}
+    return vms
+
+
+def _rule_window(cfg) -> int:
+    return max([int(r.get('window') or 0) for r in effective_rules(cfg)] or [0])
+
+
+def _rule_value(rule, h, now):
+    metric = rule.get('metric')
+    if metric == 'mem_growth':
+        return _growth_rate(h['samples'])
+    if metric == 'idle_sec':
+        return now - h['active']
+    idx = RULE_METRICS.get(metric)
+    if idx is None:
+        return None
+    window = int(rule.get('window') or 0)
+    vals = [s[idx] for s in h['samples'] if now - s[0] <= window] if window else []
+    vals = [v for v in (vals or [h['samples'][-1][idx]]) if v is not None]
+    if not vals:
+        return None
+    # 'all' needs the whole window covered, not just the samples since the VM appeared
+    if window and rule.get('agg', 'all') == 'all' and now - h['samples'][0][0] < window:
+        return None
+    agg = rule.get('agg', 'all')
+    if agg == 'avg':
+        return sum(vals) / len(vals)
+    if agg == 'max':
+        return max(vals)
+    if agg == 'last':
+        return vals[-1]
+    return vals
+
+
+def _cond_match(cond, h, now, host):
+    """(matched, shown value, threshold) for one condition; None if it cannot be evaluated."""
+    op = _RULE_OPS.get(cond.get('op', '>='))
+    try:
+        threshold = float(cond.get('value'))
+    except (TypeError, ValueError):
+        return None
+    if op is None:
+        return None
+    val = host.get(cond.get('metric')) if cond.get('metric') in HOST_METRICS else _rule_value(cond, h, now)
+    if val is None:
+        return None
+    matched = all(op(v, threshold) for v in val) if isinstance(val, list) else op(val, threshold)
+    return matched, (val[-1] if isinstance(val, list) else round(val, 1)), threshold
+
+
+def plan_actions(cfg=None, rows=None) -> list:
+    """Evaluate every rule against every running VM; one (deduplicated) action per VM."""
+    cfg = cfg or load_config()
+    if rows is None:
+        rows = list(_last_rows)
+    now = time.time()
+    plan = {}
+    host = _host_psi_metrics() if cfg.get('psiEnabled', True) else {}
+    with _mem_hist_lock:
+        hist = {r[0]: _mem_hist.get(r[0]) for r in rows}
+    managed = _memory_managed_vms(cfg)
+    for rule in effective_rules(cfg):
+        name = rule.get('name') or rule.get('metric')
+        action = rule.get('action', 'restart')
+        if action not in _ACTION_RANK:
+            continue
+        cooldown = float(rule.get('cooldownMinutes', 0)) * 60
+        conds = [rule] + [dict({'window': rule.get('window'), 'agg': rule.get('agg')}, **c)
+                          for c in (rule.get('and') or []) if isinstance(c, dict)]
+        for container, h in hist.items():
+            if not h or not h['samples']:
                 continue
-            name = parts[0]
-            if not name.startswith('blobevm_'):
+            if rule.get('skipManaged') and container[len('blobevm_'):] in managed:
                 continue
-            percRaw = parts[1] if len(parts) > 1 else '0%'
-            try:
-                perc = float(percRaw.replace('%', ''))
-            except Exception:
-                perc = 0.0
-            threshold = cfg.get('cpuThreshold', 70)
-            if perc >= threshold:
-                # best-effort second check omitted
-                log(f'Restarting {name} due to cpu {perc}%')
-                try:
-                    subprocess.check_call(['docker', 'restart', name])
-                except Exception:
-                    pass
-                return {'action': 'restart', 'reason': 'cpu', 'container': name, 'perc': perc}
-    except Exception as e:
-        log(f'cpuguard error {e}')
-    return None
+            results = [_cond_match(c, h, now, host) for c in conds]
+            if not all(r and r[0] for r in results):
+                continue
+            hit = {'rule': name, 'metric': rule.get('metric'), 'value': results[0][1], 'threshold': results[0][2]}
+            if len(conds) > 1:
+                hit['and'] = [{'metric': c.get('metric'), 'value': r[1], 'threshold': r[2]}
+                              for c, r in zip(conds[1:], results[1:])]
+            if now - _rule_fired.get((name, container), 0) < cooldown:
+                hit['cooldown'] = True
+            p = plan.setdefault(container, {'container': container, 'vm': container[len('blobevm_'):],
+                                            'action': None, 'reasons': []})
+            p['reasons'].append(hit)
+            if not hit.get('cooldown') and (p['action'] is None or _ACTION_RANK[action] > _ACTION_RANK[p['action']]):
+                p['action'] = action
+    # VMs that only matched rules still cooling down are reported, not acted on
+    return sorted(plan.values(), key=lambda p: -_ACTION_RANK.get(p['action'], -1))
 
 
-def _run_swap_guard(cfg):
-    try:
-        out = subprocess.check_output(['free', '-b'], text=True)
-        lines = out.split('\n')
-        swapLine = next((l for l in lines if l.lower().startswith('swap')), '')
-        if swapLine:
-            parts = re.split(r'\s+', swapLine.strip())
-            total = int(parts[1]) if len(parts) > 1 else 0
-            used = int(parts[2]) if len(parts) > 2 else 0
-            perc = int(round(used / total * 100)) if total else 0
-            threshold = cfg.get('swapThreshold', 10)
-            if perc >= threshold:
-                # restart heaviest VM by memory
-                stats = subprocess.check_output(['docker', 'stats', '--no-stream', '--format', '{{.Name}} {{.MemUsage}}'], text=True)
-                heaviest = None; maxBytes = 0
-                for l in stats.splitlines():
-                    p = l.strip().split()
-                    if not p: continue
-                    name = p[0]
-                    if not name.startswith('blobevm_'): continue
-                    usage = p[1] if len(p) > 1 else '0'
-                    m = re.search(r'([0-9.]+)([KMG]i?)B', usage)
-                    bytes_ = 0
-                    if m:
-                        n = float(m.group(1)); u = m.group(2).upper(); mul = 1024
-                        if u.startswith('G'): mul = 1024*1024*1024
-                        elif u.startswith('M'): mul = 1024*1024
-                        bytes_ = int(n * mul)
-                    if bytes_ > maxBytes:
-                        maxBytes = bytes_; heaviest = name
-                try:
-                    subprocess.check_call(['bash', '-c', 'sync; echo 3 > /proc/sys/vm/drop_caches'])
-                except Exception:
-                    pass
-                if heaviest:
-                    try:
-                        subprocess.check_call(['docker', 'restart', heaviest])
-                        log(f'Restarting {heaviest} due to swap {perc}%')
-                    except Exception:
-                        pass
-                    return {'action': 'restart', 'reason': 'swap', 'perc': perc, 'heaviest': heaviest}
-    except Exception as e:
-        log(f'swapguard error {e}')
-    return None
+def _restart_cooldown_ok(cfg, container, now) -> bool:
+    p = os.path.join(RESTART_META_DIR, re.sub(r'[^A-Za-z0-9_.-]', '_', container) + '.last')
+    try:
+        with open(p) as f:
+            last = int(f.read().strip())
+    except Exception:
+        last = 0
+    return now - last >= int(cfg.get('containerRestartCooldownMinutes', 10)) * 60
+
+
+def _mark_restarted(container, now):
+    try:
+        os.makedirs(RESTART_META_DIR, exist_ok=True)
+        with open(os.path.join(RESTART_META_DIR, re.sub(r'[^A-Za-z0-9_.-]', '_', container) + '.last'), 'w') as f:
+            f.write(str(int(now)))
+    except Exception:
+        pass
+
+
+def _execute_plan(cfg, plan, dry_run, quiet=False) -> list:
+    now = time.time()
+    events = []
+    budget = int(cfg.get('rulesMaxActionsPerPass', 5))
+    for p in plan:
+        why = ', '.join(f'{r["rule"]} {r["metric"]}={r["value"]}' for r in p['reasons'])
+        if p['action'] is None:
+            p['result'] = 'cooldown'
+            continue
+        if p['action'] != 'log' and not _restart_cooldown_ok(cfg, p['container'], now):
+            p['result'] = 'cooldown'
+            continue
+        if p['action'] != 'log' and budget <= 0:
+            p['result'] = 'deferred'
+            continue
+        if dry_run:
+            p['result'] = 'planned'
+            if not quiet:
+                log(f'rules (dry run): would {p["action"]} {p["container"]} ({why})')
+            continue
+        for r in p['reasons']:
+            if not r.get('cooldown'):
+                _rule_fired[(r['rule'], p['container'])] = now
+        if p['action'] == 'log':
+            p['result'] = 'logged'
+            log(f'rules: {p["container"]} matched {why}')
+            continue
+        budget -= 1
+        try:
+            if p['action'] == 'recreate':
+                subprocess.check_call(['blobe-vm-manager', 'recreate', p['vm']], stdout=subprocess.DEVNULL)
+            else:
+                subprocess.check_call(['docker', 'restart', p['container']], stdout=subprocess.DEVNULL)
+            p['result'] = 'done'
+            _mark_restarted(p['container'], now)
+            with _mem_hist_lock:
+                _mem_hist.pop(p['container'], None)
+        except Exception as e:
+            p['result'] = f'failed: {e}'
+        log(f'rules: {p["action"]} {p["container"]} ({why}) -> {p["result"]}')
+        events.append({'action': p['action'], 'reason': 'rules', 'container': p['container'],
+                       'rules': [r['rule'] for r in p['reasons']]})
+    return events
+
+
+def _run_rules(cfg, rows):
+    dry_run = bool(cfg.get('rulesDryRun'))
+    plan = plan_actions(cfg, rows)
+    events = _execute_plan(cfg, plan, dry_run)
+    try:
+        with open(RULES_PLAN_PATH, 'w') as f:
+            json.dump({'ts': int(time.time()), 'dry_run': dry_run, 'plan': plan}, f)
+    except Exception:
+        pass
+    return events or None
+
+
+def preview_plan() -> list:
+    """What the rules would do on the last pass's snapshot, without acting or logging."""
+    cfg = load_config()
+    plan = plan_actions(cfg)
+    _execute_plan(cfg, plan, True, quiet=True)
+    return plan
+
+
+def last_plan():
+    try:
+        with open(RULES_PLAN_PATH) as f:
+            return json.load(f)
+    except Exception:
+        return None
 
 
 def _run_health_guard(cfg):
@@ -324,10 +890,13 @@ def _run_health_guard(cfg):
         # use blobe-vm-manager list output
         out = subprocess.check_output(['blobe-vm-manager', 'list'], text=True)
         lines = [l for l in out.splitlines() if l.strip().startswith('- ')]
+        suspended = suspended_vms()
         for l in lines:
             try:
                 parts = l[2:].split('->')
                 name = parts[0].strip().split()[0]
+                if name in suspended:
+                    continue
                 url = (parts[2] if len(parts) > 2 else '').strip()
                 if not url:
                     continue
@@ -366,23 +935,904 @@ def _run_health_guard(cfg):
     return None
 
 
+# Idle suspend: a VM whose CPU, network traffic and web (KasmVNC) connections stay
+# below the thresholds for idleMinutes is paused; after idleStopMinutes it is stopped
+# (or hibernated with a CRIU checkpoint when idleStopAction is 'hibernate') so its
+# memory is returned to the host. wake() brings it back (the VM wrapper page
+# calls it). Suspensions and resumes are recorded under IDLE_DIR for reporting.
+IDLE_DIR = os.path.join(STATE_DIR, '.idle')
+IDLE_EVENTS_PATH = os.path.join(IDLE_DIR, 'events.jsonl')
+CHECKPOINT_DIR = os.path.join(STATE_DIR, 'checkpoints')
+_idle_seen = {}  # container -> {'active': ts of last activity, 'net': cumulative bytes, 'ts': sample time}
+_idle_lock = threading.Lock()
+
+_SIZE_UNITS = {'': 1, 'k': 1024, 'm': 1024**2, 'g': 1024**3, 't': 1024**4, 'b': 1, 'kb': 1000, 'mb': 1000**2, 'gb': 1000**3, 'tb': 1000**4,
+               'kib': 1024, 'mib': 1024**2, 'gib': 1024**3, 'tib': 1024**4}
+
+
+def _parse_size(s: str) -> int:
+    m = re.match(r'\s*([0-9.]+)\s*([A-Za-z]*)', s or '')
+    if not m:
+        return 0
+    return int(float(m.group(1)) * _SIZE_UNITS.get(m.group(2).lower(), 1))
+
+
+def _idle_record_path(vm: str) -> str:
+    return os.path.join(IDLE_DIR, re.sub(r'[^A-Za-z0-9_.-]', '_', vm) + '.json')
+
+
+def _idle_record(vm: str):
+    try:
+        with open(_idle_record_path(vm)) as f:
+            return json.load(f)
+    except Exception:
+        return None
+
+
+def suspended_vms() -> dict:
+    """VM name -> suspension record for VMs the idle guard has paused or stopped."""
+    out = {}
+    try:
+        for n in os.listdir(IDLE_DIR):
+            if n.endswith('.json'):
+                rec = _idle_record(n[:-5])
+                if rec and rec.get('vm'):
+                    out[rec['vm']] = rec
+    except Exception:
+        pass
+    return out
+
+
+def _idle_event(ev: dict):
+    try:
+        os.makedirs(IDLE_DIR, exist_ok=True)
+        with open(IDLE_EVENTS_PATH, 'a') as f:
+            f.write(json.dumps(ev) + '\n')
+    except Exception:
+        pass
+
+
+def _web_connections(container: str) -> int:
+    """Established TCP connections to the VM's web/VNC port 3000 (0x0BB8)."""
+    try:
+        out = subprocess.check_output(['docker', 'exec', container, 'cat', '/proc/net/tcp', '/proc/net/tcp6'],
+                                      text=True, stderr=subprocess.DEVNULL, timeout=5)
+    except Exception:
+        return -1
+    n = 0
+    for line in out.splitlines():
+        parts = line.split()
+        if len(parts) > 3 and parts[1].endswith(':0BB8') and parts[3] == '01':
+            n += 1
+    return n
+
+
+def _run_idle_guard(cfg):
+    idle_sec = int(cfg.get('idleMinutes', 30)) * 60
+    stop_sec = int(cfg.get('idleStopMinutes', 120)) * 60
+    cpu_max = float(cfg.get('idleCpuPercent', 3))
+    net_max = float(cfg.get('idleNetKBps', 4)) * 1000
+    exclude = set(cfg.get('idleExclude') or [])
+    events = []
+    try:
+        out = subprocess.check_output(['docker', 'stats', '--no-stream', '--format', '{{.Name}}|{{.CPUPerc}}|{{.NetIO}}|{{.MemUsage}}'], text=True)
+    except Exception as e:
+        log(f'idleguard error {e}')
+        return None
+    now = time.time()
+    suspended = suspended_vms()
+    for line in out.splitlines():
+        parts = line.strip().split('|')
+        if len(parts) < 4 or not parts[0].startswith('blobevm_'):
+            continue
+        name = parts[0]
+        vm = name[len('blobevm_'):]
+        rec = suspended.get(vm)
+        if rec and rec.get('state') in ('stopped', 'hibernated'):
+            # Started again some other way (dashboard, manager): no longer suspended
+            try:
+                os.remove(_idle_record_path(vm))
+            except Exception:
+                pass
+            rec = None
+        if vm in exclude:
+            continue
+        if rec and rec.get('state') == 'paused':
+            # Escalate long pauses to a stop (or a CRIU hibernation, which keeps open
+            # apps); both actually free the memory
+            if stop_sec and now - rec.get('since', now) >= stop_sec - idle_sec:
+                action = 'stop'
+                if cfg.get('idleStopAction') == 'hibernate':
+                    r = subprocess.run(['blobe-vm-manager', 'hibernate', vm], capture_output=True, text=True)
+                    if r.returncode == 0:
+                        action = 'hibernate'
+                    else:
+                        log(f'idle hibernate failed {name}, stopping instead : {(r.stderr or r.stdout).strip()}')
+                try:
+                    if action == 'stop':
+                        subprocess.check_call(['docker', 'unpause', name], stdout=subprocess.DEVNULL)
+                        subprocess.check_call(['docker', 'stop', name], stdout=subprocess.DEVNULL)
+                    state = 'hibernated' if action == 'hibernate' else 'stopped'
+                    rec.update(state=state, stopped=int(now), reclaimed_bytes=rec.get('mem_bytes', 0))
+                    with open(_idle_record_path(vm), 'w') as f:
+                        json.dump(rec, f)
+                    _idle_event({'ts': int(now), 'vm': vm, 'event': action, 'mem_bytes': rec.get('mem_bytes', 0)})
+                    log(f'Idle {action} {name} (paused {int(now - rec["since"])}s)')
+                    events.append({'action': f'idle-{action}', 'container': name})
+                except Exception as e:
+                    log(f'idle stop failed {name} : {e}')
+            continue
+        try:
+            cpu = float(parts[1].strip().replace('%', ''))
+        except Exception:
+            cpu = 0.0
+        rx, _, tx = parts[2].partition('/')
+        net = _parse_size(rx) + _parse_size(tx)
+        with _idle_lock:
+            seen = _idle_seen.get(name)
+            if seen is None or net < seen['net']:
+                _idle_seen[name] = {'active': now, 'net': net, 'ts': now}
+                continue
+            rate = (net - seen['net']) / max(1.0, now - seen['ts'])
+            seen.update(net=net, ts=now)
+            if cpu > cpu_max or rate > net_max:
+                seen['active'] = now
+                continue
+            quiet = now - seen['active']
+        if quiet < idle_sec:
+            continue
+        conns = _web_connections(name)
+        if conns != 0:
+            # Someone is connected (or we cannot tell): not idle
+            with _idle_lock:
+                _idle_seen[name]['active'] = now
+            continue
+        mem = _parse_size(parts[3].split('/')[0])
+        try:
+            subprocess.check_call(['docker', 'pause', name], stdout=subprocess.DEVNULL)
+        except Exception as e:
+            log(f'idle pause failed {name} : {e}')
+            continue
+        rec = {'vm': vm, 'state': 'paused', 'since': int(now), 'idle_sec': int(quiet), 'mem_bytes': mem, 'cpu': cpu}
+        try:
+            os.makedirs(IDLE_DIR, exist_ok=True)
+            with open(_idle_record_path(vm), 'w') as f:
+                json.dump(rec, f)
+        except Exception:
+            pass
+        _idle_event({'ts': int(now), 'vm': vm, 'event': 'pause', 'mem_bytes': mem, 'idle_sec': int(quiet)})
+        log(f'Idle pause {name} after {int(quiet)}s (cpu {cpu}%, {int(rate)} B/s)')
+        events.append({'action': 'idle-pause', 'container': name, 'idle_sec': int(quiet)})
+        with _idle_lock:
+            _idle_seen.pop(name, None)
+    return events or None
+
+
+def _wait_web_ready(container: str, timeout: float) -> bool:
+    deadline = time.time() + timeout
+    while time.time() < deadline:
+        try:
+            code = subprocess.check_output(['docker', 'exec', container, 'curl', '-s', '-o', '/dev/null', '-m', '2',
+                                            '-w', '%{http_code}', 'http://127.0.0.1:3000/'],
+                                           text=True, stderr=subprocess.DEVNULL, timeout=5)
+            if re.fullmatch(r'[1-4][0-9][0-9]', code.strip()):
+                return True
+        except Exception:
+            pass
+        time.sleep(0.5)
+    return False
+
+
+def wake(vm: str, timeout: float = 60.0) -> dict:
+    """Resume a VM the idle guard suspended (or any paused VM). Blocks until the VM
+    answers on port 3000 and returns the measured resume latency."""
+    name = f'blobevm_{vm}'
+    rec = _idle_record(vm) or {}
+    t0 = time.time()
+    try:
+        state = subprocess.check_output(['docker', 'inspect', '-f', '{{.State.Status}}', name], text=True,
+                                        stderr=subprocess.DEVNULL).strip()
+    except Exception:
+        return {'ok': False, 'error': 'not found'}
+    if state == 'running' and not rec:
+        return {'ok': True, 'vm': vm, 'resumed': False}
+    try:
+        if state == 'paused':
+            subprocess.check_call(['docker', 'unpause', name], stdout=subprocess.DEVNULL)
+        elif state != 'running' and os.path.isfile(os.path.join(CHECKPOINT_DIR, vm, 'meta.json')):
+            # Hibernated: the manager restores the checkpoint (or cold-starts if it cannot)
+            subprocess.check_call(['blobe-vm-manager', 'resume', vm], stdout=subprocess.DEVNULL)
+            state = 'hibernated'
+        elif state != 'running':
+            subprocess.check_call(['docker', 'start', name], stdout=subprocess.DEVNULL)
+    except Exception as e:
+        return {'ok': False, 'error': str(e)}
+    ready = state == 'paused' or _wait_web_ready(name, timeout)
+    ms = int((time.time() - t0) * 1000)
+    try:
+        os.remove(_idle_record_path(vm))
+    except Exception:
+        pass
+    with _idle_lock:
+        _idle_seen.pop(name, None)
+    _idle_event({'ts': int(t0), 'vm': vm, 'event': 'resume', 'from': state, 'ms': ms, 'ready': ready,
+                 'suspended_sec': int(t0 - rec['since']) if rec.get('since') else None})
+    log(f'Resumed {name} from {state} in {ms}ms')
+    return {'ok': True, 'vm': vm, 'resumed': True, 'from': state, 'resume_ms': ms, 'ready': ready}
+
+
+def idle_status() -> dict:
+    """Suspended VMs, memory they hand back, and resume latency from recent events."""
+    cfg = load_config()
+    suspended = suspended_vms()
+    events = []
+    try:
+        with open(IDLE_EVENTS_PATH) as f:
+            events = [json.loads(l) for l in f.readlines()[-500:] if l.strip()]
+    except Exception:
+        pass
+    resumes = sorted(e['ms'] for e in events if e.get('event') == 'resume' and isinstance(e.get('ms'), int))
+
+    def lat(src):
+        ms = sorted(e['ms'] for e in events if e.get('event') == 'resume' and e.get('from') == src)
+        if not ms:
+            return None
+        return {'count': len(ms), 'p50': ms[len(ms) // 2], 'max': ms[-1], 'avg': sum(ms) // len(ms)}
+    return {
+        'enabled': bool(cfg.get('guards', {}).get('idle')),
+        'idleMinutes': cfg.get('idleMinutes', 30),
+        'idleStopMinutes': cfg.get('idleStopMinutes', 120),
+        'paused': sorted(v for v, r in suspended.items() if r.get('state') == 'paused'),
+        'stopped': sorted(v for v, r in suspended.items() if r.get('state') == 'stopped'),
+        'hibernated': sorted(v for v, r in suspended.items() if r.get('state') == 'hibernated'),
+        # A paused container keeps its pages; only stopped/hibernated ones give memory back
+        'reclaimed_bytes': sum(r.get('mem_bytes', 0) for r in suspended.values()
+                               if r.get('state') in ('stopped', 'hibernated')),
+        'paused_bytes': sum(r.get('mem_bytes', 0) for r in suspended.values() if r.get('state') == 'paused'),
+        'resume_ms': {'count': len(resumes), 'from_paused': lat('paused'), 'from_stopped': lat('exited'),
+                      'from_hibernated': lat('hibernated')},
+        'recent': events[-20:][::-1],
+    }
+
+
+# Memory right-sizing: each VM's limit follows its working set (memory.current minus
+# inactive file cache) instead of one global memoryLimit. Limits grow as soon as the
+# working set nears them or the cgroup records an OOM kill, and shrink slowly after
+# usage has stayed low for a while. Growth never eats into rightsizeHostReserve.
+# Changes are applied in place with `docker update`. Per-VM bounds come from
+# `blobe-vm-manager set-mem-bounds` (mem_min/mem_max); VMs with a static limit from
+# `set-limits` are left alone.
+RIGHTSIZE_PATH = os.path.join(STATE_DIR, '.rightsize.json')
+_RS_ROUND = 64 * 1024 * 1024
+
+_CG_MEM_SCRIPT = (
+    'cd /sys/fs/cgroup; if [ -f memory.current ]; then echo cur $(cat memory.current); '
+    'grep -E "^(inactive_file|file) " memory.stat; grep "^oom_kill " memory.events; '
+    'else cd memory; echo cur $(cat memory.usage_in_bytes); grep -E "^total_(inactive_file|cache) " memory.stat; '
+    'grep "^oom_kill " memory.oom_control; fi'
+)
+
+
+def _host_cg_memory(d: str) -> str:
+    """The same lines _CG_MEM_SCRIPT prints, read from the host cgroup tree."""
+    if os.path.exists(os.path.join(d, 'memory.current')):
+        files, keep = ('memory.current', 'memory.stat', 'memory.events'), ('inactive_file ', 'file ', 'oom_kill ')
+    else:
+        files, keep = ('memory.usage_in_bytes', 'memory.stat', 'memory.oom_control'), \
+            ('total_inactive_file ', 'total_cache ', 'oom_kill ')
+    lines = [f'cur {_cg_file(d, files[0]).strip()}']
+    for name in files[1:]:
+        lines += [l for l in _cg_file(d, name).splitlines() if l.startswith(keep)]
+    return '\n'.join(lines)
+
+
+def _cg_memory(container: str):
+    """(working_set_bytes, oom_kills, usage_bytes, page_cache_bytes) from the container's
+    own cgroup (v2 or v1). Usage is memory.current, page cache included."""
+    try:
+        out = _cg_output(container, _CG_MEM_SCRIPT, _host_cg_memory)
+    except Exception:
+        return None
+    vals = {}
+    for line in out.splitlines():
+        parts = line.split()
+        if len(parts) == 2 and parts[1].isdigit():
+            vals[parts[0].replace('total_', '')] = int(parts[1])
+    if 'cur' not in vals:
+        return None
+    return (max(0, vals['cur'] - vals.get('inactive_file', 0)), vals.get('oom_kill', 0), vals['cur'],
+            vals.get('file', vals.get('cache', 0)))
+
+
+def _host_mem_available() -> int:
+    try:
+        with open('/proc/meminfo') as f:
+            for line in f:
+                if line.startswith('MemAvailable:'):
+                    return int(line.split()[1]) * 1024
+    except Exception:
+        pass
+    return 0
+
+
+def _vm_meta(vm: str) -> dict:
+    try:
+        with open(os.path.join(STATE_DIR, 'instances', vm, 'instance.json')) as f:
+            return json.load(f)
+    except Exception:
+        return {}
+
+
+def _load_rightsize() -> dict:
+    try:
+        with open(RIGHTSIZE_PATH) as f:
+            return json.load(f)
+    except Exception:
+        return {'vms': {}, 'changes': [], 'last_run': 0}
+
+
+def _save_rightsize(st: dict):
+    try:
+        tmp = RIGHTSIZE_PATH + '.tmp'
+        with open(tmp, 'w') as f:
+            json.dump(st, f)
+        os.replace(tmp, RIGHTSIZE_PATH)
+    except Exception as e:
+        log(f'rightsize save failed {e}')
+
+
+def _round_up(n: float) -> int:
+    return int(-(-n // _RS_ROUND) * _RS_ROUND)
+
+
+def _run_rightsize(cfg):
+    st = _load_rightsize()
+    now = time.time()
+    if now - st.get('last_run', 0) < int(cfg.get('rightsizeIntervalSec', 60)):
+        return None
+    st['last_run'] = now
+    headroom = 1 + float(cfg.get('rightsizeHeadroomPercent', 30)) / 100
+    window = int(cfg.get('rightsizeWindowMinutes', 30)) * 60
+    warmup = int(cfg.get('rightsizeWarmupMinutes', 5)) * 60
+    shrink_after = int(cfg.get('rightsizeShrinkMinutes', 15)) * 60
+    hold = int(cfg.get('rightsizeOomHoldHours', 6)) * 3600
+    swap_ratio = float(cfg.get('rightsizeSwapRatio', 0.5))
+    gmin = _parse_size(str(cfg.get('rightsizeMinMemory', '768m')))
+    gmax = _parse_size(str(cfg.get('rightsizeMaxMemory', '8g')))
+    reserve = _parse_size(str(cfg.get('rightsizeHostReserve', '2g')))
+    avail = _host_mem_available()
+    suspended = suspended_vms()
+    tightened = _load_forecast().get('tightened', {})
+    events = []
+    running = set()
+    for name in _docker_ps_names():
+        if not name.startswith('blobevm_'):
+            continue
+        vm = name[len('blobevm_'):]
+        running.add(vm)
+        meta = _vm_meta(vm)
+        if vm in suspended or meta.get('mem_limit') or vm in tightened:
+            continue  # suspended, pinned by set-limits, or capped by a forecast reclaim
+        sample = _cg_memory(name)
+        if sample is None:
+            continue
+        ws, oom, *_ = sample
+        v = st['vms'].setdefault(vm, {'samples': [], 'oom_kills': oom, 'first': now})
+        v['samples'] = [s for s in v['samples'] if now - s[0] <= window] + [[int(now), ws]]
+        v['ws'] = ws
+        if v.get('limit') is None:
+            try:
+                v['limit'] = int(subprocess.check_output(['docker', 'inspect', '-f', '{{.HostConfig.Memory}}', name],
+                                                         text=True).strip() or 0) or None
+            except Exception:
+                v['limit'] = None
+        lo = _parse_size(meta.get('mem_min', '')) or gmin
+        hi = _parse_size(meta.get('mem_max', '')) or gmax
+        limit = v.get('limit')
+        peak = max(s[1] for s in v['samples'])
+        target = min(hi, max(lo, _round_up(peak * headroom)))
+        reason = None
+        if oom > v.get('oom_kills', 0):
+            # The kernel killed something in this VM: give it room and stop shrinking for a while
+            target = min(hi, max(target, _round_up((limit or target) * 1.5)))
+            v['oom_hold_until'] = int(now + hold)
+            reason = 'oom'
+        v['oom_kills'] = oom
+        if limit is None:
+            if now - v.get('first', now) < warmup:
+                continue
+            reason = reason or 'initial'
+        elif target > limit:
+            reason = reason or 'grow'
+        elif target < limit * 0.85 and now - v.get('changed', 0) >= shrink_after \
+                and now >= v.get('oom_hold_until', 0):
+            target = max(target, _round_up(limit * 0.75))  # step down gradually
+            reason = 'shrink'
+        else:
+            continue
+        growth = target - (limit or 0)
+        if limit is not None and growth > 0 and avail - growth < reserve:
+            want = target
+            target = limit + max(0, avail - reserve) // _RS_ROUND * _RS_ROUND
+            if target <= limit:
+                log(f'rightsize: {name} wants {want >> 20}MiB but the host reserve is reached')
+                continue
+            growth = target - limit
+            reason += '-capped'
+        swap = int(target * (1 + swap_ratio))
+        try:
+            subprocess.check_call(['docker', 'update', f'--memory={target}', f'--memory-swap={swap}', name],
+                                  stdout=subprocess.DEVNULL)
+        except Exception as e:
+            log(f'rightsize update failed {name} : {e}')
+            continue
+        if growth > 0:
+            avail -= growth
+        log(f'rightsize {name}: {(limit or 0) >> 20}MiB -> {target >> 20}MiB ({reason}, working set {ws >> 20}MiB)')
+        v.update(limit=target, changed=int(now))
+        change = {'ts': int(now), 'vm': vm, 'from': limit, 'to': target, 'reason': reason, 'ws': ws}
+        st['changes'] = (st.get('changes') or [])[-99:] + [change]
+        events.append({'action': 'rightsize', 'container': name, 'reason': reason, 'limit': target})
+    # Forget VMs that are gone or stopped; a recreated container starts over
+    for vm in list(st['vms']):
+        if vm not in running:
+            st['vms'].pop(vm, None)
+    _save_rightsize(st)
+    return events or None
+
+
+def rightsize_status() -> dict:
+    st = _load_rightsize()
+    cfg = load_config()
+    vms = {}
+    for vm, v in st.get('vms', {}).items():
+        samples = v.get('samples') or []
+        vms[vm] = {'working_set': v.get('ws'), 'peak': max((s[1] for s in samples), default=None),
+                   'limit': v.get('limit'), 'oom_kills': v.get('oom_kills', 0),
+                   'oom_hold_until': v.get('oom_hold_until'), 'changed': v.get('changed')}
+    limits = [v['limit'] for v in vms.values() if v['limit']]
+    total = 0
+    try:
+        with open('/proc/meminfo') as f:
+            total = int(f.readline().split()[1]) * 1024
+    except Exception:
+        pass
+    reserve = _parse_size(str(cfg.get('rightsizeHostReserve', '2g')))
+    committed = sum(limits)
+    avg = committed // len(limits) if limits else 0
+    return {
+        'enabled': bool(cfg.get('guards', {}).get('rightsize')),
+        'vms': vms,
+        'host_total': total,
+        'host_reserve': reserve,
+        'committed_bytes': committed,
+        'working_set_bytes': sum(v['working_set'] or 0 for v in vms.values()),
+        # How many more VMs of the current average size fit under the reserve
+        'room_for_vms': max(0, (total - reserve - committed) // avg) if avg else None,
+        'recent_changes': (st.get('changes') or [])[-20:][::-1],
+    }
+
+# CPU fairness: every VM starts with Docker's default weight (1024 shares), so one busy
+# VM competes on equal terms with desktops people are using. This pass classifies each
+# VM from its smoothed CPU use and whether a viewer is connected, and sets its weight:
+# interactive (viewer connected) > normal > background (busy with nobody watching).
+# Under host contention background VMs can also get a CFS quota (--cpu-quota over a
+# 100ms --cpu-period; --cpu-quota=-1 lifts it). A new class only
+# applies after it has held for cpuFairHoldSamples passes and cpuFairMinHoldSec since
+# the last change, except a viewer connecting, which is promoted at once. Weights are
+# set with `docker update --cpu-shares`; on cgroup v2 Docker maps them to cpu.weight.
+CPUFAIR_PATH = os.path.join(STATE_DIR, '.cpufair.json')
+
+
+def _load_cpufair() -> dict:
+    try:
+        with open(CPUFAIR_PATH) as f:
+            return json.load(f)
+    except Exception:
+        return {'vms': {}, 'changes': [], 'last_run': 0, 'contended': False}
+
+
+def _save_cpufair(st: dict):
+    try:
+        tmp = CPUFAIR_PATH + '.tmp'
+        with open(tmp, 'w') as f:
+            json.dump(st, f)
+        os.replace(tmp, CPUFAIR_PATH)
+    except Exception as e:
+        log(f'cpufair save failed {e}')
+
+
+CPU_PERIOD_US = 100000
+
+
+def _cpu_applied(names):
+    """container -> (cpu_shares, nano_cpus, cpu_quota) as currently set on the container.
+
+    A quota of 0 means none (Docker reports an unset or lifted quota as 0 or -1)."""
+    out = {}
+    try:
+        raw = subprocess.check_output(['docker', 'inspect', '-f',
+                                       '{{.Name}} {{.HostConfig.CpuShares}} {{.HostConfig.NanoCpus}} {{.HostConfig.CpuQuota}}',
+                                       *names], text=True, stderr=subprocess.DEVNULL)
+    except Exception:
+        return out
+    for line in raw.splitlines():
+        parts = line.split()
+        if len(parts) == 4:
+            out[parts[0].lstrip('/')] = (int(parts[1]) or 1024, int(parts[2]), max(int(parts[3]), 0))
+    return out
+
+
+def _run_cpu_fair(cfg):
+    st = _load_cpufair()
+    now = time.time()
+    if now - st.get('last_run', 0) < int(cfg.get('cpuFairIntervalSec', 30)):
+        return None
+    st['last_run'] = now
+    busy = float(cfg.get('cpuFairBusyPercent', 100))
+    hold_n = int(cfg.get('cpuFairHoldSamples', 2))
+    hold_sec = int(cfg.get('cpuFairMinHoldSec', 120))
+    shares = {'interactive': int(cfg.get('cpuFairInteractiveShares', 2048)), 'normal': 1024,
+              'background': int(cfg.get('cpuFairBackgroundShares', 256))}
+    quota = float(cfg.get('cpuFairBackgroundCpus', 0) or 0)
+    ncpu = os.cpu_count() or 1
+    try:
+        out = subprocess.check_output(['docker', 'stats', '--no-stream', '--format', '{{.Name}}|{{.CPUPerc}}'], text=True)
+    except Exception as e:
+        log(f'cpufair error {e}')
+        return None
+    suspended = suspended_vms()
+    cpu = {}
+    for line in out.splitlines():
+        parts = line.strip().split('|')
+        if len(parts) == 2 and parts[0].startswith('blobevm_') and parts[0][len('blobevm_'):] not in suspended:
+            try:
+                cpu[parts[0]] = float(parts[1].strip().replace('%', ''))
+            except Exception:
+                cpu[parts[0]] = 0.0
+    # docker stats reports 100% per core; contention is judged on the whole host
+    load = sum(cpu.values()) / ncpu
+    contended_pct = float(cfg.get('cpuFairContendedPercent', 80))
+    st['contended'] = load >= contended_pct if not st.get('contended') else load >= contended_pct * 0.75
+    st['host_cpu_percent'] = round(load, 1)
+    applied = _cpu_applied(list(cpu)) if cpu else {}
+    events = []
+    for name, pct in cpu.items():
+        vm = name[len('blobevm_'):]
+        v = st['vms'].setdefault(vm, {'class': 'normal', 'since': int(now), 'ewma': pct})
+        v['ewma'] = round(0.5 * v.get('ewma', pct) + 0.5 * pct, 1)
+        v['cpu'] = pct
+        conns = _web_connections(name)
+        if conns >= 0:
+            v['viewers'] = conns
+        viewers = v.get('viewers', 0)
+        # Separate enter/leave thresholds so a VM hovering at the limit keeps its class
+        hot = v['ewma'] >= (busy * 0.6 if v['class'] == 'background' else busy)
+        want = 'interactive' if viewers > 0 else ('background' if hot else 'normal')
+        if want == v['class']:
+            v.pop('pending', None)
+            v.pop('pending_n', None)
+        elif want == 'interactive':
+            v.update({'class': want, 'since': int(now), 'reason': 'viewer connected'})
+            v.pop('pending', None)
+            v.pop('pending_n', None)
+        else:
+            v['pending_n'] = v.get('pending_n', 0) + 1 if v.get('pending') == want else 1
+            v['pending'] = want
+            if v['pending_n'] >= hold_n and now - v.get('since', 0) >= hold_sec:
+                reason = 'busy without a viewer' if want == 'background' else \
+                    ('viewer left' if v['class'] == 'interactive' else 'load dropped')
+                v.update({'class': want, 'since': int(now), 'reason': reason})
+                v.pop('pending', None)
+                v.pop('pending_n', None)
+        cur = applied.get(name, (1024, 0, 0))
+        # Pinned VMs (set-limits, or any --cpus limit, which Docker cannot combine with a
+        # CFS quota) keep their limit; only the weight is managed
+        pinned = bool(_vm_meta(vm).get('cpu_limit')) or cur[1] > 0
+        want_shares = shares[v['class']]
+        want_cpus = quota if quota and v['class'] == 'background' and st['contended'] and not pinned else 0
+        want_quota = int(want_cpus * CPU_PERIOD_US)
+        args = []
+        if cur[0] != want_shares:
+            args.append(f'--cpu-shares={want_shares}')
+        if not pinned and cur[2] != want_quota:
+            args += [f'--cpu-period={CPU_PERIOD_US}', f'--cpu-quota={want_quota}'] if want_quota else ['--cpu-quota=-1']
+        v.update(shares=want_shares, cpus=want_cpus or None, pinned=pinned)
+        if not args:
+            continue
+        try:
+            subprocess.check_call(['docker', 'update', *args, name], stdout=subprocess.DEVNULL)
+        except Exception as e:
+            log(f'cpufair update failed {name} : {e}')
+            continue
+        # Only an update Docker actually applied counts as a change
+        if _cpu_applied([name]).get(name, cur) == cur:
+            continue
+        log(f'cpufair {name}: {v["class"]} shares={want_shares} cpus={want_cpus or "-"} '
+            f'(cpu {v["ewma"]}%, viewers {viewers}, host {st["host_cpu_percent"]}%)')
+        change = {'ts': int(now), 'vm': vm, 'class': v['class'], 'shares': want_shares, 'cpus': want_cpus or None,
+                  'reason': v.get('reason', '')}
+        st['changes'] = (st.get('changes') or [])[-99:] + [change]
+        events.append({'action': 'cpufair', 'container': name, 'class': v['class'], 'shares': want_shares})
+    for vm in list(st['vms']):
+        if f'blobevm_{vm}' not in cpu:
+            st['vms'].pop(vm, None)
+    _save_cpufair(st)
+    return events or None
+
+
+def cpu_fair_status() -> dict:
+    st = _load_cpufair()
+    cfg = load_config()
+    return {
+        'enabled': bool(cfg.get('guards', {}).get('cpufair')),
+        'contended': bool(st.get('contended')),
+        'host_cpu_percent': st.get('host_cpu_percent'),
+        'vms': st.get('vms', {}),
+        'recent_changes': (st.get('changes') or [])[-20:][::-1],
+    }
+
+# Memory-pressure forecasting: a least-squares trend over host MemAvailable for the
+# last forecastWindowMinutes predicts when it reaches forecastFloor. Mitigations start
+# before the host swaps:
+# - Within forecastReclaimMinutes, the VMs holding the most reclaimable page cache get a
+#   temporary memory limit just above their working set, so the kernel reclaims their
+#   cache. The old limits come back once the forecast clears (with right-sizing on, the
+#   VMs go back to it). Neither right-sizing nor the memory rule touches a capped VM.
+# - Within forecastPauseMinutes, idle VMs with no viewer are paused, as the idle guard
+#   does; opening one wakes it.
+# Every pass also predicts MemAvailable forecastHorizonMinutes ahead. That prediction is
+# later scored against what happened, and alarms are scored by whether the floor was
+# actually reached, so the thresholds can be tuned.
+FORECAST_PATH = os.path.join(STATE_DIR, '.forecast.json')
+
+
+def _load_forecast() -> dict:
+    try:
+        with open(FORECAST_PATH) as f:
+            return json.load(f)
+    except Exception:
+        return {'host': [], 'pending': [], 'errors': [], 'alarms': [], 'tightened': {}, 'actions': []}
+
+
+def _save_forecast(st: dict):
+    try:
+        tmp = FORECAST_PATH + '.tmp'
+        with open(tmp, 'w') as f:
+            json.dump(st, f)
+        os.replace(tmp, FORECAST_PATH)
+    except Exception as e:
+        log(f'forecast save failed {e}')
+
+
+def _forecast_score(st, now, avail, floor):
+    """Score predictions and alarms whose time has come."""
+    keep = []
+    for p in st['pending']:
+        if now >= p['at']:
+            st['errors'] = st['errors'][-199:] + [[int(now), p['predicted'] - avail]]
+        else:
+            keep.append(p)
+    st['pending'] = keep
+    for a in st['alarms']:
+        if a.get('outcome'):
+            continue
+        if avail <= floor:
+            a['outcome'] = 'hit'
+            a['lead_sec'] = int(now - a['ts'])
+        elif now > a['ts'] + a['tte'] * 2:
+            a['outcome'] = 'false'
+    st['alarms'] = st['alarms'][-100:]
+
+
+def _forecast_tighten(cfg, st, rows, now):
+    """Cap the VMs holding the most page cache at their working set plus a margin."""
+    events = []
+    margin = 1 + float(cfg.get('forecastReclaimMarginPercent', 20)) / 100
+    min_gain = _parse_size(str(cfg.get('forecastReclaimMinGain', '256m')))
+    cands = []
+    for name, *_ in rows:
+        vm = name[len('blobevm_'):]
+        if vm in st['tightened'] or _vm_meta(vm).get('mem_limit'):
+            continue
+        sample = _cg_memory(name)
+        if sample is None:
+            continue
+        # docker stats already leaves the cache out of MemUsage; the cgroup's own usage
+        # and page cache show what a cap can actually reclaim
+        ws, _, usage, cache = sample
+        cap = _round_up(ws * margin)
+        gain = min(cache, usage - cap)
+        if gain >= min_gain:
+            cands.append((gain, name, vm, cap))
+    for gain, name, vm, cap in sorted(cands, reverse=True)[:int(cfg.get('forecastReclaimMaxVms', 3))]:
+        try:
+            old, swap = (int(x) for x in subprocess.check_output(
+                ['docker', 'inspect', '-f', '{{.HostConfig.Memory}} {{.HostConfig.MemorySwap}}', name], text=True).split())
+            if old and old <= cap:
+                continue
+            subprocess.check_call(['docker', 'update', f'--memory={cap}', f'--memory-swap={max(swap, cap * 2)}', name],
+                                  stdout=subprocess.DEVNULL)
+        except Exception as e:
+            log(f'forecast reclaim failed {name} : {e}')
+            continue
+        st['tightened'][vm] = {'memory': old, 'memory_swap': swap, 'cap': cap, 'ts': int(now)}
+        log(f'forecast reclaim {name}: limit {cap >> 20}MiB (~{gain >> 20}MiB of cache)')
+        events.append({'action': 'forecast-reclaim', 'container': name, 'limit': cap})
+    return events
+
+
+def _forecast_release(cfg, st):
+    """Put back the limits that _forecast_tighten replaced.
+
+    With right-sizing on, the VM goes back to it instead: the limit saved before the
+    reclaim may be stale, so right-sizing re-reads the capped limit and sizes it again
+    on this same pass."""
+    if cfg.get('guards', {}).get('rightsize'):
+        rs = _load_rightsize()
+        for vm in list(st['tightened']):
+            rs['vms'].get(vm, {}).pop('limit', None)
+            st['tightened'].pop(vm, None)
+            log(f'forecast release blobevm_{vm}: handed back to right-sizing')
+        rs['last_run'] = 0
+        _save_rightsize(rs)
+        return
+    total = 0
+    try:
+        with open('/proc/meminfo') as f:
+            total = int(f.readline().split()[1]) * 1024
+    except Exception:
+        pass
+    for vm, t in list(st['tightened'].items()):
+        name = f'blobevm_{vm}'
+        # docker update cannot remove a limit; an unlimited VM gets one the size of the host
+        mem = t['memory'] or total
+        args = [f'--memory={mem}', f'--memory-swap={t["memory_swap"] if t["memory"] else -1}']
+        try:
+            subprocess.check_call(['docker', 'update', *args, name], stdout=subprocess.DEVNULL,
+                                  stderr=subprocess.DEVNULL)
+            log(f'forecast release {name}: limit restored')
+        except Exception:
+            pass
+        st['tightened'].pop(vm, None)
+
+
+def _forecast_pause_idle(cfg, rows, now):
+    events = []
+    idle_sec = int(cfg.get('forecastPauseIdleMinutes', 10)) * 60
+    exclude = set(cfg.get('idleExclude') or [])
+    suspended = suspended_vms()
+    cands = []
+    with _mem_hist_lock:
+        for name, mem, *_ in rows:
+            h = _mem_hist.get(name)
+            vm = name[len('blobevm_'):]
+            if h and now - h['active'] >= idle_sec and vm not in exclude and vm not in suspended:
+                cands.append((mem, name, vm, int(now - h['active'])))
+    for mem, name, vm, quiet in sorted(cands, reverse=True):
+        if _web_connections(name) != 0:
+            continue
+        try:
+            subprocess.check_call(['docker', 'pause', name], stdout=subprocess.DEVNULL)
+        except Exception as e:
+            log(f'forecast pause failed {name} : {e}')
+            continue
+        try:
+            os.makedirs(IDLE_DIR, exist_ok=True)
+            with open(_idle_record_path(vm), 'w') as f:
+                json.dump({'vm': vm, 'state': 'paused', 'since': int(now), 'idle_sec': quiet, 'mem_bytes': mem,
+                           'reason': 'forecast'}, f)
+        except Exception:
+            pass
+        _idle_event({'ts': int(now), 'vm': vm, 'event': 'pause', 'mem_bytes': mem, 'idle_sec': quiet,
+                     'reason': 'forecast'})
+        log(f'forecast pause {name} (idle {quiet}s, {mem >> 20}MiB)')
+        events.append({'action': 'forecast-pause', 'container': name})
+    return events
+
+
+def _run_forecast(cfg, rows):
+    st = _load_forecast()
+    now = time.time()
+    avail = _host_mem_available()
+    if not avail:
+        return None
+    window = int(cfg.get('forecastWindowMinutes', 15)) * 60
+    horizon = int(cfg.get('forecastHorizonMinutes', 10)) * 60
+    floor = _parse_size(str(cfg.get('forecastFloor', '512m')))
+    st['host'] = [s for s in st['host'] if now - s[0] <= window] + [[now, avail]]
+    _forecast_score(st, now, avail, floor)
+    slope = _growth_rate(st['host']) / 3600  # bytes per second
+    # Too little history for a trend: predict no change
+    if now - st['host'][0][0] < min(window, 300):
+        slope = 0.0
+    st['pending'] = st['pending'][-199:] + [{'at': now + horizon, 'predicted': int(avail + slope * horizon)}]
+    tte = (avail - floor) / -slope if slope < 0 else None
+    if avail <= floor:
+        tte = 0
+    st['last'] = {'ts': int(now), 'available': avail, 'slope_bytes_per_min': int(slope * 60),
+                  'tte_sec': int(tte) if tte is not None else None}
+    events = []
+    reclaim = int(cfg.get('forecastReclaimMinutes', 30)) * 60
+    pause = int(cfg.get('forecastPauseMinutes', 10)) * 60
+    alarmed = tte is not None and tte <= reclaim
+    open_alarm = next((a for a in st['alarms'] if not a.get('outcome')), None)
+    if alarmed and not open_alarm:
+        st['alarms'].append({'ts': int(now), 'tte': int(tte), 'available': avail})
+        log(f'forecast: MemAvailable {avail >> 20}MiB falling {int(-slope * 60) >> 20}MiB/min, '
+            f'floor in ~{int(tte) // 60}min')
+    if alarmed:
+        events += _forecast_tighten(cfg, st, rows, now)
+        if tte <= pause:
+            events += _forecast_pause_idle(cfg, rows, now)
+    elif st['tightened'] and (tte is None or tte > reclaim * 2):
+        _forecast_release(cfg, st)
+    for e in events:
+        st['actions'] = st['actions'][-49:] + [dict(e, ts=int(now))]
+    _save_forecast(st)
+    return events or None
+
+
+def forecast_status() -> dict:
+    st = _load_forecast()
+    cfg = load_config()
+    errs = [e[1] for e in st.get('errors', [])]
+    alarms = st.get('alarms', [])
+    done = [a for a in alarms if a.get('outcome')]
+    hits = [a for a in done if a['outcome'] == 'hit']
+    return {
+        'enabled': bool(cfg.get('guards', {}).get('forecast')),
+        'last': st.get('last'),
+        'accuracy': {
+            'horizon_min': cfg.get('forecastHorizonMinutes', 10),
+            'samples': len(errs),
+            # predicted minus actual MemAvailable at the horizon; positive = too optimistic
+            'mae_bytes': int(sum(abs(e) for e in errs) / len(errs)) if errs else None,
+            'bias_bytes': int(sum(errs) / len(errs)) if errs else None,
+            'alarms': len(alarms),
+            'alarm_hits': len(hits),
+            'false_alarms': len(done) - len(hits),
+        },
+        'tightened': st.get('tightened', {}),
+        'recent_actions': st.get('actions', [])[-20:][::-1],
+        'recent_alarms': alarms[-10:][::-1],
+    }
+
+
 def run_once():
     cfg = load_config()
     events = []
     try:
-        if cfg.get('guards', {}).get('memory'):
-            r = _run_memory_guard(cfg)
-            if r: events.append(r)
-        if cfg.get('guards', {}).get('cpu'):
-            r = _run_cpu_guard(cfg)
-            if r: events.append(r)
-        if cfg.get('guards', {}).get('swap'):
-            r = _run_swap_guard(cfg)
+        # One fleet snapshot per pass feeds the rules and the swap guard
+        rows = None
+        if effective_rules(cfg) or cfg.get('guards', {}).get('swap') or cfg.get('guards', {}).get('forecast'):
+            try:
+                rows = _sample_vms(cfg)
+            except Exception as e:
+                log(f'fleet snapshot error {e}')
+        if rows is not None:
+            r = _run_rules(cfg, rows)
+            if r: events.extend(r)
+        if rows is not None and cfg.get('guards', {}).get('forecast'):
+            r = _run_forecast(cfg, rows)
+            if r: events.extend(r)
+        if rows is not None and cfg.get('guards', {}).get('swap'):
+            r = _run_swap_guard(cfg, rows)
             if r: events.append(r)
         if cfg.get('guards', {}).get('health'):
             r = _run_health_guard(cfg)
             if r: events.append(r)
-        if cfg.get('strictMemoryLimit'):
+        if cfg.get('guards', {}).get('idle'):
+            r = _run_idle_guard(cfg)
+            if r: events.extend(r)
+        if cfg.get('guards', {}).get('rightsize'):
+            r = _run_rightsize(cfg)
+            if r: events.extend(r)
+        if cfg.get('guards', {}).get('cpufair'):
+            r = _run_cpu_fair(cfg)
+            if r: events.extend(r)
+        # Right-sizing owns per-VM limits when enabled; a global limit would fight it
+        if cfg.get('strictMemoryLimit') and not cfg.get('guards', {}).get('rightsize'):
             try:
                 enforce_strict_memory(cfg)
             except Exception as e:
@@ -433,7 +1883,9 @@ def status():
             last = int(open(LAST_RESTART_PATH, 'r').read().strip())
     except Exception:
         last = 0
-    return {'cfg': cfg, 'stats': stats, 'lastRestart': last}
+    return {'cfg': cfg, 'stats': stats, 'lastRestart': last, 'cpuFair': cpu_fair_status(),
+            'swapVictim': last_swap_victim(), 'rulesPlan': last_plan(),
+            'forecast': forecast_status(), 'psi': psi_status()}
 
 
 def set_config(key, val):
@@ -0,0 +1,113 @@
+#!/usr/bin/env python3
+"""Interactive PTY shell sessions into VM containers for the Blobe dashboard.
+
+Each session owns one TTY exec instance (login shell) started through the
+Engine API and kept open for the life of the session, so keystrokes do not
+pay a `docker exec` + login-shell startup each. Provides:
+ - open_session(vm, cols, rows): start a shell; returns (session, error)
+ - read(session): block for the next chunk of terminal output (b'' on exit)
+ - write(session, data) / resize(session, cols, rows)
+ - touch(session) / idle_for(session): idle tracking for the transport
+ - close_session(session)
+ - list_sessions(): active sessions for the dashboard
+
+Limits: SHELL_MAX_PER_VM concurrent sessions per VM and SHELL_MAX_TOTAL overall.
+"""
+import os
+import time
+import uuid
+import socket
+import threading
+
+import docker_api
+
+SHELL_MAX_PER_VM = int(os.environ.get('BLOBEDASH_SHELL_MAX_PER_VM', '2') or 2)
+SHELL_MAX_TOTAL = int(os.environ.get('BLOBEDASH_SHELL_MAX_TOTAL', '16') or 16)
+SHELL_IDLE_SEC = float(os.environ.get('BLOBEDASH_SHELL_IDLE_SEC', '900') or 900)
+
+_SHELL_CMD = ['/bin/sh', '-c', 'if [ -x /bin/bash ]; then exec /bin/bash -l; else exec /bin/sh -l; fi']
+
+_sessions = {}
+_lock = threading.Lock()
+
+
+def open_session(vm: str, cols: int = 80, rows: int = 24):
+    if not docker_api.available():
+        return None, 'docker socket not available'
+    with _lock:
+        if len(_sessions) >= SHELL_MAX_TOTAL:
+            return None, f'too many shell sessions (max {SHELL_MAX_TOTAL})'
+        if sum(1 for s in _sessions.values() if s['vm'] == vm) >= SHELL_MAX_PER_VM:
+            return None, f'too many shell sessions for {vm} (max {SHELL_MAX_PER_VM})'
+        sess = {'id': uuid.uuid4().hex[:16], 'vm': vm, 'exec_id': None, 'sock': None, 'pending': b'',
+                'created': time.time(), 'last_active': time.time(), 'closed': False}
+        # reserve the slot before the (slow) exec setup so concurrent opens respect the caps
+        _sessions[sess['id']] = sess
+    try:
+        sess['exec_id'] = docker_api.exec_create(f'blobevm_{vm}', _SHELL_CMD, tty=True, stdin=True,
+                                                 env={'TERM': 'xterm-256color'})
+        sess['sock'], sess['pending'] = docker_api.exec_attach_tty(sess['exec_id'])
+        try:
+            docker_api.exec_resize(sess['exec_id'], cols, rows)
+        except Exception:
+            pass
+        return sess, None
+    except Exception as e:
+        close_session(sess)
+        return None, str(e)
+
+
+def read(sess: dict) -> bytes:
+    if sess['pending']:
+        data, sess['pending'] = sess['pending'], b''
+        return data
+    try:
+        data = sess['sock'].recv(65536)
+    except Exception:
+        data = b''
+    if data:
+        sess['last_active'] = time.time()
+    return data
+
+
+def write(sess: dict, data: bytes):
+    sess['last_active'] = time.time()
+    sess['sock'].sendall(data)
+
+
+def resize(sess: dict, cols: int, rows: int):
+    docker_api.exec_resize(sess['exec_id'], max(1, int(cols)), max(1, int(rows)))
+
+
+def touch(sess: dict):
+    sess['last_active'] = time.time()
+
+
+def idle_for(sess: dict) -> float:
+    return time.time() - sess['last_active']
+
+
+def close_session(sess: dict):
+    """Drop the session; closing the hijacked socket sends EOF/HUP to the shell."""
+    with _lock:
+        _sessions.pop(sess['id'], None)
+        if sess['closed']:
+            return
+        sess['closed'] = True
+    try:
+        if sess['sock']:
+            sess['sock'].shutdown(socket.SHUT_RDWR)
+    except Exception:
+        pass
+    try:
+        if sess['sock']:
+            sess['sock'].close()
+    except Exception:
+        pass
+
+
+def list_sessions():
+    now = time.time()
+    with _lock:
+        return [{'id': s['id'], 'vm': s['vm'], 'age': int(now - s['created']), 'idle': int(now - s['last_active'])}
+                for s in _sessions.values()]
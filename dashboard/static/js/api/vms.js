@@ -6,8 +6,67 @@
     try{ j = await res.json(); }catch(e){ j = {ok:false, error: 'Invalid JSON'} }
     return { ok: res.ok && j && j.ok, status: res.status, body: j };
   };
+
+  // Resume a VM the idle guard suspended; resolves once it serves again (resume_ms in body)
+  window.api.wakeVM = async function(vmname){
+    const res = await fetch(`/dashboard/api/vm/${encodeURIComponent(vmname)}/wake`, {method: 'POST'});
+    let j = {};
+    try{ j = await res.json(); }catch(e){ j = {ok:false, error: 'Invalid JSON'} }
+    return { ok: res.ok && j && j.ok, status: res.status, body: j };
+  };
+
+  // Status lookups are batched: calls made within BATCH_MS share one request to
+  // /dashboard/api/vm/status, and results are shared with other open tabs over a
+  // BroadcastChannel so N tabs polling M VMs do not each hit the server.
+  const BATCH_MS = 25;
+  const FRESH_MS = 1000;
+  const PEER_MS = 5000;
+  const chan = ('BroadcastChannel' in window) ? new BroadcastChannel('blobevm-vm-status') : null;
+  const fresh = {};
+  const peerWants = {};
+  let pending = null;
+
+  function remember(vms, ts){
+    Object.keys(vms || {}).forEach((n)=>{ fresh[n] = {ts, data: vms[n]}; });
+  }
+  if(chan){
+    chan.onmessage = (ev)=>{
+      const m = ev.data || {};
+      if(m.type === 'want') (m.names || []).forEach((n)=>{ peerWants[n] = Date.now(); });
+      else if(m.type === 'status') remember(m.vms, m.ts);
+    };
+  }
+
+  async function flush(batch){
+    const now = Date.now();
+    const names = new Set(batch.names);
+    Object.keys(peerWants).forEach((n)=>{
+      if(now - peerWants[n] < PEER_MS) names.add(n); else delete peerWants[n];
+    });
+    const res = await fetch(`/dashboard/api/vm/status?names=${encodeURIComponent(Array.from(names).join(','))}`, {cache: 'no-store'});
+    const j = await res.json();
+    if(j && j.ok){
+      remember(j.vms, now);
+      if(chan) chan.postMessage({type: 'status', vms: j.vms, ts: now});
+    }
+    return j;
+  }
+
   window.api.getVMStatus = async function(vmname){
-    const res = await fetch(`/dashboard/api/vm/${encodeURIComponent(vmname)}/status`, {cache: 'no-store'});
-    try{ return await res.json(); }catch(e){ return {ok:false, error: 'Invalid JSON'} }
+    const hit = fresh[vmname];
+    if(hit && Date.now() - hit.ts < FRESH_MS) return Object.assign({ok: true}, hit.data);
+    if(chan) chan.postMessage({type: 'want', names: [vmname]});
+    if(!pending){
+      const batch = {names: new Set()};
+      batch.promise = new Promise((r)=>setTimeout(r, BATCH_MS)).then(()=>{ pending = null; return flush(batch); });
+      pending = batch;
+    }
+    const batch = pending;
+    batch.names.add(vmname);
+    try{
+      const j = await batch.promise;
+      if(!j || !j.ok) return j || {ok:false, error: 'Invalid JSON'};
+      return Object.assign({ok: true}, (j.vms || {})[vmname] || {status: 'not-found'});
+    }catch(e){ return {ok:false, error: 'Invalid JSON'} }
   };
 })();
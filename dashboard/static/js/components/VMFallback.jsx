@@ -6,18 +6,47 @@
     const vmname = props.vmname;
     const vmurl = props.vmurl;
     const status = window.useVMStatus(vmname, {interval:1500});
-    const [phase, setPhase] = useState('idle'); // idle, starting, error
+    const [phase, setPhase] = useState('idle'); // idle, starting, resuming, error
     const [errMsg, setErrMsg] = useState('');
     const startTimeoutRef = useRef(null);
 
+    const wokeRef = useRef(false);
+
     useEffect(()=>{
-      if(status && /up/i.test(status)){
+      if(window.vmIsUp(status)){
         const f = document.getElementById('vmframe'); if(f) f.style.display='block';
       } else {
         const f = document.getElementById('vmframe'); if(f) f.style.display='none';
       }
     }, [status]);
 
+    // A VM the idle guard suspended is resumed as soon as someone opens it
+    useEffect(()=>{
+      if(!status || wokeRef.current || phase !== 'idle') return;
+      (async ()=>{
+        let suspended = /paused/i.test(status);
+        if(!suspended){
+          try{ const j = await window.api.getVMStatus(vmname); suspended = !!(j && j.suspended); }catch(e){}
+        }
+        if(suspended && !wokeRef.current){ wokeRef.current = true; doWake(); }
+      })();
+    }, [status]);
+
+    function showFrame(){
+      const f = document.getElementById('vmframe');
+      if(f){ f.src = f.src; f.style.display='block'; }
+    }
+
+    async function doWake(){
+      setPhase('resuming'); setErrMsg('');
+      try{
+        const r = await window.api.wakeVM(vmname);
+        if(!r.ok){ setPhase('error'); setErrMsg((r.body && r.body.error) || `HTTP ${r.status}`); return; }
+        setPhase('idle');
+        showFrame();
+      }catch(e){ setPhase('error'); setErrMsg(String(e)); }
+    }
+
     useEffect(()=>()=>{ if(startTimeoutRef.current) clearTimeout(startTimeoutRef.current); }, []);
 
     async function doStart(){
@@ -32,7 +61,7 @@
       async function pollForUp(){
         try{
           const j = await window.api.getVMStatus(vmname);
-          if(j && /up/i.test(j.status || '')){
+          if(j && window.vmIsUp(j.status || '')){
             setPhase('idle');
             const f = document.getElementById('vmframe'); if(f) f.style.display='block';
             try{ if(window.alert) setTimeout(()=>alert(`${vmname} is now running`), 50); }catch(e){}
@@ -48,8 +77,13 @@
     return (
       React.createElement('div', {className:'fallback', role:'status'},
         React.createElement('div',{className:'card'},
-          React.createElement('div',{className:'vm-name'}, vmname + ' is currently down…'),
-          phase==='starting' ? (
+          React.createElement('div',{className:'vm-name'}, vmname + (phase==='resuming' ? ' is waking up…' : ' is currently down…')),
+          phase==='resuming' ? (
+            React.createElement('div', null,
+              React.createElement('div', {className:'spinner', 'aria-hidden':true}),
+              React.createElement('div', {className:'muted'}, 'Resuming ' + vmname + ' after inactivity…')
+            )
+          ) : phase==='starting' ? (
             React.createElement('div', null,
               React.createElement('div', {className:'spinner', 'aria-hidden':true}),
               React.createElement('div', {className:'muted'}, 'Starting ' + vmname + '…')
@@ -1,6 +1,10 @@
 // Defines a global hook `useVMStatus(vmname, opts)` that components can call.
 // Relies on React being available as a global.
 (function(){
+  // Docker reports a paused container as "Up ... (Paused)"; it cannot serve the desktop.
+  window.vmIsUp = function(status){
+    return !!status && /up/i.test(status) && !/paused/i.test(status);
+  };
   window.useVMStatus = function(vmname, opts){
     const interval = (opts && opts.interval) || 1500;
     const { useState, useEffect } = React;
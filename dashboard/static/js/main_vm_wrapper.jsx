@@ -6,7 +6,7 @@
   const init = window.__VM_WRAPPER_INIT || { vmname: null, vmurl: null };
   function App(){
     const status = window.useVMStatus(init.vmname, {interval:1500});
-    if(status && /up/i.test(status)){
+    if(window.vmIsUp(status)){
       const f = document.getElementById('vmframe'); if(f) f.style.display='block';
       return null;
     }
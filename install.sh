@@ -3,7 +3,7 @@ cd BlobeVM
 pip install textual
 sleep 2
 python3 installer.py
-docker build -t blobevm . --no-cache
+DOCKER_BUILDKIT=1 docker build -t blobevm . --no-cache
 cd ..
 
 sudo apt update
@@ -0,0 +1,156 @@
+#!/bin/bash
+# Install one or more installable apps in a single apt transaction.
+#
+# Apps declared in manifest.json are merged: every key and repo is set up in one
+# concurrent pass, the package index is refreshed once, downloaded .debs and repo
+# packages go into one `apt-get install` (apps that want recommends, such as wine,
+# get a second one with --install-recommends for their own packages only), and non-apt steps (tarball/jar apps) run
+# in the background alongside it. Apps without a manifest entry fall back to their
+# own <app>.sh script, so custom installers keep working.
+#
+# Usage: install-apps.sh <app> [app...]
+set -euo pipefail
+
+APPS_DIR="$(cd "$(dirname "${BASH_SOURCE[0]}")" && pwd)"
+MANIFEST="$APPS_DIR/manifest.json"
+export APPS_DIR DEBIAN_FRONTEND=noninteractive
+
+[[ $# -ge 1 ]] || { echo "Usage: install-apps.sh <app> [app...]" >&2; exit 1; }
+
+work="$(mktemp -d /tmp/blobe-apps.XXXXXX)"
+trap 'rm -rf "$work"' EXIT
+
+# One jq pass turns the selected manifest entries into a merged plan
+declare -a ARCHS=() PKGS=() REC_PKGS=() DEBS=() KEYS=() LISTS=() SOURCES=() EXTRA_KEYS=() STEP_APPS=() POST_APPS=() LEGACY=()
+plan="$(jq -r '
+  . as $m | $ARGS.positional as $sel
+  | [$sel[] | select($m.apps[.] != null) | $m.apps[.]] as $apps
+  | [$apps[].repos[]?] as $repos
+  | def arr(n; xs): "\(n)=(" + (xs | map(@sh) | join(" ")) + ")";
+    arr("ARCHS"; [$apps[].arch[]?] | unique),
+    arr("PKGS"; [$apps[] | select(.recommends != true) | .packages[]?] | unique),
+    arr("REC_PKGS"; [$apps[] | select(.recommends == true) | .packages[]?] | unique),
+    arr("DEBS"; [$apps[].debs[]?] | unique),
+    arr("KEYS"; [$repos[] | select(.key_url) | "\(.key_url)|\(.keyring)|\(.dearmor != false)"] | unique),
+    arr("EXTRA_KEYS"; [$repos[] | select(.extra_keys) | .keyring as $k | .extra_keys[] | "\($k)|\(.)"] | unique),
+    arr("LISTS"; [$repos[] | select(.line) | "\(.file)|\(.line)"] | unique),
+    arr("SOURCES"; [$repos[] | select(.sources_url) | "\(.file)|\(.sources_url)"] | unique),
+    arr("STEP_APPS"; [$sel[] | select($m.apps[.].steps != null)]),
+    arr("POST_APPS"; [$sel[] | select($m.apps[.].post != null)]),
+    arr("LEGACY"; [$sel[] | select($m.apps[.] == null)])
+' "$MANIFEST" --args "$@")" || { echo "Could not read $MANIFEST" >&2; exit 1; }
+eval "$plan"
+
+for a in "${LEGACY[@]}"; do
+  [[ -f "$APPS_DIR/$a.sh" ]] || { echo "Unknown app: $a" >&2; exit 2; }
+done
+
+app_script() {
+  jq -r --arg a "$1" --arg f "$2" '.apps[$a][$f] | join("\n")' "$MANIFEST"
+}
+
+# Tools for fetching keys and debs; only touches apt when something is missing
+if (( ${#KEYS[@]} + ${#SOURCES[@]} + ${#DEBS[@]} )); then
+  missing=()
+  command -v curl >/dev/null || missing+=(curl ca-certificates)
+  command -v gpg >/dev/null || missing+=(gnupg)
+  if (( ${#missing[@]} )); then
+    apt-get update
+    apt-get install -y --no-install-recommends "${missing[@]}"
+  fi
+fi
+
+for arch in "${ARCHS[@]}"; do
+  dpkg --add-architecture "$arch"
+done
+
+# Non-apt steps do not depend on the apt transaction: start them now
+declare -A step_pid=()
+for a in "${STEP_APPS[@]}"; do
+  echo "**** $a: running install steps in background ****"
+  bash -euo pipefail -c "$(app_script "$a" steps)" >"$work/steps-$a.log" 2>&1 &
+  step_pid[$a]=$!
+done
+
+# Keys, repo files and .debs are independent downloads: fetch them concurrently
+install -m 0755 -d /etc/apt/keyrings "$work/debs"
+pids=()
+for k in "${KEYS[@]}"; do
+  IFS='|' read -r url keyring dearmor <<<"$k"
+  [[ -s "$keyring" ]] && continue
+  mkdir -p "$(dirname "$keyring")"
+  if [[ "$dearmor" == true ]]; then
+    ( curl -fsSL "$url" | gpg --dearmor --yes -o "$keyring" && chmod a+r "$keyring" ) &
+  else
+    ( curl -fsSL "$url" -o "$keyring" && chmod a+r "$keyring" ) &
+  fi
+  pids+=($!)
+done
+for s in "${SOURCES[@]}"; do
+  IFS='|' read -r file url <<<"$s"
+  curl -fsSL "$url" -o "$file" &
+  pids+=($!)
+done
+i=0
+for url in "${DEBS[@]}"; do
+  i=$((i + 1))
+  curl -fsSL --retry 3 "$url" -o "$work/debs/$i.deb" &
+  pids+=($!)
+done
+for p in "${pids[@]}"; do
+  wait "$p" || { echo "A key, repo or package download failed" >&2; exit 1; }
+done
+# Spotify-style secondary signing keys are best effort, as in the per-app scripts
+for e in "${EXTRA_KEYS[@]}"; do
+  IFS='|' read -r keyring fpr <<<"$e"
+  gpg --no-default-keyring --keyring "gnupg-ring:$keyring" --keyserver hkps://keyserver.ubuntu.com --recv-keys "$fpr" >/dev/null 2>&1 || true
+  chmod a+r "$keyring" 2>/dev/null || true
+done
+for l in "${LISTS[@]}"; do
+  IFS='|' read -r file line <<<"$l"
+  echo "$line" > "$file"
+done
+
+# One index refresh and one transaction for every selected app
+debs=("$work"/debs/*.deb)
+[[ -e "${debs[0]:-}" ]] || debs=()
+apt_opts=(-y -o Acquire::Queue-Mode=access -o Acquire::Retries=3)
+apt_install() {
+  if ! apt-get install "${apt_opts[@]}" "$@"; then
+    echo "Retrying after fixing dependencies..." >&2
+    apt-get -f install -y || true
+    apt-get install "${apt_opts[@]}" "$@"
+  fi
+}
+if (( ${#PKGS[@]} + ${#REC_PKGS[@]} + ${#debs[@]} )); then
+  apt-get update
+fi
+if (( ${#PKGS[@]} + ${#debs[@]} )); then
+  echo "**** installing ${#PKGS[@]} packages and ${#debs[@]} .debs in one transaction ****"
+  apt_install "${PKGS[@]}" "${debs[@]}"
+fi
+# Recommends stay scoped to the apps that ask for them
+if (( ${#REC_PKGS[@]} )); then
+  echo "**** installing ${#REC_PKGS[@]} packages with recommends ****"
+  apt_install --install-recommends "${REC_PKGS[@]}"
+fi
+
+for a in "${POST_APPS[@]}"; do
+  bash -euo pipefail -c "$(app_script "$a" post)"
+done
+
+rc=0
+for a in "${STEP_APPS[@]}"; do
+  if ! wait "${step_pid[$a]}"; then
+    echo "Install steps failed for $a:" >&2
+    cat "$work/steps-$a.log" >&2
+    rc=1
+  fi
+done
+
+for a in "${LEGACY[@]}"; do
+  echo "**** $a: no manifest entry, running $a.sh ****"
+  bash "$APPS_DIR/$a.sh" || rc=1
+done
+
+exit "$rc"
@@ -2,67 +2,17 @@
 
 json_file="/options.json"
 
-if jq ".defaultapps | contains([0])" "$json_file" | grep -q true; then
-    chmod +x /installable-apps/wine.sh
-    /installable-apps/wine.sh
-fi
-if jq ".defaultapps | contains([1])" "$json_file" | grep -q true; then
-    chmod +x /installable-apps/chrome.sh
-    /installable-apps/chrome.sh
-fi
-if jq ".defaultapps | contains([2])" "$json_file" | grep -q true; then
-    chmod +x /installable-apps/xarchiver.sh
-    /installable-apps/xarchiver.sh
-fi
-if jq ".defaultapps | contains([3])" "$json_file" | grep -q true; then
-    chmod +x /installable-apps/discord.sh
-    /installable-apps/discord.sh
-fi
-if jq ".defaultapps | contains([4])" "$json_file" | grep -q true; then
-    chmod +x /installable-apps/steam.sh
-    /installable-apps/steam.sh
-fi
-if jq ".defaultapps | contains([5])" "$json_file" | grep -q true; then
-    chmod +x /installable-apps/minecraft.sh
-    /installable-apps/minecraft.sh
-fi
-if jq ".defaultapps | contains([6])" "$json_file" | grep -q true; then
-    chmod +x /installable-apps/spotify.sh
-    /installable-apps/spotify.sh
-fi
+# Map the option indexes picked in options.json to app names with one jq pass,
+# then install them together (one repo setup, one apt update, one apt install).
+apps=$(jq -r --slurpfile opts "$json_file" '
+  .apps | to_entries[]
+  | select(.value.select as $s | $s != null and (($opts[0][$s.group] // []) | index($s.index)) != null)
+  | .key
+' /installable-apps/manifest.json)
 
-if jq ".programming | contains([0])" "$json_file" | grep -q true; then
-    chmod +x /installable-apps/openjdk-8-jre.sh
-    /installable-apps/openjdk-8-jre.sh
-fi
-if jq ".programming | contains([1])" "$json_file" | grep -q true; then
-    chmod +x /installable-apps/openjdk-17-jre.sh
-    /installable-apps/openjdk-17-jre.sh
-fi
-if jq ".programming | contains([2])" "$json_file" | grep -q true; then
-    chmod +x /installable-apps/vscodium.sh
-    /installable-apps/vscodium.sh
-fi
-
-if jq ".apps | contains([0])" "$json_file" | grep -q true; then
-    chmod +x /installable-apps/vlc.sh
-    /installable-apps/vlc.sh
-fi
-if jq ".apps | contains([1])" "$json_file" | grep -q true; then
-    chmod +x /installable-apps/libreoffice.sh
-    /installable-apps/libreoffice.sh
-fi
-if jq ".apps | contains([2])" "$json_file" | grep -q true; then
-    chmod +x /installable-apps/synaptic.sh
-    /installable-apps/synaptic.sh
-fi
-if jq ".apps | contains([3])" "$json_file" | grep -q true; then
-    chmod +x /installable-apps/aqemu.sh
-    /installable-apps/aqemu.sh
-fi
-if jq ".apps | contains([4])" "$json_file" | grep -q true; then
-    chmod +x /installable-apps/tlauncher.sh
-    /installable-apps/tlauncher.sh
+if [ -n "$apps" ]; then
+    echo "**** installing apps: $(echo $apps) ****"
+    bash /installable-apps/install-apps.sh $apps || echo "**** some apps failed to install ****"
 fi
 # clean stuff
 
@@ -58,6 +58,7 @@ if [[ ! -f "$APP_PATH" ]]; then
   if [[ -n "${REPO_DIR:-}" && -f "${REPO_DIR}/dashboard/app.py" ]]; then
     mkdir -p "$(dirname "$APP_PATH")"
     cp -f "${REPO_DIR}/dashboard/app.py" "$APP_PATH"
+    cp -f "${REPO_DIR}"/dashboard/*.py "$(dirname "$APP_PATH")"/ 2>/dev/null || true
   else
     echo "dashboard app not found at $APP_PATH and REPO_DIR unknown" >&2
   fi
@@ -97,11 +98,12 @@ docker run -d --name "$NAME" --restart unless-stopped \
   -v "${HOST_DOCKER_BIN}:/usr/bin/docker:ro" \
   -v /var/run/docker.sock:/var/run/docker.sock \
   -v "$STATE_DIR/dashboard:/app:ro" \
+  -v /sys/fs/cgroup:/host/sys/fs/cgroup:ro \
   -e BLOBEDASH_USER="${BLOBEDASH_USER:-}" \
   -e BLOBEDASH_PASS="${BLOBEDASH_PASS:-}" \
   -e HOST_DOCKER_BIN="${HOST_DOCKER_BIN}" \
   python:3.11-slim \
-    bash -c "apt-get update && apt-get install -y curl jq && pip install --no-cache-dir flask && python /app/app.py" \
+    bash -c "apt-get update && apt-get install -y curl jq && pip install --no-cache-dir flask simple-websocket && python /app/app.py" \
   >/dev/null
 
 echo "Dashboard: http://$(hostname -I | awk '{print $1}'):${DASHBOARD_PORT}/dashboard"
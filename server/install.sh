@@ -1290,11 +1290,12 @@ deploy_dashboard_direct() {
     -v "${docker_bin}:/usr/bin/docker:ro" \
     -v /var/run/docker.sock:/var/run/docker.sock \
     -v /opt/blobe-vm/dashboard/app.py:/app/app.py:ro \
+    -v /sys/fs/cgroup:/host/sys/fs/cgroup:ro \
     -e BLOBEDASH_USER="${BLOBEDASH_USER:-}" \
     -e BLOBEDASH_PASS="${BLOBEDASH_PASS:-}" \
     -e HOST_DOCKER_BIN="${docker_bin}" \
   python:3.11-slim \
-  bash -c "apt-get update && apt-get install -y curl jq && pip install --no-cache-dir flask && python /app/app.py" \
+  bash -c "apt-get update && apt-get install -y curl jq && pip install --no-cache-dir flask simple-websocket && python /app/app.py" \
     >/dev/null
 }
 
@@ -1309,14 +1310,15 @@ build_image() {
   fi
   local image="blobevm:latest"
   local force="${BLOBEVM_FORCE_REBUILD:-0}"
-  # Compute a content hash of the Dockerfile and the VM root/ folder
+  # Content hash of the build context, computed like blobe-vm-manager's
+  # image_fingerprint so rebuild-image recognises an image built here
   local cur_hash prev_hash hash_file
   hash_file="/opt/blobe-vm/.image.hash"
-  cur_hash=$( \
-    cd "$REPO_DIR" && { \
-      { sha256sum Dockerfile 2>/dev/null || true; } \
-      && { find root -type f -print0 2>/dev/null | sort -z | xargs -0 sha256sum 2>/dev/null || true; } \
-    } | sha256sum | awk '{print $1}'
+  cur_hash=$(
+    cd "$REPO_DIR" && {
+      find Dockerfile options.json root \( -type f -o -type l \) -printf '%p %m %l\n' 2>/dev/null | LC_ALL=C sort
+      find Dockerfile options.json root -type f -print0 2>/dev/null | LC_ALL=C sort -z | xargs -0 -r sha256sum
+    } | sha256sum | cut -c1-16
   )
   [[ -f "$hash_file" ]] && prev_hash="$(cat "$hash_file" 2>/dev/null || true)" || prev_hash=""
 
@@ -1326,7 +1328,7 @@ build_image() {
 
   if [[ "$force" == "1" || -z "$img_id" || "$cur_hash" != "$prev_hash" ]]; then
     echo "Building the BlobeVM image from $REPO_DIR ..."
-    docker build -t "$image" "$REPO_DIR"
+    DOCKER_BUILDKIT=1 docker build --label "blobevm.fingerprint=$cur_hash" -t "$image" "$REPO_DIR"
     echo "$cur_hash" > "$hash_file" || true
     echo "Build complete."
   else
@@ -1367,6 +1369,11 @@ install_manager() {
       fi
     done
     cp -f "$REPO_DIR/dashboard/app.py" /opt/blobe-vm/dashboard/app.py
+    # Sibling modules and the local wrapper assets (vendored React, wrapper scripts)
+    cp -f "$REPO_DIR"/dashboard/*.py /opt/blobe-vm/dashboard/ 2>/dev/null || true
+    if [[ -d "$REPO_DIR/dashboard/static" ]]; then
+      rsync -a --delete "$REPO_DIR/dashboard/static/" /opt/blobe-vm/dashboard/static/ || true
+    fi
   fi
   # Build dashboard_v2 frontend (if present) so /Dashboard is available after install
   # dashboard_v2 build is handled by Docker Compose only